@@ -17,6 +17,7 @@ from werkzeug.http import generate_etag
 
 from flexget import manager
 from flexget.config_schema import process_config, format_checker
+from flexget.manager import Session
 from flexget.utils.database import with_session
 from flexget.webserver import User
 from . import __path__
@@ -79,10 +80,31 @@ def api_version(f):
     return wrapped
 
 
+def with_api_session(f):
+    """
+    Like :func:`flexget.utils.database.with_session`, but uses the separate api connection pool
+    when one is configured with `database: {api_pool_size: ...}`.
+    """
+
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        if kwargs.get('session'):
+            return f(*args, **kwargs)
+        session_args = {'expire_on_commit': False}
+        api_engine = getattr(manager.manager, 'api_engine', None)
+        if api_engine is not None:
+            session_args['bind'] = api_engine
+        with Session(**session_args) as session:
+            kwargs['session'] = session
+            return f(*args, **kwargs)
+
+    return wrapped
+
+
 class APIResource(Resource):
     """All api resources should subclass this class."""
 
-    method_decorators = [with_session, api_version]
+    method_decorators = [with_api_session, api_version]
 
     def __init__(self, api, *args, **kwargs):
         self.manager = manager.manager
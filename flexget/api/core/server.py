@@ -10,6 +10,7 @@ import sys
 import logging
 import threading
 import traceback
+from itertools import islice
 from time import sleep
 from path import Path
 import binascii
@@ -45,6 +46,7 @@ from flexget.api.app import (
     empty_response,
     etag,
 )
+from flexget.utils.log_index import LogFilter, get_log_index, parse_line, parse_time
 
 log = logging.getLogger('api.server')
 
@@ -296,39 +298,25 @@ server_log_parser.add_argument(
     'lines', type=int, default=200, help='How many lines to find before streaming'
 )
 server_log_parser.add_argument('search', help='Search filter support google like syntax')
-
-
-def reverse_readline(fh, start_byte=0, buf_size=8192):
-    """a generator that returns the lines of a file in reverse order"""
-    segment = None
-    offset = 0
-    if start_byte:
-        fh.seek(start_byte)
-    else:
-        fh.seek(0, os.SEEK_END)
-    total_size = remaining_size = fh.tell()
-    while remaining_size > 0:
-        offset = min(total_size, offset + buf_size)
-        fh.seek(-offset, os.SEEK_END)
-        buf = fh.read(min(remaining_size, buf_size))
-        remaining_size -= buf_size
-        lines = buf.decode(sys.getfilesystemencoding()).split('\n')
-        # the first line of the buffer is probably not a complete line so
-        # we'll save it and append it to the last line of the next buffer
-        # we read
-        if segment is not None:
-            # if the previous chunk starts right from the beginning of line
-            # do not concact the segment to the last line of new chunk
-            # instead, yield the segment first
-            if buf[-1] is not '\n':
-                lines[-1] += segment
-            else:
-                yield segment
-        segment = lines[0]
-        for index in range(len(lines) - 1, 0, -1):
-            if len(lines[index]):
-                yield lines[index]
-    yield segment
+server_log_parser.add_argument('task', help='Only lines of this task')
+server_log_parser.add_argument(
+    'level',
+    choices=('critical', 'error', 'warning', 'info', 'verbose', 'debug', 'trace'),
+    help='Only lines of this level and higher',
+)
+server_log_parser.add_argument(
+    'start', type=parse_time, help='Only lines logged since, YYYY-MM-DD HH:MM or a part of it'
+)
+server_log_parser.add_argument(
+    'end', type=parse_time, help='Only lines logged until, YYYY-MM-DD HH:MM or a part of it'
+)
+server_log_parser.add_argument(
+    'page',
+    type=int,
+    default=1,
+    help='Page of found lines, counting back from the newest. '
+    'New lines are only streamed for the first page without end time',
+)
 
 
 def file_inode(filename):
@@ -350,52 +338,38 @@ class ServerLogAPI(APIResource):
     def get(self, session=None):
         """ Stream Flexget log Streams as line delimited JSON """
         args = server_log_parser.parse_args()
+        if args['lines'] < 1 or args['page'] < 1:
+            raise BadRequest('lines and page must be positive')
 
         def follow(lines, search):
             log_parser = LogParser(search)
-            stream_from_byte = 0
-
-            lines_found = []
-
-            if os.path.isabs(self.manager.options.logfile):
-                base_log_file = self.manager.options.logfile
-            else:
-                base_log_file = os.path.join(
-                    self.manager.config_base, self.manager.options.logfile
-                )
+            log_filter = LogFilter(
+                start=args['start'], end=args['end'], task=args['task'], level=args['level']
+            )
+            log_index = get_log_index(self.manager)
+            base_log_file = log_index.log_file
 
             yield '{"stream": ['  # Start of the json stream
 
-            # Read back in the logs until we find enough lines
-            for i in range(0, 9):
-                log_file = ('%s.%s' % (base_log_file, i)).rstrip(
-                    '.0'
-                )  # 1st log file has no number
-
-                if not os.path.isfile(log_file):
-                    break
-
-                with open(log_file, 'rb') as fh:
-                    fh.seek(0, 2)  # Seek to bottom of file
-                    end_byte = fh.tell()
-                    if i == 0:
-                        stream_from_byte = end_byte  # Stream from this point later on
-
-                    if len(lines_found) >= lines:
-                        break
+            try:
+                # Stream from this point later on
+                stream_from_byte = os.path.getsize(base_log_file)
+            except OSError:
+                stream_from_byte = 0
 
-                    # Read in reverse for efficiency
-                    for line in reverse_readline(fh, start_byte=end_byte):
-                        if len(lines_found) >= lines:
-                            break
-                        if log_parser.matches(line):
-                            lines_found.append(log_parser.json_string(line))
+            # The index only reads the parts of the logs which can contain matching lines
+            skip = (args['page'] - 1) * lines
+            found = (line for line in log_index.search(log_filter) if log_parser.matches(line))
+            for line in reversed(list(islice(found, skip, skip + lines))):
+                yield log_parser.json_string(line) + ',\n'
 
-                    for l in reversed(lines_found):
-                        yield l + ',\n'
+            if args['page'] > 1 or args['end']:
+                yield '{}]}'
+                return
 
             # We need to track the inode in case the log file is rotated
             current_inode = file_inode(base_log_file)
+            message = None
 
             while True:
                 # If the server is shutting down then end the stream nicely
@@ -411,14 +385,21 @@ class ServerLogAPI(APIResource):
                 try:
                     with open(base_log_file, 'rb') as fh:
                         fh.seek(stream_from_byte)
-                        line = fh.readline().decode(sys.getfilesystemencoding())
+                        raw_line = fh.readline()
                         stream_from_byte = fh.tell()
                 except IOError:
                     yield '{}'
                     continue
 
+                # Continuation lines are filtered like the start of their log message
+                message = parse_line(raw_line) or message
+                line = raw_line.decode(sys.getfilesystemencoding())
+
                 # If a valid line is found and does not pass the filter then set it to none
-                line = log_parser.json_string(line) if log_parser.matches(line) else '{}'
+                if log_parser.matches(line) and log_filter.matches(message):
+                    line = log_parser.json_string(line)
+                else:
+                    line = '{}'
 
                 if line == '{}':
                     # If no match then delay to prevent many read hits on the file
@@ -374,10 +374,10 @@ class TaskQueueAPI(APIResource):
     @api.response(200, model=task_api_queue_schema)
     def get(self, session=None):
         """ List task(s) in queue for execution """
-        tasks = [_task_info_dict(task) for task in self.manager.task_queue.run_queue.queue]
-
-        if self.manager.task_queue.current_task:
-            tasks.insert(0, _task_info_dict(self.manager.task_queue.current_task))
+        task_queue = self.manager.task_queue
+        tasks = [_task_info_dict(task) for task in list(task_queue.running_tasks)]
+        tasks.extend(_task_info_dict(task) for task in sorted(task_queue.waiting_tasks))
+        tasks.extend(_task_info_dict(task) for task in task_queue.run_queue.queue)
 
         return jsonify(tasks)
 
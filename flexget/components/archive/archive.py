@@ -112,7 +112,10 @@ class UrlrewriteArchive(object):
                 # clean some characters out of the string for better results
                 query = re.sub(r'[ \(\)]+', ' ', query).strip()
                 log.debug('looking for `%s` config: %s' % (query, config))
-                for archive_entry in db.search(session, query, tags=tag_names, desc=True):
+                archive_entries = db.search(
+                    session, query, tags=tag_names, desc=True, title_start=True
+                )
+                for archive_entry in archive_entries:
                     log.debug('rewrite search result: %s' % archive_entry)
                     entry = Entry()
                     entry.update_using_map(self.entry_map, archive_entry, ignore_none=True)
@@ -11,7 +11,7 @@ from flexget import options
 from flexget.entry import Entry
 from flexget.event import event
 from flexget.manager import Session
-from flexget.options import ParseExtrasAction, get_parser
+from flexget.options import ParseExtrasAction, get_parser, positive_int
 from flexget.terminal import TerminalTable, TerminalTableError, table_parser, console
 from flexget.utils.tools import strip_html
 
@@ -86,6 +86,8 @@ def consolidate():
 
         if duplicates:
             log.info('Consolidated %i items, removing duplicates ...' % len(duplicates))
+            # Falls back to the plain search index before the FTS5 triggers run, if needed
+            flexget.components.archive.db.has_fts_index(session.connection())
             for id in duplicates:
                 session.query(flexget.components.archive.db.ArchiveEntry).filter(
                     flexget.components.archive.db.ArchiveEntry.id == id
@@ -156,10 +158,11 @@ def cli_search(options):
     sources = options.sources
     query = re.sub(r'[ \(\)]+', ' ', search_term).strip()
 
+    start = (options.page - 1) * options.limit
     table_data = []
     with Session() as session:
         for archived_entry in flexget.components.archive.db.search(
-            session, query, tags=tags, sources=sources
+            session, query, tags=tags, sources=sources, start=start, stop=start + options.limit
         ):
             days_ago = (datetime.now() - archived_entry.added).days
             source_names = ', '.join([s.name for s in archived_entry.sources])
@@ -256,6 +259,22 @@ def register_parser_arguments():
     search_parser.add_argument(
         '--sources', metavar='SOURCE', nargs='+', default=[], help='Source(s) to search within'
     )
+    search_parser.add_argument(
+        '--limit',
+        action='store',
+        type=positive_int,
+        metavar='NUM',
+        default=50,
+        help='show %(metavar)s best matches per page',
+    )
+    search_parser.add_argument(
+        '--page',
+        action='store',
+        type=positive_int,
+        metavar='NUM',
+        default=1,
+        help='show page %(metavar)s',
+    )
     inject_parser = archive_parser.add_subparser(
         'inject', help='Inject entries from the archive back into tasks'
     )
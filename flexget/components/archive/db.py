@@ -1,8 +1,12 @@
 import logging
 import re
 from datetime import datetime
+from itertools import islice
 
-from sqlalchemy import Table, Column, Integer, ForeignKey, Index, Unicode, DateTime
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index, Unicode, DateTime, Float
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.sql import text as sql_text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -11,7 +15,7 @@ from flexget.utils.sqlalchemy_utils import table_schema, get_index_by_name
 
 log = logging.getLogger('archive.db')
 
-SCHEMA_VER = 0
+SCHEMA_VER = 1
 
 Base = db_schema.versioned_base('archive', SCHEMA_VER)
 
@@ -31,8 +35,35 @@ archive_sources_table = Table(
     Index('ix_archive_sources', 'entry_id', 'source_id'),
 )
 
+# Words of the archived titles, used to search the archive when SQLite FTS5 is not available
+archive_tokens_table = Table(
+    'archive_entry_tokens',
+    Base.metadata,
+    Column('entry_id', Integer, ForeignKey('archive_entry.id')),
+    Column('token', Unicode),
+    Index('ix_archive_tokens', 'token', 'entry_id'),
+)
+
 Base.register_table(archive_tags_table)
 Base.register_table(archive_sources_table)
+Base.register_table(archive_tokens_table)
+
+# SQLite FTS5 index of the archived titles, kept up to date with triggers
+FTS_TABLE = 'archive_entry_fts'
+FTS_STATEMENTS = [
+    "DROP TABLE IF EXISTS {fts}",
+    "CREATE VIRTUAL TABLE {fts} USING fts5(title, content='archive_entry', content_rowid='id')",
+    "CREATE TRIGGER {fts}_insert AFTER INSERT ON archive_entry BEGIN "
+    "INSERT INTO {fts}(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER {fts}_delete AFTER DELETE ON archive_entry BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER {fts}_update AFTER UPDATE OF title ON archive_entry BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO {fts}(rowid, title) VALUES (new.id, new.title); END",
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+]
+FTS_SEARCH = "SELECT rowid, bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH :match"
+FTS_TRIGGERS = ['{fts}_insert', '{fts}_delete', '{fts}_update']
 
 
 class ArchiveEntry(Base):
@@ -117,9 +148,134 @@ def upgrade(ver, session):
             log.critical('one time when you have time, it may take hours')
             log.critical('----------------------------------------------')
         ver = 0
+    if ver == 0:
+        log.info('Creating search index of the archive (may take a while) ...')
+        if not create_fts_index(session.connection()):
+            update_tokens(session.connection())
+        ver = 1
     return ver
 
 
+def tokenize(title):
+    """Words of `title` used in the search index, lower cased."""
+    return set(re.findall(r'[^\W_]+', (title or '').lower(), re.UNICODE))
+
+
+def create_fts_index(connection):
+    """
+    Creates the FTS5 search index of the archive, if the database supports it.
+
+    :return: True if the index was created
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    try:
+        for statement in FTS_STATEMENTS:
+            connection.execute(statement.format(fts=FTS_TABLE))
+    except OperationalError as e:
+        # Without FTS5 creating the virtual table fails before anything is changed
+        log.verbose('SQLite FTS5 is not available, using plain search index: %s', e)
+        return False
+    finally:
+        connection.info.pop('archive_fts', None)
+    return True
+
+
+@event.listens_for(ArchiveEntry.__table__, 'after_create')
+def _create_index(target, connection, **kwargs):
+    create_fts_index(connection)
+
+
+def _schema_exists(connection, kind, name):
+    return bool(
+        connection.execute(
+            sql_text("SELECT 1 FROM sqlite_master WHERE type = :kind AND name = :name"),
+            kind=kind,
+            name=name,
+        ).first()
+    )
+
+
+def _check_fts_index(connection):
+    """
+    Checks if the FTS5 search index can be used. A database with the index may be opened by an
+    SQLite without FTS5, its triggers would make every change of the archive fail then. They are
+    dropped and the plain token index is rebuilt instead, the index is created again once FTS5 is
+    available.
+    """
+    if not _schema_exists(connection, 'table', FTS_TABLE):
+        return False
+    has_triggers = _schema_exists(connection, 'trigger', FTS_TRIGGERS[0].format(fts=FTS_TABLE))
+    try:
+        connection.execute('SELECT 1 FROM {fts} LIMIT 1'.format(fts=FTS_TABLE))
+    except OperationalError as e:
+        if has_triggers:
+            log.warning('SQLite FTS5 is not available, rebuilding plain search index: %s', e)
+            for trigger in FTS_TRIGGERS:
+                connection.execute('DROP TRIGGER IF EXISTS ' + trigger.format(fts=FTS_TABLE))
+            update_tokens(connection)
+        return False
+    if not has_triggers:
+        log.info('Creating search index of the archive (may take a while) ...')
+        return create_fts_index(connection)
+    return True
+
+
+def has_fts_index(connection):
+    """Tells if the FTS5 search index is used, the plain token index is used otherwise."""
+    if connection.dialect.name != 'sqlite':
+        return False
+    info = connection.info
+    if 'archive_fts' not in info:
+        info['archive_fts'] = _check_fts_index(connection)
+    return info['archive_fts']
+
+
+def update_tokens(connection, entries=None):
+    """
+    Updates the plain token search index.
+
+    :param connection: Database connection to use
+    :param entries: List of (id, title) tuples of the entries to index, all entries when not given
+    """
+    if entries is None:
+        connection.execute(archive_tokens_table.delete())
+        entries = connection.execute(select([ArchiveEntry.id, ArchiveEntry.title]))
+    else:
+        ids = [entry_id for entry_id, _ in entries]
+        connection.execute(
+            archive_tokens_table.delete().where(archive_tokens_table.c.entry_id.in_(ids))
+        )
+    rows = [
+        {'entry_id': entry_id, 'token': token}
+        for entry_id, title in entries
+        for token in tokenize(title)
+    ]
+    if rows:
+        connection.execute(archive_tokens_table.insert(), rows)
+
+
+@event.listens_for(ArchiveEntry, 'before_insert')
+@event.listens_for(ArchiveEntry, 'before_update')
+@event.listens_for(ArchiveEntry, 'before_delete')
+def _check_index(mapper, connection, target):
+    # Before the triggers of the FTS5 index run
+    has_fts_index(connection)
+
+
+@event.listens_for(ArchiveEntry, 'after_insert')
+@event.listens_for(ArchiveEntry, 'after_update')
+def _index_entry(mapper, connection, target):
+    if not has_fts_index(connection):
+        update_tokens(connection, [(target.id, target.title)])
+
+
+@event.listens_for(ArchiveEntry, 'after_delete')
+def _unindex_entry(mapper, connection, target):
+    if not has_fts_index(connection):
+        update_tokens(connection, [(target.id, None)])
+
+
 def get_source(name, session):
     """
     :param string name: Source name
@@ -146,32 +302,65 @@ def get_tag(name, session):
         return source
 
 
-def search(session, text, tags=None, sources=None, desc=False):
+def search(
+    session, text, tags=None, sources=None, desc=False, start=None, stop=None, title_start=False
+):
     """
-    Search from the archive.
+    Search from the archive, using the search index of the titles.
 
-    :param string text: Search text, spaces and dots are tried to be ignored.
+    :param string text: Search text, all of its words must be in the title, or the start of a word
+        in it.
     :param Session session: SQLAlchemy session, should not be closed while iterating results.
     :param list tags: Optional list of acceptable tags
     :param list sources: Optional list of acceptable sources
-    :param bool desc: Sort results descending
-    :return: ArchiveEntries responding to query
+    :param bool desc: Sort equally ranked results descending by the time they were added
+    :param int start: Index of the first result to return, for pagination
+    :param int stop: Index after the last result to return, for pagination
+    :param bool title_start: Only return titles which start with the search text, spaces and dots
+        in it matching any character
+    :return: ArchiveEntries responding to query, best matches first
     """
-    keyword = str(text).replace(' ', '%').replace('.', '%')
-    # clean the text from any unwanted regexp, convert spaces and keep dots as dots
-    normalized_re = re.escape(text.replace('.', ' ')).replace('\\ ', ' ').replace(' ', '.')
-    find_re = re.compile(normalized_re, re.IGNORECASE)
-    query = session.query(ArchiveEntry).filter(ArchiveEntry.title.like('%' + keyword + '%'))
+    words = sorted(tokenize(str(text)))
+    if not words:
+        return
+    query = session.query(ArchiveEntry)
+    if has_fts_index(session.connection()):
+        # Every word is quoted, so it cannot be taken as FTS5 query syntax
+        match = ' '.join('"%s"*' % word for word in words)
+        fts = (
+            sql_text(FTS_SEARCH.format(fts=FTS_TABLE))
+            .bindparams(match=match)
+            .columns(rowid=Integer, rank=Float)
+            .alias('fts')
+        )
+        query = query.join(fts, fts.c.rowid == ArchiveEntry.id)
+        rank = fts.c.rank
+    else:
+        for word in words:
+            # Range instead of LIKE, so the index is used for the prefix matches
+            after = word[:-1] + chr(ord(word[-1]) + 1)
+            token = archive_tokens_table.c.token
+            query = query.filter(
+                ArchiveEntry.id.in_(
+                    select([archive_tokens_table.c.entry_id]).where(
+                        and_(token >= word, token < after)
+                    )
+                )
+            )
+        # Shortest titles have the least other words in them
+        rank = func.length(ArchiveEntry.title)
     if tags:
         query = query.filter(ArchiveEntry.tags.any(ArchiveTag.name.in_(tags)))
     if sources:
         query = query.filter(ArchiveEntry.sources.any(ArchiveSource.name.in_(sources)))
-    if desc:
-        query = query.order_by(ArchiveEntry.added.desc())
+    added = ArchiveEntry.added.desc() if desc else ArchiveEntry.added.asc()
+    query = query.order_by(rank, added)
+    if title_start:
+        normalized_re = re.escape(str(text).replace('.', ' ')).replace('\\ ', ' ')
+        find_re = re.compile(normalized_re.replace(' ', '.'), re.IGNORECASE)
+        # The index only narrows down the candidates, so paginate after checking them
+        entries = islice((entry for entry in query if find_re.match(entry.title)), start, stop)
     else:
-        query = query.order_by(ArchiveEntry.added.asc())
-    for a in query.yield_per(5):
-        if find_re.match(a.title):
-            yield a
-        else:
-            log.trace('title %s is too wide match' % a.title)
+        entries = query.slice(start, stop) if start or stop else query
+    for entry in entries:
+        yield entry
@@ -39,22 +39,17 @@ class TorrentFilename(object):
 
             # create torrent object from torrent
             try:
-                with open(entry['file'], 'rb') as f:
-                    # NOTE: this reads entire file into memory, but we're pretty sure it's
-                    # a small torrent file since it starts with TORRENT_RE
-                    data = f.read()
-
                 if 'content-length' in entry:
-                    if len(data) != entry['content-length']:
+                    if os.path.getsize(entry['file']) != entry['content-length']:
                         entry.fail(
                             'Torrent file length doesn\'t match to the one reported by the server'
                         )
                         self.purge(entry)
                         continue
 
-                # construct torrent object
+                # construct torrent object, the file is decoded without reading it into memory
                 try:
-                    torrent = Torrent(data)
+                    torrent = Torrent.from_file(entry['file'])
                 except SyntaxError as e:
                     entry.fail('%s - broken or invalid torrent file received' % e.args[0])
                     self.purge(entry)
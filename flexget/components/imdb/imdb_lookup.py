@@ -10,6 +10,7 @@ from flexget.entry import Entry
 from flexget.event import event
 from flexget.utils.database import with_session
 from flexget.utils.log import log_once
+from flexget.utils.prefetch import LookupPrefetcher
 from . import db
 
 log = logging.getLogger('imdb_lookup')
@@ -53,6 +54,23 @@ class ImdbLookup(object):
 
     schema = {'type': 'boolean'}
 
+    key_fields = ['title', 'imdb_id', 'imdb_url', 'movie_name']
+
+    def __init__(self):
+        self.prefetcher = LookupPrefetcher('imdb', 'imdb_name', self.lookup_key, self.fetch)
+
+    def lookup_key(self, entry):
+        return tuple(entry.get(field, eval_lazy=False) for field in self.key_fields)
+
+    def fetch(self, key):
+        fake_entry = Entry(
+            dict((field, value) for field, value in zip(self.key_fields, key) if value)
+        )
+        try:
+            self.lookup(fake_entry)
+        except plugin.PluginError as e:
+            raise LookupError(e.value)
+
     @plugin.priority(130)
     def on_task_metainfo(self, task, config):
         if not config:
@@ -65,6 +83,10 @@ class ImdbLookup(object):
 
     def lazy_loader(self, entry):
         """Does the lookup for this entry and populates the entry fields."""
+        self.prefetcher.prefetch(entry)
+        if self.prefetcher.failed(entry):
+            log_once('IMDB lookup failed for %s' % entry['title'], log, logging.WARN)
+            return
         try:
             self.lookup(entry)
         except plugin.PluginError as e:
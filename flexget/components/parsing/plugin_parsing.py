@@ -1,13 +1,18 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import copy
 import logging
+import threading
+from collections import OrderedDict
 
 from flexget import plugin
 from flexget.event import event
 
 log = logging.getLogger('parsing')
 PARSER_TYPES = ['movie', 'series']
+# Amount of parse results remembered
+CACHE_SIZE = 20000
 
 # Mapping of parser type to (mapping of parser name to plugin instance)
 parsers = {}
@@ -16,6 +21,71 @@ default_parsers = {}
 selected_parsers = {}
 
 
+class ParseCache(object):
+    """
+    Least recently used cache of parse results, keyed by parser, parsed data and parser options.
+
+    Parse results get modified by their users, so copies of the cached results are handed out.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(parser_type, parser_name, data, kwargs):
+        """Returns a hashable cache key for a parse call, or None if the call cannot be cached."""
+        options = []
+        for name, value in sorted(kwargs.items()):
+            if isinstance(value, list):
+                value = tuple(value)
+            elif isinstance(value, dict):
+                value = tuple(sorted(value.items()))
+            options.append((name, value))
+        key = (parser_type, parser_name, data, tuple(options))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key, func):
+        """
+        Returns a copy of the result remembered for `key`, calling `func` to create it when
+        missing.
+        """
+        if key is None:
+            return func()
+        with self._lock:
+            result = self._results.pop(key, None)
+            if result is not None:
+                self.hits += 1
+                # Re-inserting marks it as most recently used
+                self._results[key] = result
+                return copy.copy(result)
+            self.misses += 1
+        result = func()
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+        return copy.copy(result)
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = 0
+
+
+cache = ParseCache()
+
+
 # We need to wait until manager startup to access other plugin instances, to make sure they have all been loaded
 @event('manager.startup')
 def init_parsers(manager):
@@ -63,6 +133,12 @@ class PluginParsing(object):
 
     on_task_abort = on_task_exit
 
+    def parser_name(self, parser_type):
+        """
+        Returns the name of the parser currently used for `parser_type` ('movie' or 'series').
+        """
+        return selected_parsers.get(parser_type) or default_parsers.get(parser_type)
+
     def parse_series(self, data, name=None, **kwargs):
         """
         Use the selected series parser to parse series information from `data`
@@ -73,8 +149,11 @@ class PluginParsing(object):
 
         :returns: An object containing the parsed information. The `valid` attribute will be set depending on success.
         """
-        parser = parsers['series'][selected_parsers.get('series', default_parsers.get('series'))]
-        return parser.parse_series(data, name=name, **kwargs)
+        parser_name = self.parser_name('series')
+        parser = parsers['series'][parser_name]
+        kwargs['name'] = name
+        key = cache.key('series', parser_name, data, kwargs)
+        return cache.get(key, lambda: parser.parse_series(data, **kwargs))
 
     def parse_movie(self, data, **kwargs):
         """
@@ -84,8 +163,29 @@ class PluginParsing(object):
 
         :returns: An object containing the parsed information. The `valid` attribute will be set depending on success.
         """
-        parser = parsers['movie'][selected_parsers.get('movie') or default_parsers['movie']]
-        return parser.parse_movie(data, **kwargs)
+        parser_name = self.parser_name('movie')
+        parser = parsers['movie'][parser_name]
+        key = cache.key('movie', parser_name, data, kwargs)
+        return cache.get(key, lambda: parser.parse_movie(data, **kwargs))
+
+
+@event('manager.execute.started')
+def reset_cache_stats(manager, options):
+    cache.hits = cache.misses = 0
+
+
+@event('manager.execute.completed')
+def log_cache_stats(manager, options):
+    if not getattr(options, 'debug_perf', False):
+        return
+    total = cache.hits + cache.misses
+    log.info(
+        'Parse cache: %s hits, %s misses (%.0f%% hit rate), %s results cached',
+        cache.hits,
+        cache.misses,
+        100.0 * cache.hits / total if total else 0,
+        len(cache),
+    )
 
 
 @event('plugin.register')
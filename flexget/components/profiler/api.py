@@ -0,0 +1,89 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flask import jsonify
+
+from flexget.api import api, APIResource
+from . import profiler
+
+profile_api = api.namespace('profile', description='Plugin performance of recent task executions')
+
+
+class ObjectsContainer(object):
+    stats_properties = {
+        'phase': {'type': 'string'},
+        'plugin': {'type': 'string'},
+        'calls': {'type': 'integer'},
+        'wall_time': {'type': 'number'},
+        'cpu_time': {'type': 'number'},
+        'queries': {'type': 'integer'},
+        'query_time': {'type': 'number'},
+        'requests': {'type': 'integer'},
+        'request_bytes': {'type': 'integer'},
+        'entries_in': {'type': 'integer'},
+        'entries_out': {'type': 'integer'},
+    }
+
+    plugin_stats_object = {
+        'type': 'object',
+        'properties': stats_properties,
+        'required': list(stats_properties),
+        'additionalProperties': False,
+    }
+
+    execution_object = {
+        'type': 'object',
+        'properties': {
+            'task': {'type': 'string'},
+            'started': {'type': 'string', 'format': 'date-time'},
+            'finished': {'type': ['string', 'null'], 'format': 'date-time'},
+            'plugins': {'type': 'array', 'items': plugin_stats_object},
+        },
+        'required': ['task', 'started', 'finished', 'plugins'],
+        'additionalProperties': False,
+    }
+
+    execution_list_object = {'type': 'array', 'items': execution_object}
+
+    summary_object = {
+        'type': 'object',
+        'properties': dict(stats_properties, task={'type': 'string'}, runs={'type': 'integer'}),
+        'required': list(stats_properties) + ['task', 'runs'],
+        'additionalProperties': False,
+    }
+
+    summary_list_object = {'type': 'array', 'items': summary_object}
+
+
+execution_list_schema = api.schema_model(
+    'profile.executions', ObjectsContainer.execution_list_object
+)
+summary_list_schema = api.schema_model('profile.summary', ObjectsContainer.summary_list_object)
+
+profile_parser = api.parser()
+profile_parser.add_argument('task', help='Filter by task name')
+
+
+@profile_api.route('/')
+@api.doc(parser=profile_parser)
+class ProfileAPI(APIResource):
+    @api.response(200, model=execution_list_schema)
+    def get(self, session=None):
+        """ Plugin stats of recent task executions, oldest first """
+        args = profile_parser.parse_args()
+        return jsonify([profile.to_dict() for profile in profiler.get_profiles(args['task'])])
+
+
+@profile_api.route('/summary/')
+@api.doc(parser=profile_parser)
+class ProfileSummaryAPI(APIResource):
+    @api.response(200, model=summary_list_schema)
+    def get(self, session=None):
+        """ Plugin stats summed up over recent task executions, slowest first """
+        args = profile_parser.parse_args()
+        summary = []
+        for task, runs, stats in profiler.summarize(profiler.get_profiles(args['task'])):
+            item = stats.to_dict()
+            item.update(task=task, runs=runs)
+            summary.append(item)
+        return jsonify(summary)
@@ -0,0 +1,77 @@
+from __future__ import unicode_literals, division, absolute_import
+
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flexget import options
+from flexget.event import event
+from flexget.terminal import TerminalTable, TerminalTableError, table_parser, console
+from . import profiler
+
+
+def do_cli(manager, options):
+    profiles = profiler.get_profiles(task=options.task)
+    if not profiles:
+        console(
+            'No task executions have been profiled. Profiles are kept in memory, '
+            'run this while the daemon is running.'
+        )
+        return
+    header = [
+        'Task',
+        'Phase',
+        'Plugin',
+        'Runs',
+        'Wall (s)',
+        'CPU (s)',
+        'Queries',
+        'Query (s)',
+        'Requests',
+        'KiB',
+        'Entries in',
+        'Entries out',
+    ]
+    table_data = [header]
+    for task, runs, stats in profiler.summarize(profiles)[: options.limit]:
+        table_data.append(
+            [
+                task,
+                stats.phase,
+                stats.plugin,
+                str(runs),
+                '%.2f' % stats.wall_time,
+                '%.2f' % stats.cpu_time,
+                str(stats.queries),
+                '%.2f' % stats.query_time,
+                str(stats.requests),
+                str(stats.request_bytes // 1024),
+                str(stats.entries_in),
+                str(stats.entries_out),
+            ]
+        )
+    title = 'Plugins of the last %s task executions, slowest first' % len(profiles)
+    try:
+        table = TerminalTable(options.table_type, table_data, title=title)
+        console(table.output)
+    except TerminalTableError as e:
+        console('ERROR: %s' % str(e))
+
+
+@event('options.register')
+def register_parser_arguments():
+    parser = options.register_command(
+        'profile',
+        do_cli,
+        help='Show how long plugins took in recent task executions',
+        parents=[table_parser],
+    )
+    parser.add_argument(
+        '--task', action='store', metavar='TASK', help='Limit to executions of %(metavar)s'
+    )
+    parser.add_argument(
+        '--limit',
+        action='store',
+        type=int,
+        metavar='NUM',
+        default=30,
+        help='show the %(metavar)s slowest plugins',
+    )
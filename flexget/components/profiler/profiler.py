@@ -0,0 +1,222 @@
+"""
+Records how much time, database queries and http requests each plugin takes in every task
+execution.
+
+Profiles of the latest task executions are kept in memory, when running as a daemon they can be
+viewed with the `flexget profile` command or from the api.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import threading
+import time
+from collections import deque, OrderedDict
+from datetime import datetime
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+from flexget.event import event
+
+log = logging.getLogger('profiler')
+
+# Amount of task executions kept in the history
+HISTORY_SIZE = 200
+
+try:
+    # CPU time of the current thread only
+    thread_time = time.thread_time
+except AttributeError:
+    try:
+        thread_time = time.process_time
+    except AttributeError:
+        thread_time = time.clock
+
+STAT_NAMES = [
+    'calls',
+    'wall_time',
+    'cpu_time',
+    'queries',
+    'query_time',
+    'requests',
+    'request_bytes',
+    'entries_in',
+    'entries_out',
+]
+
+history = deque(maxlen=HISTORY_SIZE)
+_history_lock = threading.Lock()
+# Plugins currently running in this thread, innermost last
+_local = threading.local()
+
+
+class PluginStats(object):
+    """Totals of a single plugin in a single task execution phase."""
+
+    def __init__(self, phase, plugin):
+        self.phase = phase
+        self.plugin = plugin
+        for name in STAT_NAMES:
+            setattr(self, name, 0)
+
+    def add(self, other):
+        for name in STAT_NAMES:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self):
+        result = {'phase': self.phase, 'plugin': self.plugin}
+        for name in STAT_NAMES:
+            result[name] = getattr(self, name)
+        return result
+
+
+class TaskProfile(object):
+    """Profile of a single task execution."""
+
+    def __init__(self, task_name):
+        self.task = task_name
+        self.started = datetime.now()
+        self.finished = None
+        self._plugins = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self, phase, plugin):
+        with self._lock:
+            key = (phase, plugin)
+            if key not in self._plugins:
+                self._plugins[key] = PluginStats(phase, plugin)
+            return self._plugins[key]
+
+    @property
+    def plugins(self):
+        with self._lock:
+            return list(self._plugins.values())
+
+    def to_dict(self):
+        return {
+            'task': self.task,
+            'started': self.started.isoformat(),
+            'finished': self.finished.isoformat() if self.finished else None,
+            'plugins': [stats.to_dict() for stats in self.plugins],
+        }
+
+
+class _Frame(object):
+    """A plugin running in the current thread."""
+
+    def __init__(self, stats, entries_in):
+        self.stats = stats
+        self.entries_in = entries_in
+        self.entries_out = None
+        self.wall_start = time.time()
+        self.cpu_start = thread_time()
+
+
+def _current_frame():
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def get_profiles(task=None):
+    """
+    Returns the profiles of the latest task executions, oldest first, optionally only of `task`.
+    """
+    with _history_lock:
+        profiles = list(history)
+    if task:
+        profiles = [profile for profile in profiles if profile.task == task]
+    return profiles
+
+
+def summarize(profiles):
+    """
+    Sums up the plugin stats of `profiles`.
+
+    :return: List of (task name, runs, :class:`PluginStats`) tuples, the slowest first
+    """
+    totals = OrderedDict()
+    runs = {}
+    for profile in profiles:
+        runs[profile.task] = runs.get(profile.task, 0) + 1
+        for stats in profile.plugins:
+            key = (profile.task, stats.phase, stats.plugin)
+            if key not in totals:
+                totals[key] = PluginStats(stats.phase, stats.plugin)
+            totals[key].add(stats)
+    summary = [(task, runs[task], stats) for (task, _, _), stats in totals.items()]
+    return sorted(summary, key=lambda item: item[2].wall_time, reverse=True)
+
+
+@event('task.execute.started')
+def start_task(task):
+    task.profile = TaskProfile(task.name)
+    with _history_lock:
+        history.append(task.profile)
+
+
+@event('task.execute.completed')
+def finish_task(task):
+    profile = getattr(task, 'profile', None)
+    if profile:
+        profile.finished = datetime.now()
+
+
+@event('task.execute.before_plugin')
+def before_plugin(task, keyword):
+    profile = getattr(task, 'profile', None)
+    if profile is None:
+        return
+    stats = profile.stats(task.current_phase, keyword)
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    _local.stack.append(_Frame(stats, len(task.entries)))
+
+
+@event('task.execute.input_entries')
+def input_entries(task, keyword, entries):
+    frame = _current_frame()
+    if frame:
+        frame.entries_out = len(task.entries) + len(entries)
+
+
+@event('task.execute.after_plugin')
+def after_plugin(task, keyword):
+    frame = _current_frame()
+    if frame is None or frame.stats.plugin != keyword:
+        return
+    _local.stack.pop()
+    stats = frame.stats
+    stats.calls += 1
+    stats.wall_time += time.time() - frame.wall_start
+    stats.cpu_time += thread_time() - frame.cpu_start
+    stats.entries_in += frame.entries_in
+    if frame.entries_out is None:
+        frame.entries_out = len(task.entries)
+    stats.entries_out += frame.entries_out
+
+
+@event('requests.response')
+def count_request(response):
+    frame = _current_frame()
+    if frame:
+        frame.stats.requests += 1
+        try:
+            frame.stats.request_bytes += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+
+@sa_event.listens_for(Engine, 'before_cursor_execute')
+def before_query(conn, cursor, statement, parameters, context, executemany):
+    if _current_frame():
+        conn.info.setdefault('profiler_query_start', []).append(time.time())
+
+
+@sa_event.listens_for(Engine, 'after_cursor_execute')
+def after_query(conn, cursor, statement, parameters, context, executemany):
+    frame = _current_frame()
+    starts = conn.info.get('profiler_query_start')
+    if frame and starts:
+        frame.stats.queries += 1
+        frame.stats.query_time += time.time() - starts.pop()
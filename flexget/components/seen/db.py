@@ -30,6 +30,8 @@ from flexget.event import event
 from flexget.manager import Session
 from flexget.utils.database import with_session
 from flexget.utils.sqlalchemy_utils import table_schema, table_add_column
+from flexget.utils.tools import chunked
+from .index import seen_index
 
 try:
     # NOTE: Importing other plugins is discouraged!
@@ -159,6 +161,7 @@ def add(title, task_name, fields, reason=None, local=None, session=None):
     for field, value in list(fields.items()):
         sf = SeenField(field, value)
         se.fields.append(sf)
+        seen_index.add(value)
     session.add(se)
     session.commit()
     return se.to_dict()
@@ -192,6 +195,7 @@ def forget(value):
             count += 1
             log.debug('forgetting %s', se)
             session.delete(se)
+    seen_index.discard(field_count)
     return count, field_count
 
 
@@ -214,6 +218,34 @@ def search_by_field_values(field_value_list, task_name, local=False, session=Non
     return found.first()
 
 
+@with_session
+def search_by_field_values_bulk(field_value_list, task_name, local=False, session=None):
+    """
+    Look up many field values at once, in chunks small enough for sqlite `IN` clauses
+    :param field_value_list: List of field values to match
+    :param task_name: Name of task to compare to in case local flag is sent
+    :param local: Local flag
+    :param session: Current session
+    :return: Dict mapping matched values to (SeenField, SeenEntry) tuples
+    """
+    found = {}
+    for chunk in chunked(list(set(field_value_list))):
+        query = (
+            session.query(SeenField, SeenEntry)
+            .join(SeenEntry)
+            .filter(SeenField.value.in_(chunk))
+        )
+        if local:
+            query = query.filter(SeenEntry.task == task_name)
+        else:
+            # Entries added from CLI were having local marked as None rather than False for a while
+            # gh#879
+            query = query.filter(or_(SeenEntry.local == False, SeenEntry.local == None))
+        for seen_field, seen_entry in query.order_by(SeenField.id):
+            found.setdefault(seen_field.value, (seen_field, seen_entry))
+    return found
+
+
 @event('manager.db_cleanup')
 def db_cleanup(manager, session):
     # TODO: Look into this, is it still valid?
@@ -265,4 +297,5 @@ def forget_by_id(entry_id, session=None):
     """
     entry = get_entry_by_id(entry_id, session=session)
     log.debug('Deleting seen entry with ID {0}'.format(entry_id))
+    seen_index.discard(len(entry.fields))
     session.delete(entry)
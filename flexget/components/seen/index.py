@@ -0,0 +1,213 @@
+"""
+In-process index over all remembered seen field values.
+
+The index is a bloom filter, it answers "definitely not seen" without touching the database, values
+it reports as possibly seen still have to be verified from the database. It is only built when a
+task enables it with ``seen: {index: yes}``, afterwards it is kept up to date by the seen plugin
+and :mod:`.db`.
+
+A snapshot is written next to the database when the manager shuts down, so the index does not need
+to be rebuilt from the database on every start. The snapshot is consumed when it is loaded, a
+crashed process will thus cause a rebuild rather than loading a possibly outdated snapshot.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import hashlib
+import logging
+import math
+import os
+import pickle
+import struct
+import threading
+
+from sqlalchemy import func
+
+from flexget.event import event
+
+log = logging.getLogger('seen.index')
+
+SNAPSHOT_VERSION = 1
+# Do not bother with tiny filters, they would need to grow right away
+MIN_CAPACITY = 100000
+
+
+class BloomFilter(object):
+    """Set of strings which may give false positives for membership, but never false negatives."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # Double hashing, two 64 bit halves of a single digest generate all the positions
+        h1, h2 = struct.unpack(str('<QQ'), hashlib.md5(value.encode('utf-8')).digest())
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value):
+        bits = self.bits
+        for pos in self._positions(value):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    def __len__(self):
+        return self.count
+
+
+class SeenIndex(object):
+    """Lazily built :class:`BloomFilter` over `SeenField.value`."""
+
+    def __init__(self):
+        self.snapshot_path = None
+        self._bloom = None
+        self._max_id = 0
+        # Values forgotten since the filter was built, they keep occupying bits until a rebuild
+        self._stale = 0
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self._bloom is not None
+
+    def reset(self, snapshot_path=None):
+        with self._lock:
+            self.snapshot_path = snapshot_path
+            self._bloom = None
+            self._max_id = 0
+            self._stale = 0
+
+    def load(self, session):
+        """
+        Makes sure the index is loaded, from a snapshot if there is one, otherwise from the
+        database.
+        """
+        from . import db
+
+        with self._lock:
+            if self._bloom is not None and not self._needs_rebuild():
+                return
+            self._bloom = None
+            if not self._load_snapshot():
+                total = session.query(func.count(db.SeenField.id)).scalar() or 0
+                self._bloom = BloomFilter(max(MIN_CAPACITY, total * 2))
+                self._max_id = 0
+                self._stale = 0
+                log.verbose('Building seen index over %s values, this may take a while.', total)
+            # Pick up anything added to the database after the snapshot was written
+            query = session.query(db.SeenField.id, db.SeenField.value).filter(
+                db.SeenField.id > self._max_id
+            )
+            for field_id, value in query.yield_per(1000):
+                if value:
+                    self._bloom.add(value)
+                self._max_id = max(self._max_id, field_id)
+            log.debug('seen index loaded with %s values', len(self._bloom))
+
+    def _needs_rebuild(self):
+        bloom = self._bloom
+        return len(bloom) > bloom.capacity or self._stale > len(bloom) // 2
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != SNAPSHOT_VERSION:
+                raise ValueError('unknown snapshot version %s' % data.get('version'))
+            bloom = BloomFilter(data['capacity'], data['error_rate'])
+            if len(data['bits']) != len(bloom.bits):
+                raise ValueError('snapshot size mismatch')
+            bloom.bits = bytearray(data['bits'])
+            bloom.count = data['count']
+        except Exception as e:
+            log.warning('Discarding unusable seen index snapshot %s: %s', self.snapshot_path, e)
+            return False
+        finally:
+            # A loaded snapshot is only valid until this process starts changing the database
+            self._remove_snapshot()
+        self._bloom = bloom
+        self._max_id = data['max_id']
+        self._stale = data.get('stale', 0)
+        return True
+
+    def _remove_snapshot(self):
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                os.remove(self.snapshot_path)
+            except OSError as e:
+                log.error('Unable to remove seen index snapshot %s: %s', self.snapshot_path, e)
+
+    def save(self):
+        """Writes the loaded index to the snapshot file."""
+        with self._lock:
+            if self._bloom is None or not self.snapshot_path:
+                return
+            data = {
+                'version': SNAPSHOT_VERSION,
+                'capacity': self._bloom.capacity,
+                'error_rate': self._bloom.error_rate,
+                'count': self._bloom.count,
+                'bits': bytes(self._bloom.bits),
+                'max_id': self._max_id,
+                'stale': self._stale,
+            }
+            try:
+                with open(self.snapshot_path, 'wb') as f:
+                    pickle.dump(data, f, protocol=2)
+            except (IOError, OSError) as e:
+                log.error('Unable to write seen index snapshot %s: %s', self.snapshot_path, e)
+                self._remove_snapshot()
+            else:
+                log.debug('seen index snapshot written to %s', self.snapshot_path)
+
+    def add(self, value):
+        """Called for every value added to the seen database."""
+        with self._lock:
+            if self._bloom is None:
+                # Someone is adding values while the index is not maintained, a snapshot would be
+                # outdated
+                self._remove_snapshot()
+                return
+            if value:
+                self._bloom.add(str(value))
+
+    def discard(self, count=1):
+        """Called when values are removed from the seen database."""
+        with self._lock:
+            if self._bloom is not None:
+                self._stale += count
+
+    def possibly_seen(self, values, session):
+        """
+        Loads the index if needed, and returns those of `values` which may be in the seen database.
+        """
+        with self._lock:
+            self.load(session)
+            bloom = self._bloom
+            return [value for value in values if str(value) in bloom]
+
+
+seen_index = SeenIndex()
+
+
+@event('manager.initialize')
+def setup_index(manager):
+    snapshot_path = None
+    if manager.db_filename:
+        snapshot_path = '%s-seen-index.bin' % os.path.splitext(manager.db_filename)[0]
+    seen_index.reset(snapshot_path)
+
+
+@event('manager.shutdown')
+def save_index(manager):
+    seen_index.save()
+    seen_index.reset()
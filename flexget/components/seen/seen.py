@@ -8,6 +8,7 @@ from past.builtins import basestring
 from flexget import plugin
 from flexget.event import event
 from . import db
+from .index import seen_index
 
 log = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class FilterSeen(object):
                 'type': 'object',
                 'properties': {
                     'local': {'type': 'boolean'},
+                    'index': {'type': 'boolean'},
                     'fields': {
                         'type': 'array',
                         'items': {'type': 'string'},
@@ -58,6 +60,7 @@ class FilterSeen(object):
             config = {'local': config == 'local'}
 
         config.setdefault('local', False)
+        config.setdefault('index', False)
         config.setdefault('fields', self.fields)
         return config
 
@@ -72,6 +75,7 @@ class FilterSeen(object):
         fields = config.get('fields')
         local = config.get('local')
 
+        entry_values = []
         for entry in task.entries:
             # construct list of values looked
             values = []
@@ -81,26 +85,40 @@ class FilterSeen(object):
                 if entry[field] not in values and entry[field]:
                     values.append(str(entry[field]))
             if values:
-                log.trace('querying for: %s' % ', '.join(values))
-                # check if SeenField.value is any of the values
-                found = db.search_by_field_values(
-                    field_value_list=values, task_name=task.name, local=local, session=task.session
-                )
-                if found:
-                    log.debug(
-                        "Rejecting '%s' '%s' because of seen '%s'"
-                        % (entry['url'], entry['title'], found.value)
-                    )
-                    se = (
-                        task.session.query(db.SeenEntry)
-                        .filter(db.SeenEntry.id == found.seen_entry_id)
-                        .one()
-                    )
-                    entry.reject(
-                        'Entry with %s `%s` is already marked seen in the task %s at %s'
-                        % (found.field, found.value, se.task, se.added.strftime('%Y-%m-%d %H:%M')),
-                        remember=remember_rejected,
-                    )
+                entry_values.append((entry, values))
+        if not entry_values:
+            return
+
+        # check which values are any SeenField.value, in as few queries as possible
+        all_values = [value for _, values in entry_values for value in values]
+        if config.get('index'):
+            # only values the index can not rule out need to be looked up
+            all_values = seen_index.possibly_seen(all_values, task.session)
+            if not all_values:
+                return
+        log.trace('querying for %d values' % len(all_values))
+        found_map = db.search_by_field_values_bulk(
+            field_value_list=all_values, task_name=task.name, local=local, session=task.session
+        )
+        if not found_map:
+            return
+
+        for entry, values in entry_values:
+            for value in values:
+                if value in found_map:
+                    found, se = found_map[value]
+                    break
+            else:
+                continue
+            log.debug(
+                "Rejecting '%s' '%s' because of seen '%s'"
+                % (entry['url'], entry['title'], found.value)
+            )
+            entry.reject(
+                'Entry with %s `%s` is already marked seen in the task %s at %s'
+                % (found.field, found.value, se.task, se.added.strftime('%Y-%m-%d %H:%M')),
+                remember=remember_rejected,
+            )
 
     def on_task_learn(self, task, config):
         """Remember succeeded entries"""
@@ -137,6 +155,7 @@ class FilterSeen(object):
             remembered.append(entry[field])
             sf = db.SeenField(str(field), str(entry[field]))
             se.fields.append(sf)
+            seen_index.add(sf.value)
             log.debug("Learned '%s' (field: %s, local: %d)" % (entry[field], field, local))
         # Only add the entry to the session if it has one of the required fields
         if se.fields:
@@ -147,6 +166,7 @@ class FilterSeen(object):
         se = task.session.query(db.SeenEntry).filter(db.SeenEntry.title == title).first()
         if se:
             log.debug("Forgotten '%s' (%s fields)" % (title, len(se.fields)))
+            seen_index.discard(len(se.fields))
             task.session.delete(se)
             return True
 
@@ -45,6 +45,10 @@ class ConfigureSeries(plugin_series.FilterSeriesBase):
             'additionalProperties': False,
         }
 
+    def task_resources(self, task, config):
+        """The series are only known once the task runs, so it takes all of them."""
+        return ['series:*']
+
     def on_task_prepare(self, task, config):
 
         series = {}
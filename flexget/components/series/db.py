@@ -1,6 +1,7 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import itertools
 import logging
 import re
 from datetime import datetime, timedelta
@@ -21,7 +22,9 @@ from sqlalchemy import (
     and_,
     delete,
     desc,
+    case,
 )
+from sqlalchemy import event as sa_event
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.hybrid import hybrid_property, Comparator
 from sqlalchemy.orm import relation, backref
@@ -39,9 +42,9 @@ from flexget.utils.sqlalchemy_utils import (
     table_schema,
     create_index,
 )
-from flexget.utils.tools import parse_episode_identifier
+from flexget.utils.tools import chunked, parse_episode_identifier
 
-SCHEMA_VER = 14
+SCHEMA_VER = 15
 log = logging.getLogger('series.db')
 Base = db_schema.versioned_base('series', SCHEMA_VER)
 
@@ -562,6 +565,40 @@ class SeriesTask(Base):
         self.name = name
 
 
+class SeriesStats(Base):
+    """
+    Statistics of the episodes of a series, kept up to date when the episodes and releases of the
+    series change, so series can be listed and sorted without aggregating all of their episodes and
+    releases.
+    """
+
+    __tablename__ = 'series_stats'
+
+    series_id = Column(Integer, ForeignKey('series.id'), primary_key=True)
+    episodes = Column(Integer, default=0)
+    releases = Column(Integer, default=0)
+    downloaded_releases = Column(Integer, default=0)
+    # Highest season and number of the episodes with downloaded releases
+    downloaded_season = Column(Integer)
+    downloaded_number = Column(Integer)
+    # Amount of episodes identified by each type, see auto_identified_by
+    ep_episodes = Column(Integer, default=0)
+    date_episodes = Column(Integer, default=0)
+    sequence_episodes = Column(Integer, default=0)
+    id_episodes = Column(Integer, default=0)
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime, index=True)
+
+    IDENTIFIED_BY = ('ep', 'date', 'sequence', 'id')
+
+    def type_totals(self):
+        """Amount of episodes identified by each type, leaving out the types without episodes."""
+        totals = dict(
+            (id_type, getattr(self, id_type + '_episodes')) for id_type in self.IDENTIFIED_BY
+        )
+        return dict((id_type, total) for id_type, total in totals.items() if total)
+
+
 Index('episode_series_identifier', Episode.series_id, Episode.identifier)
 
 
@@ -722,6 +759,11 @@ def upgrade(ver, session):
         # New season_releases table, added by "create_all"
         log.info('Adding season_releases table')
         ver = 14
+    if ver == 14:
+        log.info('Creating series_stats table')
+        SeriesStats.__table__.create(bind=session.bind, checkfirst=True)
+        update_series_stats(session)
+        ver = 15
     return ver
 
 
@@ -754,6 +796,138 @@ def db_cleanup(manager, session):
     )
     if result:
         log.verbose('Removed %d series without episodes.', result)
+    # Rows were removed in bulk, statistics of all series may have changed
+    update_series_stats(session)
+
+
+def _stats_changes(session):
+    """
+    Ids of the series, episodes and episode releases changed in `session` since the statistics were
+    updated.
+    """
+    return session.info.setdefault(
+        'series_stats_changes', {'series': set(), 'episodes': set(), 'releases': set()}
+    )
+
+
+def series_stats_changed(session, series_ids=(), episode_ids=(), release_ids=()):
+    """
+    Marks the statistics of series to be updated when `session` commits. Changes done through the
+    ORM are tracked automatically, this is needed after bulk updates or deletes done with queries.
+    """
+    changes = _stats_changes(session)
+    changes['series'].update(series_ids)
+    changes['episodes'].update(episode_ids)
+    changes['releases'].update(release_ids)
+
+
+@sa_event.listens_for(Session, 'before_flush')
+def _track_deleted(session, flush_context, instances):
+    # Deleted rows are gone after the flush, remember which series they belong to now
+    for obj in session.deleted:
+        if isinstance(obj, Series):
+            series_stats_changed(session, series_ids=[obj.id])
+        elif isinstance(obj, Episode):
+            series_stats_changed(session, series_ids=[obj.series_id])
+        elif isinstance(obj, EpisodeRelease):
+            series_stats_changed(session, episode_ids=[obj.episode_id])
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _track_changed(session, flush_context):
+    # New rows have their ids after the flush
+    for obj in itertools.chain(session.new, session.dirty):
+        if isinstance(obj, Series):
+            series_stats_changed(session, series_ids=[obj.id])
+        elif isinstance(obj, Episode):
+            series_stats_changed(session, series_ids=[obj.series_id])
+        elif isinstance(obj, EpisodeRelease):
+            series_stats_changed(session, episode_ids=[obj.episode_id])
+
+
+@sa_event.listens_for(Session, 'before_commit')
+def _update_changed_stats(session):
+    update_changed_series_stats(session)
+
+
+def update_changed_series_stats(session):
+    """Updates the statistics of the series changed in `session`."""
+    session.flush()
+    changes = _stats_changes(session)
+    series_ids = changes['series']
+    episode_ids = changes['episodes']
+    for chunk in chunked(list(changes['releases'])):
+        episode_ids.update(
+            row[0]
+            for row in session.execute(
+                select([EpisodeRelease.episode_id]).where(EpisodeRelease.id.in_(chunk))
+            )
+        )
+    for chunk in chunked(list(episode_ids)):
+        series_ids.update(
+            row[0]
+            for row in session.execute(select([Episode.series_id]).where(Episode.id.in_(chunk)))
+        )
+    series_ids.discard(None)
+    if series_ids:
+        update_series_stats(session, list(series_ids))
+    session.info.pop('series_stats_changes', None)
+
+
+def update_series_stats(session, series_ids=None):
+    """
+    Calculates the statistics of series again.
+
+    :param session: Database session to use
+    :param series_ids: Ids of the series to update. All series when not given.
+    """
+    stats_table = SeriesStats.__table__
+    if series_ids is None:
+        session.execute(stats_table.delete())
+        chunks = [None]
+    else:
+        chunks = chunked(list(series_ids))
+    downloaded = EpisodeRelease.downloaded == True
+    columns = [
+        Episode.series_id,
+        func.count(Episode.id.distinct()).label('episodes'),
+        func.count(EpisodeRelease.id).label('releases'),
+        func.count(case([(downloaded, EpisodeRelease.id)])).label('downloaded_releases'),
+        func.max(case([(downloaded, Episode.season)])).label('downloaded_season'),
+        func.max(case([(downloaded, Episode.number)])).label('downloaded_number'),
+        func.min(EpisodeRelease.first_seen).label('first_seen'),
+        func.max(EpisodeRelease.first_seen).label('last_seen'),
+    ]
+    for id_type in SeriesStats.IDENTIFIED_BY:
+        columns.append(
+            func.count(case([(Episode.identified_by == id_type, Episode.id)]).distinct()).label(
+                id_type + '_episodes'
+            )
+        )
+    for chunk in chunks:
+        series_query = select([Series.id])
+        stats_query = (
+            select(columns)
+            .select_from(Episode.__table__.outerjoin(EpisodeRelease.__table__))
+            .group_by(Episode.series_id)
+        )
+        if chunk is not None:
+            session.execute(stats_table.delete().where(stats_table.c.series_id.in_(chunk)))
+            series_query = series_query.where(Series.id.in_(chunk))
+            stats_query = stats_query.where(Episode.series_id.in_(chunk))
+        # Series without episodes get a row too
+        rows = {}
+        for row in session.execute(series_query):
+            rows[row[0]] = dict((column.name, None) for column in stats_table.columns)
+            rows[row[0]].update(series_id=row[0], episodes=0, releases=0, downloaded_releases=0)
+            rows[row[0]].update(
+                (id_type + '_episodes', 0) for id_type in SeriesStats.IDENTIFIED_BY
+            )
+        for row in session.execute(stats_query):
+            if row['series_id'] in rows:
+                rows[row['series_id']].update(row)
+        if rows:
+            session.execute(stats_table.insert(), list(rows.values()))
 
 
 def set_alt_names(alt_names, db_series, session):
@@ -935,32 +1109,26 @@ def get_series_summary(
         raise LookupError(
             '"configured" parameter must be either "configured", "unconfigured", or "all"'
         )
-    query = session.query(Series)
-    query = (
-        query.outerjoin(Series.episodes)
-        .outerjoin(Episode.releases)
-        .outerjoin(Series.in_tasks)
-        .group_by(Series.id)
-    )
+    query = session.query(Series).outerjoin(SeriesStats, SeriesStats.series_id == Series.id)
     if configured == 'configured':
-        query = query.having(func.count(SeriesTask.id) >= 1)
+        query = query.filter(Series.in_tasks.any())
     elif configured == 'unconfigured':
-        query = query.having(func.count(SeriesTask.id) < 1)
+        query = query.filter(~Series.in_tasks.any())
     if name:
         query = query.filter(Series._name_normalized.contains(name))
     if premieres:
-        query = (
-            query.having(func.max(Episode.season) <= 1).having(func.max(Episode.number) <= 2)
-        ).filter(EpisodeRelease.downloaded == True)
+        query = query.filter(SeriesStats.downloaded_season <= 1).filter(
+            SeriesStats.downloaded_number <= 2
+        )
     if count:
-        return query.group_by(Series).count()
+        return query.count()
     if sort_by == 'show_name':
         order_by = Series.name
     else:
-        order_by = func.max(EpisodeRelease.first_seen)
+        order_by = SeriesStats.last_seen
     query = query.order_by(desc(order_by)) if descending else query.order_by(order_by)
 
-    return query.slice(start, stop).from_self()
+    return query.slice(start, stop)
 
 
 def auto_identified_by(series):
@@ -972,17 +1140,10 @@ def auto_identified_by(series):
     """
 
     session = Session.object_session(series)
-    type_totals = dict(
-        session.query(Episode.identified_by, func.count(Episode.identified_by))
-        .join(Episode.series)
-        .filter(Series.id == series.id)
-        .group_by(Episode.identified_by)
-        .all()
-    )
-    # Remove None and specials from the dict,
-    # we are only considering episodes that we know the type of (parsed with new parser)
-    type_totals.pop(None, None)
-    type_totals.pop('special', None)
+    update_changed_series_stats(session)
+    stats = session.query(SeriesStats).populate_existing().get(series.id)
+    # Only episodes that we know the type of (parsed with new parser) are considered, not specials
+    type_totals = stats.type_totals() if stats else {}
     if not type_totals:
         return 'auto'
     log.debug('%s episode type totals: %r', series.name, type_totals)
@@ -1404,8 +1565,6 @@ def store_parser(session, parser, series=None, quality=None):
     :param quality: If supplied, this will override the quality from the series parser
     :return: List of Releases
     """
-    if quality is None:
-        quality = parser.quality
     if not series:
         # if series does not exist in database, add new
         series = (
@@ -1421,91 +1580,137 @@ def store_parser(session, parser, series=None, quality=None):
             session.add(series)
             log.debug('-> added `%s`', series)
 
-    releases = []
-    for ix, identifier in enumerate(parser.identifiers):
-        if parser.season_pack:
-            # Checks if season object exist
-            season = (
-                session.query(Season)
-                .filter(Season.season == parser.season)
-                .filter(Season.series_id == series.id)
-                .filter(Season.identifier == identifier)
-                .first()
-            )
-            if not season:
-                log.debug('adding season `%s` into series `%s`', identifier, parser.name)
-                season = Season()
-                season.identifier = identifier
-                season.identified_by = parser.id_type
-                season.season = parser.season
-                series.seasons.append(season)
-                log.debug('-> added season `%s`', season)
-            session.flush()
-
-            # Sets the filter_by, and filter_id for later releases query
-            filter_id = season.id
-            table = SeasonRelease
-            filter_by = table.season_id
-            entity = season
+    return store_parsers(session, series, [(parser, quality)])[0]
 
-        else:
-            # if episode does not exist in series, add new
-            episode = (
-                session.query(Episode)
-                .filter(Episode.series_id == series.id)
-                .filter(Episode.identifier == identifier)
-                .filter(Episode.series_id != None)
-                .first()
-            )
-            if not episode:
-                log.debug('adding episode `%s` into series `%s`', identifier, parser.name)
-                episode = Episode()
-                episode.identifier = identifier
-                episode.identified_by = parser.id_type
-                # if episodic format
-                if parser.id_type == 'ep':
-                    episode.season = parser.season
-                    episode.number = parser.episode + ix
-                elif parser.id_type == 'sequence':
-                    episode.season = 0
-                    episode.number = parser.id + ix
-                series.episodes.append(episode)  # pylint:disable=E1103
-                log.debug('-> added `%s`', episode)
-            session.flush()
-
-            # Sets the filter_by, and filter_id for later releases query
-            table = EpisodeRelease
-            filter_by = table.episode_id
-            filter_id = episode.id
-            entity = episode
-
-        # if release does not exists in episode or season, add new
-        #
-        # NOTE:
-        #
-        # filter(Release.episode_id != None) fixes weird bug where release had/has been added
-        # to database but doesn't have episode_id, this causes all kinds of havoc with the plugin.
-        # perhaps a bug in sqlalchemy?
-        release = (
-            session.query(table)
-            .filter(filter_by == filter_id)
-            .filter(table.title == parser.data)
-            .filter(table.quality == quality)
-            .filter(table.proper_count == parser.proper_count)
-            .filter(filter_by != None)
-            .first()
-        )
-        if not release:
-            log.debug('adding release `%s`', parser)
-            release = table()
-            release.quality = quality
-            release.proper_count = parser.proper_count
-            release.title = parser.data
-            entity.releases.append(release)  # pylint:disable=E1103
-            log.debug('-> added `%s`', release)
-        releases.append(release)
+
+def _quality_name(quality):
+    return quality if isinstance(quality, str) else quality.name
+
+
+def store_parsers(session, series, parsers):
+    """
+    Push the releases of many parsers for one series into database at once. Existing seasons,
+    episodes and releases are looked up with a few queries for all parsers, missing ones are
+    inserted with a single flush.
+
+    :param session: Database session to use
+    :param series: Series in database to add the releases to
+    :param parsers: List of (parser, quality) tuples. When quality is None the quality of the
+        parser is used.
+    :return: List with the list of Releases of each parser
+    """
+    parsers = [
+        (parser, parser.quality if quality is None else quality) for parser, quality in parsers
+    ]
+    if series.id is None:
+        session.flush()
+
+    # Look up existing seasons and episodes
+    season_keys = set()
+    episode_ids = set()
+    for parser, _ in parsers:
+        for identifier in parser.identifiers:
+            if parser.season_pack:
+                season_keys.add((parser.season, identifier))
+            else:
+                episode_ids.add(identifier)
+    seasons = {}
+    for chunk in chunked(list(set(identifier for _, identifier in season_keys))):
+        for season in (
+            session.query(Season)
+            .filter(Season.series_id == series.id)
+            .filter(Season.identifier.in_(chunk))
+        ):
+            seasons.setdefault((season.season, season.identifier), season)
+    episodes = {}
+    for chunk in chunked(list(episode_ids)):
+        for episode in (
+            session.query(Episode)
+            .filter(Episode.series_id == series.id)
+            .filter(Episode.identifier.in_(chunk))
+        ):
+            episodes.setdefault(episode.identifier, episode)
+
+    # Add missing seasons and episodes
+    entities = []
+    for parser, _ in parsers:
+        parser_entities = []
+        for ix, identifier in enumerate(parser.identifiers):
+            if parser.season_pack:
+                season = seasons.get((parser.season, identifier))
+                if not season:
+                    log.debug('adding season `%s` into series `%s`', identifier, series.name)
+                    season = Season()
+                    season.identifier = identifier
+                    season.identified_by = parser.id_type
+                    season.season = parser.season
+                    season.series = series
+                    seasons[(parser.season, identifier)] = season
+                    log.debug('-> added season `%s`', season)
+                parser_entities.append(season)
+            else:
+                episode = episodes.get(identifier)
+                if not episode:
+                    log.debug('adding episode `%s` into series `%s`', identifier, series.name)
+                    episode = Episode()
+                    episode.identifier = identifier
+                    episode.identified_by = parser.id_type
+                    # if episodic format
+                    if parser.id_type == 'ep':
+                        episode.season = parser.season
+                        episode.number = parser.episode + ix
+                    elif parser.id_type == 'sequence':
+                        episode.season = 0
+                        episode.number = parser.id + ix
+                    episode.series = series
+                    episodes[identifier] = episode
+                    log.debug('-> added `%s`', episode)
+                parser_entities.append(episode)
+        entities.append(parser_entities)
+    session.flush()
+
+    # Look up existing releases of the seasons and episodes
+    existing = {}
+    for table, entity_ids in (
+        (SeasonRelease, [season.id for season in seasons.values()]),
+        (EpisodeRelease, [episode.id for episode in episodes.values()]),
+    ):
+        entity_column = table.season_id if table is SeasonRelease else table.episode_id
+        for chunk in chunked(entity_ids):
+            for release in session.query(table).filter(entity_column.in_(chunk)):
+                key = (
+                    table,
+                    getattr(release, entity_column.key),
+                    release.title,
+                    release._quality,
+                    release.proper_count,
+                )
+                existing.setdefault(key, release)
+
+    # Add missing releases
+    result = []
+    for (parser, quality), parser_entities in zip(parsers, entities):
+        releases = []
+        for entity in parser_entities:
+            table = SeasonRelease if entity.is_season else EpisodeRelease
+            key = (table, entity.id, parser.data, _quality_name(quality), parser.proper_count)
+            release = existing.get(key)
+            if not release:
+                log.debug('adding release `%s`', parser)
+                release = table()
+                release.quality = quality
+                release.proper_count = parser.proper_count
+                release.title = parser.data
+                if entity.is_season:
+                    release.season = entity
+                else:
+                    release.episode = entity
+                existing[key] = release
+                log.debug('-> added `%s`', release)
+            releases.append(release)
+        result.append(releases)
     session.flush()  # Make sure autonumber ids are populated
-    return releases
+    return result
 
 
 def add_series_entity(session, series, identifier, quality=None):
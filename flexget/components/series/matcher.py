@@ -0,0 +1,132 @@
+"""
+Index over the series names of a series config.
+
+The internal series parser only accepts a title for a series when the title starts with the series
+name (after an optional ignored prefix, such as a group name in brackets). This module uses a
+character trie over the series names to find the few series a title may belong to, so the parser
+doesn't need to be run for each (series, entry) pair.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import re
+import threading
+
+from flexget.utils.parsers.generic import default_ignore_prefixes
+from flexget.utils.tools import get_config_as_array
+
+log = logging.getLogger('series.matcher')
+
+# Blank characters as defined by `flexget.utils.parsers.generic.name_to_re`
+BLANK_RE = re.compile(r'(?:[^\w&]|_)+', re.UNICODE)
+IGNORE_PREFIX_RES = [
+    re.compile(prefix, re.IGNORECASE | re.UNICODE) for prefix in default_ignore_prefixes
+]
+
+# Amount of different series configs kept in the cache
+MAX_CACHED_MATCHERS = 20
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def name_keys(name):
+    """
+    Returns the ways `name` can appear in a title according to `name_to_re`, lowercase and with all
+    blanks removed.
+    Returns None if name cannot be indexed.
+    """
+    if name.endswith(')'):
+        p_start = name.rfind('(')
+        if p_start != -1:
+            # The parenthetical is optional in titles
+            name = name[: p_start - 1]
+    words = BLANK_RE.sub(' ', name).strip().lower().split(' ')
+    if not words[0] or any(ord(char) > 127 for word in words for char in word):
+        # Leave case folding of non ascii names to the regexps
+        return None
+    keys = ['']
+    for i, word in enumerate(words):
+        choices = [word]
+        if word in ('&', 'and') and 0 < i < len(words) - 1:
+            choices = ['&', 'and']
+        keys = [key + choice for key in keys for choice in choices]
+    return keys
+
+
+class SeriesMatcher(object):
+    """Finds the series from a series config a title may belong to."""
+
+    def __init__(self, config):
+        """
+        :param config: Prepared series config, list of single item dicts
+        """
+        self._trie = {}
+        # Series which have to be tried for every title
+        self._unindexed = set()
+        for index, series_item in enumerate(config):
+            series_name, series_config = list(series_item.items())[0]
+            if get_config_as_array(series_config, 'name_regexp'):
+                self._unindexed.add(index)
+                continue
+            alternate_names = get_config_as_array(series_config, 'alternate_name')
+            for name in [series_name] + alternate_names:
+                keys = name_keys(str(name))
+                if keys is None:
+                    self._unindexed.add(index)
+                    break
+                for key in keys:
+                    self._add(key, index)
+
+    def _add(self, key, index):
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(None, set()).add(index)
+
+    def candidates(self, title):
+        """Returns indexes of the series in config which may match `title`."""
+        found = set(self._unindexed)
+        starts = {0}
+        for prefix_re in IGNORE_PREFIX_RES:
+            match = prefix_re.match(title)
+            if match:
+                starts.add(match.end())
+        for start in starts:
+            node = self._trie
+            for char in BLANK_RE.sub('', title[start:]).lower():
+                node = node.get(char)
+                if node is None:
+                    break
+                found.update(node.get(None, ()))
+        return found
+
+
+def matcher_key(config):
+    """Returns a hashable key of everything in a series config that affects name matching."""
+    return tuple(
+        (
+            str(name),
+            tuple(get_config_as_array(series_config, 'alternate_name')),
+            tuple(get_config_as_array(series_config, 'name_regexp')),
+        )
+        for series_item in config
+        for name, series_config in series_item.items()
+    )
+
+
+def get_matcher(config):
+    """
+    Returns a :class:`SeriesMatcher` for series `config`, reusing the one built on earlier runs if
+    possible.
+    """
+    key = matcher_key(config)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            log.debug('building series matcher for %s series', len(config))
+            if len(_matchers) >= MAX_CACHED_MATCHERS:
+                _matchers.clear()
+            matcher = _matchers[key] = SeriesMatcher(config)
+    return matcher
@@ -15,6 +15,7 @@ from sqlalchemy.orm import object_session, joinedload
 
 from flexget import options
 from flexget import plugin
+from .matcher import get_matcher
 from .utils import normalize_series_name
 from flexget.config_schema import one_or_more
 from flexget.event import event
@@ -390,27 +391,29 @@ class FilterSeries(FilterSeriesBase):
                         )
                         series_config['exact'] = True
 
+    def task_resources(self, task, config):
+        """
+        Tasks handling the same series are not run concurrently, they share the series database
+        rows.
+        """
+        return [
+            'series:%s' % normalize_series_name(str(list(s.keys())[0]))
+            for s in self.prepare_config(config)
+        ]
+
     # Run after metainfo_quality and before metainfo_series
     @plugin.priority(125)
     def on_task_metainfo(self, task, config):
         config = self.prepare_config(config)
         self.auto_exact(config)
 
-        parser = plugin.get('parsing', self)
-
         start_time = preferred_clock()
 
-        # Sort Entries into data model similar to https://en.wikipedia.org/wiki/Trie
-        # Only process series if both the entry title and series title first letter match
-        entries_map = defaultdict(list)
-        for entry in task.entries:
-            parsed = parser.parse_series(entry['title'])
-            if parsed.name:
-                entries_map[parsed.name[:1].lower()].append(entry)
-            else:
-                # If parsing failed, use first char of each word in the entry title
-                for word in entry['title'].replace(' ', '.').split('.'):
-                    entries_map[word[:1].lower()].append(entry)
+        parser = plugin.get('parsing', self)
+        if parser.parser_name('series') == 'internal':
+            series_entries = self.match_entries(task.entries, config)
+        else:
+            series_entries = self.bucket_entries(task.entries, config)
 
         with Session() as session:
             # Preload series
@@ -435,24 +438,65 @@ class FilterSeries(FilterSeriesBase):
 
             existing_db_series = {s.name_normalized: s for s in existing_db_series}
 
-            for series_item in config:
+            for index, series_item in enumerate(config):
+                entries = series_entries.get(index)
+                if not entries:
+                    continue
                 series_name, series_config = list(series_item.items())[0]
-                alt_names = get_config_as_array(series_config, 'alternate_name')
                 db_series = existing_db_series.get(normalize_series_name(series_name))
                 db_identified_by = db_series.identified_by if db_series else None
-                letters = set(
-                    [series_name[:1].lower()]
-                    + [normalize_series_name(series_name)[:1].lower()]
-                    + [alt[:1].lower() for alt in alt_names]
-                )
-                entries = set(
-                    [entry for letter in letters for entry in entries_map.get(letter, [])]
-                )
-                if entries:
-                    self.parse_series(entries, series_name, series_config, db_identified_by)
+                self.parse_series(entries, series_name, series_config, db_identified_by)
 
         log.debug('series on_task_metainfo took %s to parse', preferred_clock() - start_time)
 
+    def match_entries(self, entries, config):
+        """
+        Finds the series each of `entries` may belong to using a :class:`.matcher.SeriesMatcher`,
+        which is reused as long as the series names in config don't change.
+
+        :return: Dict mapping index of the series in `config` to list of entries to parse for it
+        """
+        matcher = get_matcher(config)
+        series_entries = defaultdict(list)
+        for entry in entries:
+            for index in matcher.candidates(entry['title']):
+                series_entries[index].append(entry)
+        return series_entries
+
+    def bucket_entries(self, entries, config):
+        """
+        Fallback of :meth:`match_entries` for parsers which may match series names anywhere in the
+        title.
+
+        :return: Dict mapping index of the series in `config` to list of entries to parse for it
+        """
+        parser = plugin.get('parsing', self)
+        # Sort Entries into data model similar to https://en.wikipedia.org/wiki/Trie
+        # Only process series if both the entry title and series title first letter match
+        entries_map = defaultdict(list)
+        for entry in entries:
+            parsed = parser.parse_series(entry['title'])
+            if parsed.name:
+                entries_map[parsed.name[:1].lower()].append(entry)
+            else:
+                # If parsing failed, use first char of each word in the entry title
+                for word in entry['title'].replace(' ', '.').split('.'):
+                    entries_map[word[:1].lower()].append(entry)
+
+        series_entries = {}
+        for index, series_item in enumerate(config):
+            series_name, series_config = list(series_item.items())[0]
+            alt_names = get_config_as_array(series_config, 'alternate_name')
+            letters = set(
+                [series_name[:1].lower()]
+                + [normalize_series_name(series_name)[:1].lower()]
+                + [alt[:1].lower() for alt in alt_names]
+            )
+            series_entries[index] = list(
+                set([entry for letter in letters for entry in entries_map.get(letter, [])])
+            )
+        return series_entries
+
     def on_task_filter(self, task, config):
         """Filter series"""
         # Parsing was done in metainfo phase, create the dicts to pass to process_series from the task entries
@@ -469,33 +513,35 @@ class FilterSeries(FilterSeriesBase):
             ):
                 found_series.setdefault(entry['series_name'], []).append(entry)
 
-        # Prefetch series
-        with Session() as session:
-            # str() added to make sure number shows (e.g. 24) are turned into strings
-            series_names = [str(list(s.keys())[0]) for s in config]
-            existing_series = (
-                session.query(db.Series)
-                .filter(db.Series.name.in_(series_names))
-                .options(joinedload('alternate_names'))
-                .all()
-            )
-            existing_series_map = dict([(s.name_normalized, s) for s in existing_series])
-            # Expunge so we can work on de-attached while processing the series to minimize db locks
-            session.expunge_all()
+        # Only the series with entries in this run are handled, the rows of the others are not
+        # touched
+        # str() added to make sure number shows (e.g. 24) are turned into strings
+        series_items = [
+            (str(series_name), series_config)
+            for series_item in config
+            for series_name, series_config in series_item.items()
+            if str(series_name) in found_series
+        ]
 
         start_time = preferred_clock()
-        for series_item in config:
-            with Session() as session:
-                series_name, series_config = list(series_item.items())[0]
+        with Session() as session:
+            # Prefetch series
+            existing_series = []
+            for chunk in chunked([series_name for series_name, _ in series_items]):
+                existing_series.extend(
+                    session.query(db.Series)
+                    .filter(db.Series.name.in_(chunk))
+                    .options(joinedload('alternate_names'))
+                )
+            existing_series_map = dict([(s.name_normalized, s) for s in existing_series])
 
+            for series_name, series_config in series_items:
                 if series_config.get('parse_only'):
                     log.debug(
                         'Skipping filtering of series `%s` because of parse_only', series_name
                     )
                     continue
 
-                # Make sure number shows (e.g. 24) are turned into strings
-                series_name = str(series_name)
                 db_series = existing_series_map.get(normalize_series_name(series_name))
                 if not db_series:
                     log.debug('adding series `%s` into db', series_name)
@@ -511,23 +557,16 @@ class FilterSeries(FilterSeriesBase):
                     for alt in alts:
                         db._add_alt_name(alt, db_series, series_name, session)
                     existing_series_map[db_series.name_normalized] = db_series
-                else:
-                    # Add existing series back to session
-                    session.add(db_series)
-
-                # Skip if series not within entries
-                if series_name not in found_series:
-                    continue
 
                 series_entries = {}
-                for entry in found_series[series_name]:
-                    # store found episodes into database and save reference for later use
-                    releases = db.store_parser(
-                        session,
-                        entry['series_parser'],
-                        series=db_series,
-                        quality=entry.get('quality'),
-                    )
+                # store found episodes into database and save reference for later use
+                entries = found_series[series_name]
+                all_releases = db.store_parsers(
+                    session,
+                    db_series,
+                    [(entry['series_parser'], entry.get('quality')) for entry in entries],
+                )
+                for entry, releases in zip(entries, all_releases):
                     entry['series_releases'] = [r.id for r in releases]
                     if hasattr(releases[0], 'episode'):
                         entity = releases[0].episode
@@ -535,11 +574,6 @@ class FilterSeries(FilterSeriesBase):
                         entity = releases[0].season
                     series_entries.setdefault(entity, []).append(entry)
 
-                # If we didn't find any episodes for this series, continue
-                if not series_entries:
-                    log.trace('No entries found for `%s` this run.', series_name)
-                    continue
-
                 # configuration always overrides everything
                 if series_config.get('identified_by', 'auto') != 'auto':
                     db_series.identified_by = series_config['identified_by']
@@ -1069,6 +1103,7 @@ class FilterSeries(FilterSeriesBase):
                             .filter(db.EpisodeRelease.id.in_(entry['series_releases']))
                             .update({'downloaded': True}, synchronize_session=False)
                         )
+                        db.series_stats_changed(session, release_ids=entry['series_releases'])
 
                 log.debug(
                     'marking %s episode releases and %s season releases as downloaded for `%s`',
@@ -6,7 +6,9 @@ from functools import partial
 
 from flexget import plugin
 from flexget.event import event
+from flexget.manager import Session
 from flexget.utils.database import with_session
+from flexget.utils.prefetch import LookupPrefetcher
 
 try:
     # NOTE: Importing other plugins is discouraged!
@@ -106,8 +108,43 @@ class PluginThetvdbLookup(object):
         ]
     }
 
+    def __init__(self):
+        # One prefetcher for every lookup language
+        self.prefetchers = {}
+
+    @staticmethod
+    def series_key(entry):
+        return (
+            entry.get('series_name', eval_lazy=False),
+            entry.get('tvdb_id', eval_lazy=False),
+            entry.get('language', eval_lazy=False),
+        )
+
+    def prefetcher(self, language):
+        if language not in self.prefetchers:
+
+            def fetch(key):
+                series_name, tvdb_id, entry_language = key
+                with Session() as session:
+                    plugin_api_tvdb.lookup_series(
+                        series_name,
+                        tvdb_id=tvdb_id,
+                        language=entry_language or language,
+                        session=session,
+                    )
+
+            self.prefetchers[language] = LookupPrefetcher(
+                'tvdb_%s' % language, 'tvdb_series_name', self.series_key, fetch
+            )
+        return self.prefetchers[language]
+
     @with_session
     def series_lookup(self, entry, language, field_map, session=None):
+        prefetcher = self.prefetcher(language)
+        prefetcher.prefetch(entry)
+        if prefetcher.failed(entry):
+            log.debug('Error looking up tvdb series information for %s', entry['title'])
+            return entry
         try:
             series = plugin_api_tvdb.lookup_series(
                 entry.get('series_name', eval_lazy=False),
@@ -8,6 +8,7 @@ from flexget import plugin
 from flexget.event import event
 from flexget.manager import Session
 from flexget.utils.log import log_once
+from flexget.utils.prefetch import LookupPrefetcher
 
 try:
     # NOTE: Importing other plugins is discouraged!
@@ -57,18 +58,51 @@ class PluginTmdbLookup(object):
         ]
     }
 
-    def lazy_loader(self, entry, language):
-        """Does the lookup for this entry and populates the entry fields."""
-        lookup = plugin.get('api_tmdb', self).lookup
+    def __init__(self):
+        # One prefetcher for every lookup language
+        self.prefetchers = {}
 
+    @staticmethod
+    def lookup_key(entry):
         imdb_id = entry.get('imdb_id', eval_lazy=False) or extract_id(
             entry.get('imdb_url', eval_lazy=False)
         )
+        return entry['title'], entry.get('tmdb_id', eval_lazy=False), imdb_id
+
+    def prefetcher(self, language):
+        if language not in self.prefetchers:
+
+            def fetch(key):
+                title, tmdb_id, imdb_id = key
+                with Session() as session:
+                    plugin.get('api_tmdb', self).lookup(
+                        smart_match=title,
+                        tmdb_id=tmdb_id,
+                        imdb_id=imdb_id,
+                        language=language,
+                        session=session,
+                    )
+
+            self.prefetchers[language] = LookupPrefetcher(
+                'tmdb_%s' % language, 'tmdb_name', self.lookup_key, fetch
+            )
+        return self.prefetchers[language]
+
+    def lazy_loader(self, entry, language):
+        """Does the lookup for this entry and populates the entry fields."""
+        lookup = plugin.get('api_tmdb', self).lookup
+
+        prefetcher = self.prefetcher(language)
+        prefetcher.prefetch(entry)
+        if prefetcher.failed(entry):
+            log_once('TMDB lookup failed for %s' % entry['title'], log, logging.WARN)
+            return
+        title, tmdb_id, imdb_id = self.lookup_key(entry)
         try:
             with Session() as session:
                 movie = lookup(
-                    smart_match=entry['title'],
-                    tmdb_id=entry.get('tmdb_id', eval_lazy=False),
+                    smart_match=title,
+                    tmdb_id=tmdb_id,
                     imdb_id=imdb_id,
                     language=language,
                     session=session,
@@ -4,7 +4,9 @@ from flexget.utils.template import get_template
 
 from future.moves.urllib.parse import urlparse, parse_qsl
 
+import copy
 import os
+import pickle
 import re
 import logging
 from collections import defaultdict
@@ -15,9 +17,12 @@ from jsonschema.compat import str_types, int_types
 
 from flexget.event import fire_event
 from flexget.utils import qualities, template
-from flexget.utils.tools import parse_timedelta, parse_episode_identifier
+from flexget.utils.tools import get_config_hash, parse_timedelta, parse_episode_identifier
 
 schema_paths = {}
+# path: hash standing in for the schema registered at path in `schema_hash`, e.g. for plugins not
+# imported yet
+schema_hashes = {}
 
 log = logging.getLogger('config_schema')
 
@@ -98,18 +103,34 @@ def resolve_ref(uri):
     raise jsonschema.RefResolutionError("%s could not be resolved" % uri)
 
 
-def process_config(config, schema=None, set_defaults=True):
+def schema_hash():
+    """
+    :returns: Hash of all registered schemas, changes whenever any of them changes
+    """
+    hashes = []
+    for path in sorted(schema_paths):
+        if path in schema_hashes:
+            hashes.append((path, schema_hashes[path]))
+        elif not callable(schema_paths[path]):
+            hashes.append((path, schema_paths[path]))
+    return get_config_hash(hashes)
+
+
+def process_config(config, schema=None, set_defaults=True, checker=None):
     """
     Validates the config, and sets defaults within it if `set_defaults` is set.
     If schema is not given, uses the root config schema.
 
+    :param checker: Format checker to use instead of the default one.
     :returns: A list with :class:`jsonschema.ValidationError`s if any
 
     """
     if schema is None:
         schema = get_schema()
     resolver = RefResolver.from_schema(schema)
-    validator = SchemaValidator(schema, resolver=resolver, format_checker=format_checker)
+    validator = SchemaValidator(
+        schema, resolver=resolver, format_checker=checker or format_checker
+    )
     if set_defaults:
         validator.VALIDATORS['properties'] = validate_properties_w_defaults
     try:
@@ -165,6 +186,112 @@ def parse_size(size_input):
         return int(1024 ** prefixes.index(unit) * value)
 
 
+class ValidationCache(object):
+    """
+    Stores the results of validating the root config at `path`. A config which passed validation
+    before is not validated again, and from a changed config only the tasks which changed are
+    validated.
+
+    Results are only used as long as the registered schemas are the same, and the files and paths
+    the config was checked to have still exist.
+    """
+
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+
+    def _load(self, schemas):
+        try:
+            with open(self.path, 'rb') as cache_file:
+                cache = pickle.load(cache_file)
+        except (IOError, EOFError, ValueError, pickle.PickleError, AttributeError, ImportError):
+            return None
+        if not isinstance(cache, dict) or cache.get('version') != self.version:
+            return None
+        if cache.get('schemas') != schemas:
+            log.debug('Schemas have changed, validating the whole config')
+            return None
+        return cache
+
+    def _save(self, cache):
+        try:
+            with open(self.path, 'wb') as cache_file:
+                pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        except (IOError, pickle.PickleError) as e:
+            log.debug('Could not store validation results to %s: %s', self.path, e)
+
+    @staticmethod
+    def _still_valid(item, config_hash):
+        if item is None or item['hash'] != config_hash:
+            return False
+        for checked_format, instance in item['checked']:
+            try:
+                format_checker.check(instance, checked_format)
+            except jsonschema.FormatError:
+                return False
+        return True
+
+    def process_config(self, config):
+        """
+        Validates `config` against the root config schema and sets defaults within it, like
+        :func:`process_config`.
+
+        :returns: A tuple with a list of :class:`jsonschema.ValidationError`s if any, and the
+            validated config
+        """
+        schemas = schema_hash()
+        cache = self._load(schemas) or {'version': self.version, 'schemas': schemas, 'tasks': {}}
+        config_hash = get_config_hash(config)
+        if self._still_valid(cache.get('config'), config_hash):
+            log.debug('Config has passed validation before')
+            return [], copy.deepcopy(cache['config']['config'])
+
+        tasks = config.get('tasks')
+        if not isinstance(tasks, dict):
+            return process_config(config), config
+        task_hashes = dict((name, get_config_hash(task)) for name, task in tasks.items())
+        unchanged = [
+            name
+            for name in tasks
+            if self._still_valid(cache['tasks'].get(name), task_hashes[name])
+        ]
+        log.debug('Validating config, %s unchanged tasks are skipped', len(unchanged))
+        # Only the changed tasks are validated, the others come from the cache afterwards
+        config = dict(config, tasks=dict((n, t) for n, t in tasks.items() if n not in unchanged))
+        checker = _RecordingFormatChecker()
+        errors = process_config(config, checker=checker)
+        if errors:
+            return errors, config
+
+        validated_tasks = {}
+        cached_tasks = {}
+        for name in tasks:
+            if name in unchanged:
+                cached_tasks[name] = cache['tasks'][name]
+                validated_tasks[name] = copy.deepcopy(cached_tasks[name]['config'])
+            else:
+                # What was checked is not known per task, every changed task gets all of it
+                cached_tasks[name] = {
+                    'hash': task_hashes[name],
+                    'config': copy.deepcopy(config['tasks'][name]),
+                    'checked': checker.checked,
+                }
+                validated_tasks[name] = config['tasks'][name]
+        config['tasks'] = validated_tasks
+        checked = set(checker.checked)
+        for item in cached_tasks.values():
+            checked.update(item['checked'])
+        cache['tasks'] = cached_tasks
+        cache['config'] = {
+            'hash': config_hash,
+            'config': copy.deepcopy(config),
+            'checked': sorted(checked),
+        }
+        self._save(cache)
+        return [], config
+
+
 # Public API end here, the rest should not be used outside this module
 
 
@@ -176,6 +303,32 @@ class RefResolver(jsonschema.RefResolver):
 
 format_checker = jsonschema.FormatChecker(('email',))
 
+# Formats whose result depends on the file system, not only the config
+FILESYSTEM_FORMATS = ('file', 'path')
+
+
+class _RecordingFormatChecker(object):
+    """Checks formats with the default format checker, recording the file system checks."""
+
+    def __init__(self):
+        self.checked = []
+
+    def check(self, instance, format):
+        if (
+            format in FILESYSTEM_FORMATS
+            and isinstance(instance, str_types)
+            and (format, instance) not in self.checked
+        ):
+            self.checked.append((format, instance))
+        return format_checker.check(instance, format)
+
+    def conforms(self, instance, format):
+        try:
+            self.check(instance, format)
+        except jsonschema.FormatError:
+            return False
+        return True
+
 
 @format_checker.checks('quality', raises=ValueError)
 def is_quality(instance):
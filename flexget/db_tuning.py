@@ -0,0 +1,157 @@
+"""
+Creation and tuning of the database engine.
+
+File based SQLite databases are used in write ahead log mode by default, so reading (web ui, api,
+scheduler) does not block the running tasks and the other way around. Settings can be changed with
+the root level `database` key::
+
+  database:
+    journal_mode: wal
+    synchronous: normal
+    mmap_size: 256 MiB
+    cache_size: 32 MiB
+    busy_timeout: 30 seconds
+    pool_size: 5
+    api_pool_size: 2
+
+When `api_pool_size` is given, the web api gets a connection pool of its own, so a busy api cannot
+use up the connections needed to run tasks.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+
+import sqlalchemy
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+from flexget.config_schema import register_config_key, parse_size, parse_interval
+from flexget.event import event
+from flexget.manager import Session
+from flexget.utils.tools import timedelta_total_seconds
+
+log = logging.getLogger('db_tuning')
+
+DEFAULTS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 0,
+    'cache_size': 8 * 1024 ** 2,
+    'busy_timeout': 30,
+    'pool_size': 5,
+    'api_pool_size': 0,
+}
+
+database_config_schema = {
+    'type': 'object',
+    'properties': {
+        'journal_mode': {
+            'type': 'string',
+            'enum': ['wal', 'delete', 'truncate', 'persist', 'memory'],
+        },
+        'synchronous': {'type': 'string', 'enum': ['off', 'normal', 'full', 'extra']},
+        'mmap_size': {'type': ['string', 'integer'], 'format': 'size'},
+        'cache_size': {'type': ['string', 'integer'], 'format': 'size'},
+        'busy_timeout': {'type': 'string', 'format': 'interval'},
+        'pool_size': {'type': 'integer', 'minimum': 1},
+        'api_pool_size': {'type': 'integer', 'minimum': 0},
+    },
+    'additionalProperties': False,
+}
+
+
+def get_settings(config):
+    """
+    Returns the database settings from the root level `database` config, with defaults filled in.
+    """
+    settings = dict(DEFAULTS)
+    db_config = config.get('database') or {}
+    for key, value in db_config.items():
+        if key in ('mmap_size', 'cache_size'):
+            value = parse_size(value)
+        elif key == 'busy_timeout':
+            value = timedelta_total_seconds(parse_interval(value))
+        settings[key] = value
+    return settings
+
+
+def is_sqlite_file(url):
+    url = make_url(url)
+    return url.drivername.startswith('sqlite') and url.database not in (None, '', ':memory:')
+
+
+def create_engine(url, settings, **kwargs):
+    """
+    Creates an engine for database `url`. Connections to a SQLite file are pooled and set up
+    according to `settings`.
+
+    :param settings: Dict of database settings, see :func:`get_settings`
+    :param kwargs: Passed on to :func:`sqlalchemy.create_engine`
+    """
+    if make_url(url).drivername.startswith('sqlite'):
+        kwargs['connect_args'] = {'check_same_thread': False, 'timeout': settings['busy_timeout']}
+    if not is_sqlite_file(url):
+        return sqlalchemy.create_engine(url, **kwargs)
+
+    engine = sqlalchemy.create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=settings['pool_size'],
+        # Threads beyond the pool size still get a connection, it is just not kept afterwards
+        max_overflow=-1,
+        **kwargs
+    )
+
+    @sqlalchemy.event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('PRAGMA journal_mode = %s' % settings['journal_mode'])
+            cursor.execute('PRAGMA synchronous = %s' % settings['synchronous'])
+            cursor.execute('PRAGMA mmap_size = %d' % settings['mmap_size'])
+            # Negative cache size is in KiB rather than pages
+            cursor.execute('PRAGMA cache_size = %d' % -(settings['cache_size'] // 1024))
+            cursor.execute('PRAGMA busy_timeout = %d' % (settings['busy_timeout'] * 1000))
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_api_engine(url, settings, **kwargs):
+    """
+    Returns an engine with its own connection pool for the web api, or None if one is not
+    configured.
+    """
+    if not settings['api_pool_size'] or not is_sqlite_file(url):
+        return None
+    api_settings = dict(settings, pool_size=settings['api_pool_size'])
+    return create_engine(url, api_settings, **kwargs)
+
+
+@event('manager.config_updated')
+def apply_settings(manager):
+    """Recreates the database engines when the database settings in config have changed."""
+    settings = get_settings(manager.config)
+    if settings == manager.db_settings or not getattr(manager, 'engine', None):
+        return
+    log.debug('database settings changed, reconnecting')
+    old_engines = [manager.engine, manager.api_engine]
+    manager.db_settings = settings
+    manager.engine = create_engine(
+        manager.database_uri, settings, echo=manager.options.debug_sql
+    )
+    manager.api_engine = create_api_engine(
+        manager.database_uri, settings, echo=manager.options.debug_sql
+    )
+    Session.configure(bind=manager.engine)
+    # Connections in use keep working, they are closed once returned
+    for engine in old_engines:
+        if engine is not None:
+            engine.dispose()
+
+
+@event('config.register')
+def register_config():
+    register_config_key('database', database_config_schema)
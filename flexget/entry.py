@@ -5,6 +5,7 @@ from future.utils import PY2, native_str, text_type
 import copy
 import functools
 import logging
+from datetime import date, time, timedelta
 
 from flexget.plugin import PluginError
 from flexget.utils.lazy_dict import LazyDict, LazyLookup
@@ -12,6 +13,9 @@ from flexget.utils.template import render_from_entry, FlexGetTemplate
 
 log = logging.getLogger('entry')
 
+# Field values of these types cannot be changed in place, clones of an entry can share them
+IMMUTABLE_TYPES = (text_type, native_str, bool, int, float, type(None), date, time, timedelta)
+
 
 class EntryUnicodeError(Exception):
     """This exception is thrown when trying to set non-unicode compatible field value to entry."""
@@ -241,6 +245,28 @@ class Entry(LazyDict):
             return False
         return True
 
+    def clone(self):
+        """
+        Returns a copy of this entry which can be changed without affecting the original, like
+        :func:`copy.deepcopy` would. Much cheaper though, field values which cannot be changed in
+        place (text, numbers, dates) are shared with the original, only the others are copied.
+        """
+        if any(isinstance(value, LazyLookup) for value in self.store.values()):
+            # Lazy lookups are bound to their entry, they have to be copied along with it
+            return copy.deepcopy(self)
+        memo = {}
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.store = {
+            key: value if isinstance(value, IMMUTABLE_TYPES) else copy.deepcopy(value, memo)
+            for key, value in self.store.items()
+        }
+        clone.traces = list(self.traces)
+        # Snapshots are never changed once taken
+        clone.snapshots = dict(self.snapshots)
+        clone._hooks = dict((action, list(funcs)) for action, funcs in self._hooks.items())
+        return clone
+
     def take_snapshot(self, name):
         """
         Takes a snapshot of the entry under *name*. Snapshots can be accessed via :attr:`.snapshots`.
@@ -93,6 +93,28 @@ def capture_output(stream, loglevel=None):
         local_context.loglevel = old_loglevel
 
 
+def get_local_context():
+    """
+    Returns a copy of the logging context of the current thread, to be used by another thread.
+    """
+    return dict(local_context.__dict__)
+
+
+@contextlib.contextmanager
+def use_local_context(context):
+    """
+    Context manager which applies a logging context from :func:`get_local_context` in the current
+    thread.
+    """
+    old_context = dict(local_context.__dict__)
+    local_context.__dict__.update(context)
+    try:
+        yield
+    finally:
+        local_context.__dict__.clear()
+        local_context.__dict__.update(old_context)
+
+
 def get_capture_stream():
     """If output is currently being redirected to a stream, returns that stream."""
     return getattr(local_context, 'output', None)
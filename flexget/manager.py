@@ -45,7 +45,8 @@ from flexget.options import (
     unicode_argv,
 )  # noqa
 from flexget.task import Task  # noqa
-from flexget.task_queue import TaskQueue  # noqa
+from flexget.task_queue import TaskQueue, get_workers  # noqa
+from flexget import db_tuning  # noqa
 from flexget.utils.tools import pid_exists, get_current_flexget_version, io_encoding  # noqa
 from flexget.terminal import console  # noqa
 
@@ -133,6 +134,9 @@ class Manager(object):
         self.config_path = None
         self.db_filename = None
         self.engine = None
+        # Separate engine for the web api, see `flexget.db_tuning`
+        self.api_engine = None
+        self.db_settings = dict(db_tuning.DEFAULTS)
         self.lockfile = None
         self.database_uri = None
         self.db_upgraded = False
@@ -226,6 +230,7 @@ class Manager(object):
     def initialize(self):
         """
         Load plugins, database, and config. Also initializes (but does not start) the task queue and ipc server.
+        The amount of task queue workers is taken from the `task_queue` config key.
         This should only be called after obtaining a lock.
         """
         if self.initialized:
@@ -234,6 +239,10 @@ class Manager(object):
         plugin.load_plugins(
             extra_plugins=[os.path.join(self.config_base, 'plugins')],
             extra_components=[os.path.join(self.config_base, 'components')],
+            # Plugin modules are imported once used, unless running the tests
+            manifest_path=None
+            if self.unit_test
+            else os.path.join(self.config_base, '.plugin_manifest.json'),
         )
 
         # Reparse CLI options now that plugins are loaded
@@ -241,7 +250,6 @@ class Manager(object):
             self.args = ['--help']
         self.options = get_parser().parse_args(self.args)
 
-        self.task_queue = TaskQueue()
         self.ipc_server = IPCServer(self, self.options.ipc_port)
 
         self.setup_yaml()
@@ -253,6 +261,8 @@ class Manager(object):
             log.critical('Failed to load config file: %s' % e.args[0])
             raise
 
+        self.task_queue = TaskQueue(workers=get_workers(self.config))
+
         # cannot be imported at module level because of circular references
         from flexget.utils.simple_persistence import SimplePersistence
 
@@ -392,6 +402,9 @@ class Manager(object):
             db_test_filename = os.path.join(self.config_base, 'test-%s.sqlite' % self.config_name)
             if os.path.exists(self.db_filename):
                 shutil.copy(self.db_filename, db_test_filename)
+                # Changes not yet checkpointed from the write ahead log
+                if os.path.exists(self.db_filename + '-wal'):
+                    shutil.copy(self.db_filename + '-wal', db_test_filename + '-wal')
                 log.info('Test database created')
             self.db_filename = db_test_filename
         # No running process, we start our own to handle command
@@ -449,7 +462,7 @@ class Manager(object):
                     'Task queue has died unexpectedly. Restarting it. Please open an issue on Github and include'
                     ' any previous error logs.'
                 )
-                self.task_queue = TaskQueue()
+                self.task_queue = TaskQueue(workers=get_workers(self.config))
                 self.task_queue.start()
             if len(self.task_queue):
                 log.verbose('There is a task already running, execution queued.')
@@ -785,7 +798,13 @@ class Manager(object):
         if not config:
             config = self.config
         config = fire_event('manager.before_config_validate', config, self)
-        errors = config_schema.process_config(config)
+        if self.unit_test or not self.config_base:
+            errors = config_schema.process_config(config)
+        else:
+            cache_path = os.path.join(self.config_base, '.%s-validated' % self.config_name)
+            errors, config = config_schema.ValidationCache(cache_path).process_config(config)
+            # Validation results from the cache have not imported the plugins the config uses
+            plugin.load_config_plugins(config)
         if errors:
             err = ValueError('Did not pass schema validation.')
             err.errors = errors
@@ -814,13 +833,11 @@ class Manager(object):
         if self.db_filename and not os.path.exists(self.db_filename):
             log.verbose('Creating new database %s - DO NOT INTERUPT ...' % self.db_filename)
 
-        # fire up the engine
+        # fire up the engine, it is recreated if the config changes the database settings
         log.debug('Connecting to: %s' % self.database_uri)
         try:
-            self.engine = sqlalchemy.create_engine(
-                self.database_uri,
-                echo=self.options.debug_sql,
-                connect_args={'check_same_thread': False, 'timeout': 10},
+            self.engine = db_tuning.create_engine(
+                self.database_uri, self.db_settings, echo=self.options.debug_sql
             )
         except ImportError as e:
             print(
@@ -1051,12 +1068,17 @@ class Manager(object):
         if not self.unit_test:  # don't scroll "nosetests" summary results when logging is enabled
             log.debug('Shutting down')
         self.engine.dispose()
+        if self.api_engine:
+            self.api_engine.dispose()
         # remove temporary database used in test mode
         if self.options.test:
             if 'test' not in self.db_filename:
                 raise Exception('trying to delete non test database?')
             if self._has_lock:
                 os.remove(self.db_filename)
+                for suffix in ('-wal', '-shm'):
+                    if os.path.exists(self.db_filename + suffix):
+                        os.remove(self.db_filename + suffix)
                 log.info('Removed test database')
         global manager
         manager = None
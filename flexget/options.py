@@ -10,6 +10,7 @@ from argparse import (
     _VersionAction,
     Action,
     ArgumentError,
+    ArgumentTypeError,
     Namespace,
     PARSER,
     REMAINDER,
@@ -77,6 +78,17 @@ def required_length(nmin, nmax):
     return RequiredLength
 
 
+def positive_int(value):
+    """Argument type of whole numbers of 1 and higher, like amounts and page numbers."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise ArgumentTypeError('invalid int value: %r' % value)
+    if number < 1:
+        raise ArgumentTypeError('must be 1 or higher: %r' % value)
+    return number
+
+
 class VersionAction(_VersionAction):
     """Action to print the current version. Also checks latest release revision."""
 
@@ -3,12 +3,16 @@ from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 from future.moves.urllib.error import HTTPError, URLError
 from future.utils import python_2_unicode_compatible
 
+import json
 import logging
 import os
 import re
+import sys
+import threading
 import time
 import pkg_resources
-from functools import total_ordering
+from contextlib import contextmanager
+from functools import partial, total_ordering
 from http.client import BadStatusLine
 from importlib import import_module
 
@@ -18,8 +22,9 @@ from requests import RequestException
 from flexget import plugins as plugins_pkg
 from flexget import components as components_pkg
 from flexget import config_schema
+from flexget._version import __version__
 from flexget.event import add_event_handler as add_phase_handler
-from flexget.event import fire_event, remove_event_handlers
+from flexget.event import _events, fire_event, get_events, remove_event_handlers
 
 log = logging.getLogger('plugin')
 
@@ -194,6 +199,14 @@ _loaded_plugins = {}
 _plugin_options = []
 _new_phase_queue = {}
 
+# Plugins listed in the plugin manifest whose module has not been imported yet, name: manifest
+# record
+_lazy_plugins = {}
+_lazy_lock = threading.RLock()
+
+# Bumped whenever the format of the plugin manifest changes
+MANIFEST_VERSION = 1
+
 
 def register_task_phase(name, before=None, after=None):
     """
@@ -294,6 +307,8 @@ class PluginInfo(dict):
         self.plugin_class = plugin_class
         self.instance = None
 
+        # The plugin is not lazy anymore once its module has been imported
+        _lazy_plugins.pop(self.name, None)
         if self.name in plugins:
             PluginInfo.dupe_counter += 1
             log.critical(
@@ -430,6 +445,9 @@ def _check_phase_queue():
 
 
 def _import_plugin(module_name, plugin_path):
+    """
+    :returns: True if the module was imported
+    """
     try:
         import_module(module_name)
     except DependencyError as e:
@@ -456,52 +474,46 @@ def _import_plugin(module_name, plugin_path):
         raise
     else:
         log.trace('Loaded module %s from %s', module_name, plugin_path)
+        return True
+    return False
 
 
-def _load_plugins_from_dirs(dirs):
+def _find_modules(dirs, package):
     """
-    :param list dirs: Directories from where plugins are loaded from
+    :param list dirs: Directories where the modules of `package` are
+    :returns: List of (module name, path) tuples of all modules in `dirs`
     """
+    modules = []
+    for modules_dir in dirs:
+        for module_path in modules_dir.walkfiles('*.py'):
+            if module_path.name == '__init__.py':
+                continue
+            # Split the relative path from the plugins dir to current file's parent dir to find
+            # subpackage names
+            subpackages = [_f for _f in module_path.relpath(modules_dir).parent.splitall() if _f]
+            module_name = '.'.join([package.__name__] + subpackages + [module_path.stem])
+            modules.append((module_name, module_path))
+    return modules
+
 
+def _find_plugin_modules(dirs):
+    """
+    :param list dirs: Directories from where plugins are loaded from
+    """
     log.debug('Trying to load plugins from: %s', dirs)
     dirs = [Path(d) for d in dirs if os.path.isdir(d)]
     # add all dirs to plugins_pkg load path so that imports work properly from any of the plugin dirs
     plugins_pkg.__path__ = list(map(_strip_trailing_sep, dirs))
-    for plugins_dir in dirs:
-        for plugin_path in plugins_dir.walkfiles('*.py'):
-            if plugin_path.name == '__init__.py':
-                continue
-            # Split the relative path from the plugins dir to current file's parent dir to find subpackage names
-            plugin_subpackages = [
-                _f for _f in plugin_path.relpath(plugins_dir).parent.splitall() if _f
-            ]
-            module_name = '.'.join(
-                [plugins_pkg.__name__] + plugin_subpackages + [plugin_path.stem]
-            )
-            _import_plugin(module_name, plugin_path)
-    _check_phase_queue()
+    return _find_modules(dirs, plugins_pkg)
 
 
-# TODO: this is now identical to _load_plugins_from_dirs, REMOVE
-def _load_components_from_dirs(dirs):
+def _find_component_modules(dirs):
     """
     :param list dirs: Directories where plugin components are loaded from
     """
     log.debug('Trying to load components from: %s', dirs)
     dirs = [Path(d) for d in dirs if os.path.isdir(d)]
-    for component_dir in dirs:
-        for component_path in component_dir.walkfiles('*.py'):
-            if component_path.name == '__init__.py':
-                continue
-            # Split the relative path from the plugins dir to current file's parent dir to find subpackage names
-            plugin_subpackages = [
-                _f for _f in component_path.relpath(component_dir).parent.splitall() if _f
-            ]
-            package_name = '.'.join(
-                [components_pkg.__name__] + plugin_subpackages + [component_path.stem]
-            )
-            _import_plugin(package_name, component_path)
-    _check_phase_queue()
+    return _find_modules(dirs, components_pkg)
 
 
 def _load_plugins_from_packages():
@@ -538,12 +550,221 @@ def _load_plugins_from_packages():
     _check_phase_queue()
 
 
-def load_plugins(extra_plugins=None, extra_components=None):
+def _registrations():
+    """
+    :returns: Set of everything besides plugins which loading a plugin module could have
+        registered, used to find the modules which can be imported lazily.
+    """
+    from flexget.manager import Base
+
+    registrations = set(('phase', phase) for phase in task_phases)
+    registrations.update(('table', table) for table in Base.metadata.tables)
+    for path in config_schema.schema_paths:
+        if not path.startswith('/schema/plugin/'):
+            registrations.add(('schema', path))
+    for name, handlers in _events.items():
+        if name != 'plugin.register' and not name.startswith('plugin.'):
+            registrations.update(('event', name, handler.func) for handler in handlers)
+    return registrations
+
+
+class _ManifestRecorder(object):
+    """
+    Records which plugin modules do nothing else than registering plugins while loading all of
+    them.
+    """
+
+    def __init__(self):
+        self.imported = set()
+        # Modules which registered something else than plugins
+        self.impure = set()
+        # module name: names of the plugins it registered
+        self.plugins = {}
+
+    @contextmanager
+    def recording(self, module_name):
+        registrations = _registrations()
+        names = set(plugins)
+        yield
+        if _registrations() != registrations:
+            self.impure.add(module_name)
+        for name in set(plugins) - names:
+            self.plugins.setdefault(module_name, []).append(name)
+
+    def module_of(self, plugin_name):
+        for module_name, names in self.plugins.items():
+            if plugin_name in names:
+                return module_name
+
+    def manifest(self, files):
+        modules = {}
+        for module_name, names in self.plugins.items():
+            if module_name not in self.imported or module_name in self.impure:
+                continue
+            if any(plugins[name].builtin for name in names):
+                # Builtins are used by every task anyway
+                continue
+            modules[module_name] = [_manifest_record(plugins[name]) for name in names]
+        return {
+            'version': MANIFEST_VERSION,
+            'flexget': __version__,
+            'python': list(sys.version_info[:3]),
+            'files': files,
+            'modules': modules,
+        }
+
+
+def _manifest_record(plugin):
+    return {
+        'name': plugin.name,
+        'phases': list(plugin.phase_handlers),
+        'interfaces': plugin.interfaces,
+        'debug': plugin.debug,
+        'api_ver': plugin.api_ver,
+        'category': plugin.category,
+    }
+
+
+def _module_files(modules):
+    """
+    :returns: Dict with the modification time and size of every module, to tell if a manifest is up
+        to date
+    """
+    files = {}
+    for module_name, module_path in modules:
+        stat = os.stat(module_path)
+        files[module_name] = [stat.st_mtime, stat.st_size]
+    return files
+
+
+def _read_manifest(path, files):
+    """:returns: The plugin manifest at `path`, or None if it does not exist or is outdated"""
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (IOError, ValueError) as e:
+        log.debug('Could not read plugin manifest %s: %s', path, e)
+        return None
+    if (
+        manifest.get('version') != MANIFEST_VERSION
+        or manifest.get('flexget') != __version__
+        or manifest.get('python') != list(sys.version_info[:3])
+        or manifest.get('files') != files
+    ):
+        log.debug('Plugin manifest %s is outdated', path)
+        return None
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    try:
+        with open(path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+    except IOError as e:
+        log.debug('Could not write plugin manifest %s: %s', path, e)
+    else:
+        log.debug('Wrote plugin manifest %s', path)
+
+
+def _register_plugins(recorder=None):
+    """Registers and initializes the plugins of all newly imported modules."""
+    if recorder is None:
+        fire_event('plugin.register')
+    elif 'plugin.register' in _events:
+        for handler in get_events('plugin.register'):
+            with recorder.recording(handler.func.__module__):
+                handler()
+    # Plugins should only be registered once, remove their handlers after
+    remove_event_handlers('plugin.register')
+    # After they have all been registered, instantiate them
+    for plugin in list(plugins.values()):
+        if plugin.instance is not None:
+            continue
+        if recorder is None:
+            plugin.initialize()
+        else:
+            with recorder.recording(recorder.module_of(plugin.name)):
+                plugin.initialize()
+
+
+def _lazy_schema(name, **kwargs):
+    return get_plugin_by_name(name).schema
+
+
+def _hash_plugin_schemas(manifest):
+    """
+    Hashes the schemas of the plugins in `manifest` by their module, whether it has been imported
+    yet or not.
+    """
+    for module_name, records in manifest['modules'].items():
+        for record in records:
+            path = '/schema/plugin/%s' % record['name']
+            config_schema.schema_hashes[path] = manifest['files'][module_name]
+
+
+def _register_lazy_plugins(manifest):
+    for module_name, records in manifest['modules'].items():
+        for record in records:
+            _lazy_plugins[record['name']] = dict(record, module=module_name)
+            path = '/schema/plugin/%s' % record['name']
+            config_schema.register_schema(path, partial(_lazy_schema, record['name']))
+    _hash_plugin_schemas(manifest)
+
+
+def load_plugin(name):
+    """
+    Makes sure plugin `name` has been imported, plugins listed in the plugin manifest are only
+    imported once used.
+
+    :param string name: Name of the plugin
+    """
+    if name not in _lazy_plugins:
+        return
+    with _lazy_lock:
+        record = _lazy_plugins.get(name)
+        if record is None:
+            return
+        module_name = record['module']
+        log.debug('Importing module %s of plugin %s', module_name, name)
+        _import_plugin(module_name, module_name)
+        _register_plugins()
+        # Forget the plugins which the module did not register after all, e.g. because of missing
+        # dependencies
+        for other, other_record in list(_lazy_plugins.items()):
+            if other_record['module'] == module_name:
+                del _lazy_plugins[other]
+                config_schema.schema_paths.pop('/schema/plugin/%s' % other, None)
+
+
+def load_config_plugins(config):
+    """
+    Imports the plugins listed in the plugin manifest which are used anywhere in `config`, like
+    validating the config does through the $refs to their schemas.
+    """
+    items = [config]
+    while items and _lazy_plugins:
+        item = items.pop()
+        if isinstance(item, dict):
+            for key, value in item.items():
+                if key in _lazy_plugins:
+                    load_plugin(key)
+                items.append(value)
+        elif isinstance(item, list):
+            items.extend(item)
+
+
+def load_plugins(extra_plugins=None, extra_components=None, manifest_path=None):
     """
     Load plugins from the standard plugin and component paths.
 
+    With `manifest_path` the modules which do nothing else than registering plugins are only
+    imported once one of their plugins is used. Which modules these are and what their plugins are
+    is stored in the plugin manifest, which is (re)built by importing all the modules if it does
+    not exist yet or any of the modules have changed.
+
     :param list extra_plugins: Extra directories from where plugins are loaded.
     :param list extra_components: Extra directories from where components are loaded.
+    :param string manifest_path: Path of the plugin manifest file.
     """
     global plugins_loaded
 
@@ -557,24 +778,84 @@ def load_plugins(extra_plugins=None, extra_components=None):
     extra_components.extend(_get_standard_components_path())
 
     start_time = time.time()
+    plugin_modules = _find_plugin_modules(extra_plugins)
+    component_modules = _find_component_modules(extra_components)
+
+    manifest = recorder = None
+    if manifest_path:
+        files = _module_files(plugin_modules + component_modules)
+        manifest = _read_manifest(manifest_path, files)
+        if manifest is None:
+            recorder = _ManifestRecorder()
+        else:
+            _register_lazy_plugins(manifest)
+    lazy_modules = manifest['modules'] if manifest else {}
+
     # Import all the plugins
-    _load_plugins_from_dirs(extra_plugins)
-    _load_components_from_dirs(extra_components)
+    for modules in (plugin_modules, component_modules):
+        for module_name, module_path in modules:
+            if module_name in lazy_modules:
+                continue
+            if recorder is None:
+                _import_plugin(module_name, module_path)
+            else:
+                with recorder.recording(module_name):
+                    if _import_plugin(module_name, module_path):
+                        recorder.imported.add(module_name)
+        _check_phase_queue()
     _load_plugins_from_packages()
     # Register them
-    fire_event('plugin.register')
-    # Plugins should only be registered once, remove their handlers after
-    remove_event_handlers('plugin.register')
-    # After they have all been registered, instantiate them
-    for plugin in list(plugins.values()):
-        plugin.initialize()
+    _register_plugins(recorder)
+    if recorder is not None:
+        manifest = recorder.manifest(files)
+        _write_manifest(manifest_path, manifest)
+        # The same schema hash as when loading with this manifest, so validation results stay valid
+        _hash_plugin_schemas(manifest)
     took = time.time() - start_time
     plugins_loaded = True
     log.debug(
-        'Plugins took %.2f seconds to load. %s plugins in registry.', took, len(plugins.keys())
+        'Plugins took %.2f seconds to load. %s plugins in registry, %s more not imported yet.',
+        took,
+        len(plugins),
+        len(_lazy_plugins),
     )
 
 
+def _find_plugins(phase=None, interface=None, category=None, name=None, min_api=None):
+    """
+    :returns: Tuple of a list of the matching loaded plugins and a list of the names of the
+        matching plugins which have not been imported yet.
+    """
+    if phase is not None and phase not in phase_methods:
+        raise ValueError('Unknown phase %s' % phase)
+
+    def matches(plugin_name, phases, interfaces, plugin_category, api_ver):
+        if phase and phase not in phases:
+            return False
+        if interface and interface not in interfaces:
+            return False
+        if category and not category == plugin_category:
+            return False
+        if name is not None and name != plugin_name:
+            return False
+        if min_api is not None and api_ver < min_api:
+            return False
+        return True
+
+    loaded = [
+        p
+        for p in list(plugins.values())
+        if matches(p.name, p.phase_handlers, p.interfaces, p.category, p.api_ver)
+    ]
+    with _lazy_lock:
+        lazy = [
+            r['name']
+            for r in _lazy_plugins.values()
+            if matches(r['name'], r['phases'], r['interfaces'], r['category'], r['api_ver'])
+        ]
+    return loaded, lazy
+
+
 def get_plugins(phase=None, interface=None, category=None, name=None, min_api=None):
     """
     Query other plugins characteristics.
@@ -587,30 +868,22 @@ def get_plugins(phase=None, interface=None, category=None, name=None, min_api=No
     :return: List of PluginInfo instances.
     :rtype: list
     """
-
-    def matches(plugin):
-        if phase is not None and phase not in phase_methods:
-            raise ValueError('Unknown phase %s' % phase)
-        if phase and phase not in plugin.phase_handlers:
-            return False
-        if interface and interface not in plugin.interfaces:
-            return False
-        if category and not category == plugin.category:
-            return False
-        if name is not None and name != plugin.name:
-            return False
-        if min_api is not None and plugin.api_ver < min_api:
-            return False
-        return True
-
-    return filter(matches, iter(plugins.values()))
+    loaded, lazy = _find_plugins(phase, interface, category, name, min_api)
+    for plugin_name in lazy:
+        load_plugin(plugin_name)
+    loaded.extend(plugins[plugin_name] for plugin_name in lazy if plugin_name in plugins)
+    return iter(loaded)
 
 
 def plugin_schemas(**kwargs):
     """Create a dict schema that matches plugins specified by `kwargs`"""
+    # Plugins which have not been imported yet are only imported once their schema is used
+    loaded, lazy = _find_plugins(**kwargs)
+    refs = dict((p.name, {'$ref': p.schema['id']}) for p in loaded)
+    refs.update((plugin_name, {'$ref': '/schema/plugin/%s' % plugin_name}) for plugin_name in lazy)
     return {
         'type': 'object',
-        'properties': dict((p.name, {'$ref': p.schema['id']}) for p in get_plugins(**kwargs)),
+        'properties': refs,
         'additionalProperties': False,
         'error_additionalProperties': '{{message}} Only known plugin names are valid keys.',
         'patternProperties': {'^_': {'title': 'Disabled Plugin'}},
@@ -643,6 +916,7 @@ def get_plugin_by_name(name, issued_by='???'):
 
     :returns PluginInfo instance
     """
+    load_plugin(name)
     if name not in plugins:
         raise DependencyError(issued_by=issued_by, missing=name)
     return plugins[name]
@@ -655,6 +929,7 @@ def get(name, requested_by):
     :param requested_by: Plugin class instance OR string value who is making the request.
     :return: Instance of Plugin class
     """
+    load_plugin(name)
     if name not in plugins:
         if hasattr(requested_by, 'plugin_info'):
             who = requested_by.plugin_info.name
@@ -7,7 +7,7 @@ import sys
 from flexget import options
 from flexget.event import event
 from flexget.terminal import console
-from flexget.plugin import plugins
+from flexget.plugin import DependencyError, get_plugin_by_name
 
 log = logging.getLogger('doc')
 
@@ -40,7 +40,10 @@ def trim(docstring):
 
 def print_doc(manager, options):
     plugin_name = options.doc
-    plugin = plugins.get(plugin_name, None)
+    try:
+        plugin = get_plugin_by_name(plugin_name)
+    except DependencyError:
+        plugin = None
     if plugin:
         if not plugin.instance.__doc__:
             console('Plugin %s does not have documentation' % plugin_name)
@@ -0,0 +1,65 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from itertools import islice
+
+from flexget import options
+from flexget.event import event
+from flexget.options import positive_int
+from flexget.terminal import console
+from flexget.utils.log_index import LogFilter, get_log_index, parse_time
+
+
+def do_cli(manager, options):
+    log_filter = LogFilter(
+        start=options.start, end=options.end, task=options.task, level=options.level
+    )
+    lines = get_log_index(manager).search(log_filter)
+    if options.search:
+        search = options.search.lower()
+        lines = (line for line in lines if search in line.lower())
+    start = (options.page - 1) * options.limit
+    found = list(islice(lines, start, start + options.limit))
+    if not found:
+        console('No matching log lines found.')
+        return
+    for line in reversed(found):
+        console(line)
+
+
+@event('options.register')
+def register_parser_arguments():
+    parser = options.register_command(
+        'logs', do_cli, help='Search the log file and its rotated files, newest lines first'
+    )
+    parser.add_argument('--task', metavar='TASK', help='Only lines of %(metavar)s')
+    parser.add_argument(
+        '--level',
+        choices=['critical', 'error', 'warning', 'info', 'verbose', 'debug', 'trace'],
+        help='Only lines of this level and higher',
+    )
+    parser.add_argument(
+        '--start',
+        type=parse_time,
+        metavar='TIME',
+        help='Only lines logged since %(metavar)s, YYYY-MM-DD HH:MM or a part of it',
+    )
+    parser.add_argument(
+        '--end',
+        type=parse_time,
+        metavar='TIME',
+        help='Only lines logged until %(metavar)s, YYYY-MM-DD HH:MM or a part of it',
+    )
+    parser.add_argument('--search', metavar='TEXT', help='Only lines containing %(metavar)s')
+    parser.add_argument(
+        '--limit',
+        type=positive_int,
+        default=50,
+        help='Amount of lines to show, default: %(default)s',
+    )
+    parser.add_argument(
+        '--page',
+        type=positive_int,
+        default=1,
+        help='Page of found lines to show, counting back from the newest, default: %(default)s',
+    )
@@ -57,6 +57,12 @@ class TransmissionBase(object):
                 log.error('netrc: %s, file: %s, line: %s' % (e.msg, e.filename, e.lineno))
         return config
 
+    def task_resources(self, task, config):
+        """Tasks talking to the same transmission daemon are not run concurrently."""
+        if not isinstance(config, dict):
+            config = {}
+        return ['transmission:%s:%s' % (config.get('host', 'localhost'), config.get('port', 9091))]
+
     def create_rpc_client(self, config):
         user, password = config.get('username'), config.get('password')
 
@@ -4,6 +4,9 @@ from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 import datetime
 import logging
 import random
+import threading
+import time
+from collections import defaultdict
 
 from sqlalchemy import Column, Integer, DateTime, Unicode, Index
 
@@ -11,7 +14,12 @@ from flexget import options, plugin
 from flexget import db_schema
 from flexget.event import event
 from flexget.manager import Session
-from flexget.utils.tools import parse_timedelta, multiply_timedelta, aggregate_inputs
+from flexget.utils.tools import (
+    parse_timedelta,
+    multiply_timedelta,
+    aggregate_inputs,
+    timedelta_total_seconds,
+)
 
 log = logging.getLogger('discover')
 Base = db_schema.versioned_base('discover', 0)
@@ -51,6 +59,43 @@ def db_cleanup(manager, session):
         session.delete(discover_entry)
 
 
+class SearchStats(object):
+    """Thread safe counters about the searches done by each search plugin."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.backends = defaultdict(lambda: defaultdict(int))
+
+    def record(self, plugin_name, key, amount=1):
+        with self.lock:
+            self.backends[plugin_name][key] += amount
+
+    def log(self):
+        for plugin_name, backend in sorted(self.backends.items()):
+            log.verbose(
+                '%s: %s searches, %s results, %s errors, %s timeouts, %.2f seconds',
+                plugin_name,
+                backend['searches'],
+                backend['results'],
+                backend['errors'],
+                backend['timeouts'],
+                backend['seconds'],
+            )
+
+
+class SearchThreads(object):
+    """
+    Keeps track of the search threads of every task across runs. Searches which timed out are no
+    longer waited for, but their threads keep taking up one of the `concurrency` slots of the task
+    until they actually finish, so hanging search plugins cannot make the amount of threads grow.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        # Task name -> threads of searches which timed out and are still running
+        self.abandoned = defaultdict(set)
+
+
 class Discover(object):
     """
     Discover content based on other inputs material.
@@ -64,6 +109,10 @@ class Discover(object):
           - piratebay
         interval: [1 hours|days|weeks]
         release_estimations: [strict|loose|ignore]
+        concurrency: [number of searches running at once, default 1]
+        search_timeout: [give up waiting for a single search after e.g. 2 minutes]
+        search_timeouts:
+          [search plugin name]: [timeout for the searches of this plugin instead]
     """
 
     schema = {
@@ -99,11 +148,20 @@ class Discover(object):
                 ]
             },
             'limit': {'type': 'integer', 'minimum': 1},
+            'concurrency': {'type': 'integer', 'minimum': 1, 'default': 1},
+            'search_timeout': {'type': 'string', 'format': 'interval'},
+            'search_timeouts': {
+                'type': 'object',
+                'additionalProperties': {'type': 'string', 'format': 'interval'},
+            },
         },
         'required': ['what', 'from'],
         'additionalProperties': False,
     }
 
+    def __init__(self):
+        self.search_threads = SearchThreads()
+
     def execute_searches(self, config, entries, task):
         """
         :param config: Discover plugin config
@@ -112,9 +170,8 @@ class Discover(object):
         :return: List of entries found from search engines listed under `from` configuration
         """
 
-        result = []
+        searches = []
         for index, entry in enumerate(entries):
-            entry_results = []
             for item in config['from']:
                 if isinstance(item, dict):
                     plugin_name, plugin_config = list(item.items())[0]
@@ -124,35 +181,30 @@ class Discover(object):
                 if not callable(getattr(search, 'search')):
                     log.critical('Search plugin %s does not implement search method', plugin_name)
                     continue
-                log.verbose(
-                    'Searching for `%s` with plugin `%s` (%i of %i)',
-                    entry['title'],
-                    plugin_name,
-                    index + 1,
-                    len(entries),
-                )
-                try:
-                    search_results = search.search(task=task, entry=entry, config=plugin_config)
-                    if not search_results:
-                        log.debug('No results from %s', plugin_name)
-                        continue
-                    log.debug('Discovered %s entries from %s', len(search_results), plugin_name)
-                    if config.get('limit'):
-                        search_results = search_results[: config['limit']]
-                    for e in search_results:
-                        e['discovered_from'] = entry['title']
-                        e['discovered_with'] = plugin_name
-                        # 'search_results' can be any iterable, make sure it's a list.
-                        e.on_complete(
-                            self.entry_complete, query=entry, search_results=list(search_results)
-                        )
-
-                    entry_results.extend(search_results)
-
-                except plugin.PluginWarning as e:
-                    log.verbose('No results from %s: %s', plugin_name, e)
-                except plugin.PluginError as e:
-                    log.error('Error searching with %s: %s', plugin_name, e)
+                searches.append((index, entry, plugin_name, search, plugin_config))
+
+        entry_searches = [[] for _ in entries]
+        search_results = self.run_searches(config, searches, task, len(entries))
+        for (index, _, plugin_name, _, _), results in zip(searches, search_results):
+            entry_searches[index].append((plugin_name, results))
+
+        result = []
+        for entry, searched in zip(entries, entry_searches):
+            entry_results = []
+            for plugin_name, search_results in searched:
+                if not search_results:
+                    continue
+                if config.get('limit'):
+                    search_results = search_results[: config['limit']]
+                for e in search_results:
+                    e['discovered_from'] = entry['title']
+                    e['discovered_with'] = plugin_name
+                    # 'search_results' can be any iterable, make sure it's a list.
+                    e.on_complete(
+                        self.entry_complete, query=entry, search_results=list(search_results)
+                    )
+
+                entry_results.extend(search_results)
             if not entry_results:
                 log.verbose('No search results for `%s`', entry['title'])
                 entry.complete()
@@ -161,6 +213,147 @@ class Discover(object):
 
         return result
 
+    def search(self, task, entry, plugin_name, search, plugin_config, stats):
+        """
+        Runs a single search and records it in `stats`.
+
+        :return: List of found entries, or None
+        """
+        start = time.time()
+        search_results = None
+        try:
+            search_results = search.search(task=task, entry=entry, config=plugin_config)
+            if not search_results:
+                log.debug('No results from %s', plugin_name)
+                search_results = None
+            else:
+                search_results = list(search_results)
+                log.debug('Discovered %s entries from %s', len(search_results), plugin_name)
+        except plugin.PluginWarning as e:
+            log.verbose('No results from %s: %s', plugin_name, e)
+        except plugin.PluginError as e:
+            log.error('Error searching with %s: %s', plugin_name, e)
+            stats.record(plugin_name, 'errors')
+        stats.record(plugin_name, 'searches')
+        stats.record(plugin_name, 'results', len(search_results or []))
+        stats.record(plugin_name, 'seconds', time.time() - start)
+        return search_results
+
+    def run_searches(self, config, searches, task, entry_count):
+        """
+        Runs `searches`, up to `concurrency` of them at once. Searches taking longer than their
+        timeout, from `search_timeouts` or else `search_timeout`, are given up on, their results
+        are ignored.
+
+        Search plugins should use `task.requests`, domain limiters are shared by all the searches.
+
+        :param searches: List of (entry index, entry, plugin name, search plugin, plugin config)
+            tuples
+        :return: List of search results, in the same order as `searches`
+        """
+        stats = SearchStats()
+        results = [None] * len(searches)
+        concurrency = config.get('concurrency', 1)
+        timeouts = []
+        for _, _, plugin_name, _, _ in searches:
+            timeout = config.get('search_timeouts', {}).get(plugin_name)
+            timeout = timeout or config.get('search_timeout')
+            timeouts.append(timedelta_total_seconds(parse_timedelta(timeout)) if timeout else None)
+
+        def run(position):
+            index, entry, plugin_name, search, plugin_config = searches[position]
+            log.verbose(
+                'Searching for `%s` with plugin `%s` (%i of %i)',
+                entry['title'],
+                plugin_name,
+                index + 1,
+                entry_count,
+            )
+            return self.search(task, entry, plugin_name, search, plugin_config, stats)
+
+        if concurrency == 1 and not any(timeouts):
+            for position in range(len(searches)):
+                results[position] = run(position)
+            stats.log()
+            return results
+
+        def give_up(position, reason):
+            _, entry, plugin_name, _, _ = searches[position]
+            log.warning(
+                'Search for `%s` with `%s` %s, ignoring it', entry['title'], plugin_name, reason
+            )
+            stats.record(plugin_name, 'timeouts')
+
+        # Searches are started from this thread, each in its own thread, at most `concurrency` at
+        # once including the searches of earlier runs which timed out and are still running
+        condition = self.search_threads.condition
+        abandoned = self.search_threads.abandoned[task.name]
+        done = {}
+
+        @task.thread_target
+        def worker(position):
+            search_results = None
+            try:
+                search_results = run(position)
+            except Exception as e:
+                _, entry, plugin_name, _, _ = searches[position]
+                log.error('Error searching `%s` with %s: %s', entry['title'], plugin_name, e)
+                log.debug('Search failed', exc_info=True)
+                stats.record(plugin_name, 'errors')
+            finally:
+                # The search always counts as done, otherwise waiting for it would never end
+                with condition:
+                    done[position] = search_results
+                    abandoned.discard(threading.current_thread())
+                    condition.notify_all()
+
+        pending = list(range(len(searches)))
+        # position -> (thread, start time)
+        running = {}
+        blocked_since = None
+        with condition:
+            while True:
+                now = time.time()
+                for position, (thread, started) in list(running.items()):
+                    if position in done:
+                        results[position] = done.pop(position)
+                        del running[position]
+                    elif timeouts[position] and now - started > timeouts[position]:
+                        give_up(position, 'did not finish within %s seconds' % timeouts[position])
+                        abandoned.add(thread)
+                        del running[position]
+                while pending and len(running) + len(abandoned) < concurrency:
+                    position = pending.pop(0)
+                    thread = threading.Thread(
+                        target=worker,
+                        args=(position,),
+                        name='discover-%s-%s' % (task.name, position),
+                    )
+                    thread.daemon = True
+                    running[position] = (thread, now)
+                    thread.start()
+                if not pending and not running:
+                    break
+                deadlines = [
+                    started + timeouts[position]
+                    for position, (_, started) in running.items()
+                    if timeouts[position]
+                ]
+                if pending and not running:
+                    # All slots are taken by searches which timed out before
+                    blocked_since = blocked_since or now
+                    if timeouts[pending[0]]:
+                        if now - blocked_since > timeouts[pending[0]]:
+                            give_up(pending.pop(0), 'found no free slot, searches are hanging')
+                            blocked_since = now
+                            continue
+                        deadlines.append(blocked_since + timeouts[pending[0]])
+                else:
+                    blocked_since = None
+                condition.wait(max(0, min(deadlines) - now) + 0.01 if deadlines else None)
+        stats.log()
+        return results
+
     def entry_complete(self, entry, query=None, search_results=None, **kwargs):
         """Callback for Entry"""
         if entry.accepted:
@@ -10,6 +10,7 @@ import xml.sax
 import posixpath
 import http.client
 from datetime import datetime
+from xml.parsers import expat
 
 import dateutil.parser
 
@@ -207,6 +208,79 @@ class InputRSS(object):
             future_result.append(char)
         return b''.join(future_result)
 
+    def cut_seen_items(self, content, last_entry_id):
+        """
+        Cuts feed `content` off before the item which was the newest one in the last run, so only
+        the new items need to be parsed. The items are only scanned for their dates, the feed is
+        only cut when all of its items are dated and sorted newest first.
+
+        :param last_entry_id: Title and guid of the last seen item
+        :return: Content with only the new items, or None if the item was not found or the feed is
+            not newest first
+        """
+        if content.startswith((b'\xff\xfe', b'\xfe\xff')):
+            # Closing tags are added in ascii
+            return None
+        parser = expat.ParserCreate()
+        # Names of the open elements
+        stack = []
+        state = {'item_start': None, 'date': None, 'sorted': True, 'cut': None}
+        item = {}
+
+        def local_name(name):
+            return name.rpartition(':')[2]
+
+        def start(name, attrs):
+            if local_name(name) in ('item', 'entry') and state['item_start'] is None:
+                state['item_start'] = parser.CurrentByteIndex
+                state['item_depth'] = len(stack)
+                item.clear()
+            stack.append(name)
+
+        def data(text):
+            if state['item_start'] is not None and len(stack) == state['item_depth'] + 2:
+                field = local_name(stack[-1])
+                item[field] = item.get(field, '') + text
+
+        def end(name):
+            stack.pop()
+            if state['item_start'] is None or len(stack) != state['item_depth']:
+                return
+            date = None
+            for field in ('pubDate', 'published', 'updated'):
+                if item.get(field):
+                    try:
+                        date = dateutil.parser.parse(item[field])
+                    except (ValueError, OverflowError):
+                        pass
+                    break
+            try:
+                # An item newer than the one before it could be missed when cutting the feed
+                if date is None or (state['date'] is not None and date > state['date']):
+                    state['sorted'] = False
+            except TypeError:
+                # Dates with and without timezone
+                state['sorted'] = False
+            state['date'] = date
+            guid = item.get('guid', item.get('id', ''))
+            entry_id = item.get('title', '').strip() + guid.strip()
+            if state['cut'] is None and entry_id == last_entry_id:
+                closing_tags = ''.join('</%s>' % name for name in reversed(stack))
+                state['cut'] = content[: state['item_start']] + closing_tags.encode('ascii')
+            state['item_start'] = None
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = data
+        try:
+            parser.Parse(content, True)
+        except expat.ExpatError:
+            return None
+        if state['cut'] is not None and not state['sorted']:
+            log.debug('Feed is not sorted newest first, parsing all of it')
+            return None
+        return state['cut']
+
     def add_enclosure_info(self, entry, enclosure, filename=True, multiple=False):
         """Stores information from an rss enclosure into an Entry."""
         entry['url'] = enclosure['href']
@@ -335,6 +409,20 @@ class InputRSS(object):
         if config.get('escape'):
             log.debug("Trying to escape unescaped in RSS")
             content = self.escape_content(content)
+        last_entry_id = ''
+        seen_items_cut = False
+        if not all_entries:
+            last_entry_id = task.simple_persistence.get('%s_last_entry' % url_hash)
+            if last_entry_id and config['title'] == 'title':
+                new_content = self.cut_seen_items(content, last_entry_id)
+                if new_content is not None:
+                    log.debug(
+                        'Parsing %s of %s bytes with the items since last run',
+                        len(new_content),
+                        len(content),
+                    )
+                    content = new_content
+                    seen_items_cut = True
         try:
             rss = feedparser.parse(content)
         except LookupError as e:
@@ -386,7 +474,11 @@ class InputRSS(object):
 
         log.debug('encoding %s', rss.encoding)
 
-        last_entry_id = ''
+        if seen_items_cut and not rss.entries:
+            log.verbose('Not processing entries from last run.')
+            # Let details plugin know that it is ok if this task doesn't produce any entries
+            task.no_entries_ok = True
+
         if not all_entries:
             # Test to make sure entries are in descending order
             if (
@@ -397,7 +489,6 @@ class InputRSS(object):
                 if rss.entries[0]['published_parsed'] < rss.entries[-1]['published_parsed']:
                     # Sort them if they are not
                     rss.entries.sort(key=lambda x: x['published_parsed'], reverse=True)
-            last_entry_id = task.simple_persistence.get('%s_last_entry' % url_hash)
 
         # new entries to be created
         entries = []
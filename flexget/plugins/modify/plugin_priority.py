@@ -31,7 +31,8 @@ class PluginPriority(object):
         for name, priority in config.items():
             names.append(name)
             originals = self.priorities.setdefault(name, {})
-            for phase, phase_event in plugin.plugins[name].phase_handlers.items():
+            info = plugin.get_plugin_by_name(name, issued_by='plugin_priority')
+            for phase, phase_event in info.phase_handlers.items():
                 originals[phase] = phase_event.priority
                 log.debug('stored %s original value %s' % (phase, phase_event.priority))
                 phase_event.priority = priority
@@ -46,8 +47,9 @@ class PluginPriority(object):
         for name in list(config.keys()):
             names.append(name)
             originals = self.priorities[name]
+            info = plugin.get_plugin_by_name(name, issued_by='plugin_priority')
             for phase, priority in originals.items():
-                plugin.plugins[name].phase_handlers[phase].priority = priority
+                info.phase_handlers[phase].priority = priority
         log.debug('Restored priority for: %s' % ', '.join(names))
         self.priorities = {}
 
@@ -56,7 +56,7 @@ class DisablePlugin(object):
             if p in task.config:
                 disabled.append(p)
                 del (task.config[p])
-            # Disable built-in plugins.
+            # Disable built-in plugins, these are never imported lazily.
             if p in plugin.plugins and plugin.plugins[p].builtin:
                 plugin.plugins[p].builtin = False
                 self.disabled_builtins.append(p)
@@ -78,7 +78,7 @@ class DisablePlugin(object):
             return
 
         for name in self.disabled_builtins:
-            plugin.plugins[name].builtin = True
+            plugin.get_plugin_by_name(name).builtin = True
         log.debug('Re-enabled builtin plugin(s): %s' % ', '.join(self.disabled_builtins))
         self.disabled_builtins = []
 
@@ -0,0 +1,42 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+
+from flexget import plugin
+from flexget.event import event
+
+log = logging.getLogger('parallel_inputs')
+
+DEFAULT_THREADS = 4
+
+
+class ParallelInputs(object):
+    """
+    Runs the input plugins of the task concurrently. Entries are still added in the order the input
+    plugins would have been run one after another.
+
+    Example::
+
+      parallel_inputs: yes
+
+    Or with the maximum amount of inputs running at once::
+
+      parallel_inputs: 8
+    """
+
+    schema = {'oneOf': [{'type': 'boolean'}, {'type': 'integer', 'minimum': 1}]}
+
+    @plugin.priority(plugin.PRIORITY_FIRST)
+    def on_task_start(self, task, config):
+        if config is True:
+            config = DEFAULT_THREADS
+        elif config is False:
+            config = 0
+        log.debug('running input plugins with %s threads', config)
+        task.parallel_inputs = config
+
+
+@event('plugin.register')
+def register_plugin():
+    plugin.register(ParallelInputs, 'parallel_inputs', api_ver=2)
@@ -24,7 +24,7 @@ class Rerun(object):
         task.lock_reruns()
 
     def on_task_input(self, task, config):
-        task.rerun()
+        task.rerun(fresh_input=True)
 
 
 @event('plugin.register')
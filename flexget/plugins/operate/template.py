@@ -1,12 +1,13 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import copy
 import logging
 
 from flexget import options, plugin
 from flexget.config_schema import register_config_key
 from flexget.event import event
-from flexget.utils.tools import MergeException
+from flexget.utils.tools import MergeException, merge_dict_from_to
 
 plugin_name = 'template'
 log = logging.getLogger(plugin_name)
@@ -60,16 +61,12 @@ class PluginTemplate(object):
             config = [config]
         return config
 
-    @plugin.priority(257)
-    def on_task_prepare(self, task, config):
-        if config is False:  # handles 'template: no' form to turn off template on this task
-            return
-        # implements --template NAME
-        if task.options.template:
-            if not config or task.options.template not in config:
-                task.abort('does not use `%s` template' % task.options.template, silent=True)
-
-        config = self.prepare_config(config)
+    def templates(self, task, config):
+        """
+        Generator of the names and configs of the templates to merge into `task`, nested templates
+        included.
+        """
+        config = list(self.prepare_config(config))
 
         # add global in except when disabled with no_global
         if 'no_global' in config:
@@ -81,7 +78,6 @@ class PluginTemplate(object):
 
         toplevel_templates = task.manager.config.get('templates', {})
 
-        # apply templates
         for template in config:
             if template not in toplevel_templates:
                 if template == 'global':
@@ -92,7 +88,6 @@ class PluginTemplate(object):
             if toplevel_templates[template] is None:
                 log.warning('Template `%s` is empty. Nothing to merge.' % template)
                 continue
-            log.debug('Merging template %s into task %s' % (template, task.name))
 
             # We make a copy here because we need to remove
             template_config = toplevel_templates[template]
@@ -108,7 +103,37 @@ class PluginTemplate(object):
                 # Replace template_config with a copy without the template key, to avoid merging errors
                 template_config = dict(template_config)
                 del template_config['template']
+            yield template, template_config
+
+        log.trace('templates: %s', config)
+
+    def task_resources(self, task, config):
+        """Resources of the plugins in the task config with the templates merged into it."""
+        if config is False:
+            return []
+        merged = copy.deepcopy(task.config)
+        try:
+            for _, template_config in self.templates(task, config):
+                merge_dict_from_to(copy.deepcopy(template_config), merged)
+        except (plugin.PluginError, MergeException):
+            # The task fails when merging them in the prepare phase
+            return []
+        # Merged already
+        merged[plugin_name] = False
+        return task.config_resources(merged)
 
+    @plugin.priority(257)
+    def on_task_prepare(self, task, config):
+        if config is False:  # handles 'template: no' form to turn off template on this task
+            return
+        # implements --template NAME
+        if task.options.template:
+            if not config or task.options.template not in config:
+                task.abort('does not use `%s` template' % task.options.template, silent=True)
+
+        # apply templates
+        for template, template_config in self.templates(task, config):
+            log.debug('Merging template %s into task %s' % (template, task.name))
             # Merge
             try:
                 task.merge_config(template_config)
@@ -118,8 +143,6 @@ class PluginTemplate(object):
                     % (template, task.name, exc.value)
                 )
 
-        log.trace('templates: %s', config)
-
 
 @event('plugin.register')
 def register_plugin():
@@ -12,14 +12,14 @@ from functools import wraps, total_ordering
 from sqlalchemy import Column, Integer, String, Unicode
 
 from flexget import config_schema, db_schema
-from flexget.entry import EntryUnicodeError
+from flexget.entry import Entry, EntryUnicodeError
 from flexget.event import event, fire_event
-from flexget.logger import capture_output
+from flexget.logger import capture_output, get_local_context, use_local_context
 from flexget.manager import Session
 from flexget.plugin import plugins as all_plugins
 from flexget.plugin import (
     DependencyError,
-    get_plugins,
+    load_plugin,
     phase_methods,
     plugin_schemas,
     PluginError,
@@ -262,19 +262,27 @@ class Task(object):
         self.abort_reason = None
         self.silent_abort = False
 
-        self.session = None
+        # `session` and `current_plugin` are tracked per thread while input plugins run in parallel
+        self._local = threading.local()
+        self._session = None
+        self._current_plugin = None
+        self._resources = None
+        # Amount of threads used for input plugins, set by the `parallel_inputs` plugin
+        self.parallel_inputs = 0
 
         self.requests = requests.Session()
 
         # List of all entries in the task
         self._all_entries = EntryContainer()
         self._rerun = False
+        self._rerun_fresh_input = False
+        # Entries produced by the input phase, restored for reruns instead of running input again
+        self._input_snapshot = None
 
         self.disabled_phases = []
 
         # current state
         self.current_phase = None
-        self.current_plugin = None
 
     @property
     def max_reruns(self):
@@ -311,6 +319,65 @@ class Task(object):
     def rerun_count(self):
         return self._rerun_count
 
+    @property
+    def session(self):
+        """Database session of the currently running plugin."""
+        return getattr(self._local, 'session', self._session)
+
+    @session.setter
+    def session(self, value):
+        if hasattr(self._local, 'session'):
+            self._local.session = value
+        else:
+            self._session = value
+
+    @property
+    def current_plugin(self):
+        """Name of the currently running plugin."""
+        return getattr(self._local, 'current_plugin', self._current_plugin)
+
+    @current_plugin.setter
+    def current_plugin(self, value):
+        if hasattr(self._local, 'current_plugin'):
+            self._local.current_plugin = value
+        else:
+            self._current_plugin = value
+
+    @property
+    def resources(self):
+        """
+        Set of resource names this task needs exclusive access to while running. Tasks sharing a
+        resource are never executed concurrently by the task queue.
+
+        A task always holds a resource for its own name. Configured plugins may declare more
+        resources by implementing ``task_resources(task, config)``, returning an iterable of
+        resource names. A resource ``kind:*`` stands for all resources ``kind:<name>``, for plugins
+        which only know what they need once the task runs.
+        """
+        if self._resources is None:
+            resources = self.config_resources(self.config)
+            resources.add('task:%s' % self.name)
+            self._resources = frozenset(resources)
+        return self._resources
+
+    def config_resources(self, config):
+        """
+        :param dict config: Config of this task, e.g. with templates merged into it.
+        :returns: Set of the resources declared by the plugins configured in `config`.
+        """
+        resources = set()
+        for name in list(config):
+            load_plugin(name)
+        for plugin in list(all_plugins.values()):
+            declare = getattr(plugin.instance, 'task_resources', None)
+            if declare is None or not (plugin.name in config or plugin.builtin):
+                continue
+            try:
+                resources.update(declare(self, copy.deepcopy(config.get(plugin.name))))
+            except Exception as e:
+                log.error('Failed to get resources of plugin %s: %s', plugin.name, e)
+        return resources
+
     @property
     def undecided(self):
         """
@@ -425,13 +492,49 @@ class Task(object):
         :return:
           An iterator over configured :class:`flexget.plugin.PluginInfo` instances enabled on this task.
         """
+        self._load_plugins()
         if phase:
+            return self._phase_plugins(phase)
+        return (p for p in list(all_plugins.values()) if p.name in self.config or p.builtin)
+
+    def _load_plugins(self):
+        """
+        Plugins listed in the plugin manifest are only imported once a task uses them.
+
+        :returns: True if any plugins were imported
+        """
+        count = len(all_plugins)
+        for name in list(self.config):
+            load_plugin(name)
+        return len(all_plugins) != count
+
+    def _phase_plugins(self, phase):
+        """
+        Generator of the plugins enabled on `phase`, in phase order. Plugins added to the config
+        while the phase runs, e.g. by templates or includes in the prepare phase, are imported and
+        included from then on.
+        """
+        done = set()
+        priority = None
+        while True:
             plugins = sorted(
-                get_plugins(phase=phase), key=lambda p: p.phase_handlers[phase], reverse=True
+                (p for p in list(all_plugins.values()) if phase in p.phase_handlers),
+                key=lambda p: p.phase_handlers[phase],
+                reverse=True,
             )
-        else:
-            plugins = iter(all_plugins.values())
-        return (p for p in plugins if p.name in self.config or p.builtin)
+            for p in plugins:
+                if p.name in done or not (p.name in self.config or p.builtin):
+                    continue
+                if priority is not None and p.phase_handlers[phase].priority > priority:
+                    # Its turn has passed already
+                    continue
+                done.add(p.name)
+                priority = p.phase_handlers[phase].priority
+                yield p
+                if self._load_plugins():
+                    break
+            else:
+                return
 
     def __run_task_phase(self, phase):
         """Executes task phase, ie. call all enabled plugins on the task.
@@ -439,6 +542,7 @@ class Task(object):
         Fires events:
 
         * task.execute.before_plugin
+        * task.execute.input_entries (input phase only, with the entries produced by the plugin)
         * task.execute.after_plugin
 
         :param string phase: Name of the phase
@@ -465,40 +569,103 @@ class Task(object):
                                 % phase
                             )
 
+        if phase == 'input' and self.parallel_inputs > 1:
+            plugins = list(self.plugins(phase))
+            if len(plugins) > 1:
+                self.__run_input_phase_parallel(plugins)
+                return
+
         for plugin in self.plugins(phase):
             # Abort this phase if one of the plugins disables it
             if phase in self.disabled_phases:
                 return
-            # store execute info, except during entry events
-            self.current_phase = phase
-            self.current_plugin = plugin.name
-
-            if plugin.api_ver == 1:
-                # backwards compatibility
-                # pass method only task (old behaviour)
-                args = (self,)
-            else:
-                # pass method task, copy of config (so plugin cannot modify it)
-                args = (self, copy.copy(self.config.get(plugin.name)))
-
-            # Hack to make task.session only active for a single plugin
-            with Session() as session:
-                self.session = session
-                try:
-                    fire_event('task.execute.before_plugin', self, plugin.name)
-                    response = self.__run_plugin(plugin, phase, args)
-                    if phase == 'input' and response:
-                        # add entries returned by input to self.all_entries
-                        for e in response:
-                            e.task = self
-                            self.all_entries.append(e)
-                finally:
-                    fire_event('task.execute.after_plugin', self, plugin.name)
-                self.session = None
+            response = self.__run_phase_plugin(plugin, phase)
+            if phase == 'input' and response:
+                self.__add_input_entries(response)
         # check config hash for changes at the end of 'prepare' phase
         if phase == 'prepare':
             self.check_config_hash()
 
+    def __run_phase_plugin(self, plugin, phase):
+        """
+        Runs single plugin of a task phase with its own database session, returns the plugin
+        response.
+        """
+        # store execute info, except during entry events
+        self.current_phase = phase
+        self.current_plugin = plugin.name
+
+        if plugin.api_ver == 1:
+            # backwards compatibility
+            # pass method only task (old behaviour)
+            args = (self,)
+        else:
+            # pass method task, copy of config (so plugin cannot modify it)
+            args = (self, copy.copy(self.config.get(plugin.name)))
+
+        # Hack to make task.session only active for a single plugin
+        with Session() as session:
+            self.session = session
+            try:
+                fire_event('task.execute.before_plugin', self, plugin.name)
+                response = self.__run_plugin(plugin, phase, args)
+                if phase == 'input' and response:
+                    # Input plugins may return generators, consume them while the plugin session is
+                    # active
+                    response = list(response)
+                    fire_event('task.execute.input_entries', self, plugin.name, response)
+                return response
+            finally:
+                fire_event('task.execute.after_plugin', self, plugin.name)
+                self.session = None
+
+    def __add_input_entries(self, entries):
+        """Add entries returned by input to self.all_entries"""
+        for e in entries:
+            e.task = self
+            self.all_entries.append(e)
+
+    def __run_input_phase_parallel(self, plugins):
+        """
+        Runs input plugins in up to :attr:`parallel_inputs` threads. Entries are added once all of
+        them are done, in the same order as they would have been added running the plugins one
+        after another.
+        """
+        responses = [None] * len(plugins)
+        errors = [None] * len(plugins)
+        pending = list(enumerate(plugins))
+        lock = threading.Lock()
+
+        @self.thread_target
+        def worker():
+            while True:
+                with lock:
+                    if not pending or self.aborted or 'input' in self.disabled_phases:
+                        return
+                    index, plugin = pending.pop(0)
+                try:
+                    responses[index] = self.__run_phase_plugin(plugin, 'input')
+                except Exception as e:
+                    errors[index] = e
+
+        thread_name = threading.current_thread().name
+        workers = [
+            threading.Thread(target=worker, name='%s-input-%s' % (thread_name, i))
+            for i in range(min(self.parallel_inputs, len(plugins)))
+        ]
+        log.debug('running %s input plugins in %s threads', len(plugins), len(workers))
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        for error in errors:
+            if error is not None:
+                raise error
+        for response in responses:
+            if response:
+                self.__add_input_entries(response)
+
     def __run_plugin(self, plugin, phase, args=None, kwargs=None):
         """
         Execute given plugins phase method, with supplied args and kwargs.
@@ -559,13 +726,38 @@ class Task(object):
             traceback = self.manager.crash_report()
             self.abort(msg, traceback=traceback)
 
-    def rerun(self, plugin=None, reason=None):
+    def thread_target(self, func):
+        """
+        Wraps `func` to be run in another thread on behalf of this task. The thread inherits the
+        logging context and current plugin of the calling thread, and gets its own :attr:`session`
+        while `func` runs.
+        """
+        log_context = get_local_context()
+        current_plugin = self.current_plugin
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._local.current_plugin = current_plugin
+            with use_local_context(log_context), Session() as session:
+                self._local.session = session
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._local.session = None
+
+        return wrapper
+
+    def rerun(self, plugin=None, reason=None, fresh_input=False):
         """
         Immediately re-run the task after execute has completed,
         task can be re-run up to :attr:`.max_reruns` times.
 
+        Reruns get the entries of the first input phase again, without running input plugins.
+
         :param str plugin: Plugin name
         :param str reason: Why the rerun is done
+        :param bool fresh_input: Run the input phase again, for when input plugins produce other
+            entries on rerun
         """
         msg = 'Plugin {0} has requested task to be ran again after execution has completed.'.format(
             self.current_plugin if plugin is None else plugin
@@ -578,6 +770,8 @@ class Task(object):
         else:
             log.info(msg)
         self._rerun = True
+        if fresh_input:
+            self._rerun_fresh_input = True
 
     def config_changed(self):
         """
@@ -615,6 +809,33 @@ class Task(object):
                 last_hash.hash = config_hash
                 self.config_changed()
 
+    def __take_input_snapshot(self):
+        """
+        Remembers the entries produced by the input phase, with their `after_input` snapshots and
+        hooks.
+        """
+        self._input_snapshot = []
+        for entry in self.all_entries:
+            snapshot = entry.snapshots.get('after_input')
+            if snapshot is None:
+                # Snapshots are taken by backlog, without them reruns have to run input again
+                log.debug('no input snapshot of `%s`, reruns will run input phase', entry['title'])
+                self._input_snapshot = None
+                return
+            hooks = dict((action, list(funcs)) for action, funcs in entry._hooks.items())
+            self._input_snapshot.append((snapshot, hooks))
+
+    def __restore_input_snapshot(self):
+        """Adds the entries of the first input phase to this rerun."""
+        log.debug('restoring %s entries from the input phase', len(self._input_snapshot))
+        entries = []
+        for snapshot, hooks in self._input_snapshot:
+            entry = Entry(snapshot).clone()
+            entry.snapshots['after_input'] = snapshot
+            entry._hooks = dict((action, list(funcs)) for action, funcs in hooks.items())
+            entries.append(entry)
+        self.__add_input_entries(entries)
+
     def _execute(self):
         """Executes the task without rerunning."""
         if not self.enabled:
@@ -633,7 +854,7 @@ class Task(object):
         if self.options.inject:
             # If entries are passed for this execution (eg. rerun), disable the input phase
             self.disable_phase('input')
-            self.all_entries.extend(copy.deepcopy(self.options.inject))
+            self.all_entries.extend(entry.clone() for entry in self.options.inject)
 
         # run phases
         try:
@@ -654,12 +875,16 @@ class Task(object):
                     log.debug('skipping phase %s during rerun', phase)
                 elif phase == 'exit' and self._rerun and self._rerun_count < self.max_reruns:
                     log.debug('not running task_exit yet because task will rerun')
+                elif phase == 'input' and self.is_rerun and self._input_snapshot is not None:
+                    self.__restore_input_snapshot()
                 else:
                     # run all plugins with this phase
                     self.__run_task_phase(phase)
                     if phase == 'start':
                         # Store a copy of the config state after start phase to restore for reruns
                         self.prepared_config = copy.deepcopy(self.config)
+                    elif phase == 'input':
+                        self.__take_input_snapshot()
         except TaskAbort:
             try:
                 self.__run_task_phase('abort')
@@ -699,10 +924,11 @@ class Task(object):
                 ):
                     log.info('Rerunning the task in case better resolution can be achieved.')
                     self._rerun_count += 1
-                    # TODO: Potential optimization is to take snapshots (maybe make the ones backlog uses built in
-                    # instead of taking another one) after input and just inject the same entries for the rerun
                     self._all_entries = EntryContainer()
+                    if self._rerun_fresh_input:
+                        self._input_snapshot = None
                     self._rerun = False
+                    self._rerun_fresh_input = False
                     continue
                 elif self._rerun:
                     log.info(
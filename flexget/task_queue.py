@@ -9,56 +9,145 @@ import time
 
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
+from flexget.config_schema import register_config_key
+from flexget.event import event
 from flexget.task import TaskAbort
 
 log = logging.getLogger('task_queue')
 
+DEFAULT_WORKERS = 1
+MAX_WORKERS = 32
+
+
+def conflicting_resources(resources, held):
+    """
+    :returns: The resources of `resources` which conflict with the `held` ones. A resource `kind:*`
+        conflicts with all resources of that kind.
+    """
+    conflicts = resources & held
+    for resource in resources:
+        kind, _, name = resource.partition(':')
+        if name == '*':
+            conflicts |= set(other for other in held if other.startswith(kind + ':'))
+        elif kind + ':*' in held:
+            conflicts |= {resource}
+    return conflicts
+
 
 class TaskQueue(object):
     """
-    Task processing thread.
-    Only executes one task at a time, if more are requested they are queued up and run in turn.
+    Task processing threads.
+    Executes up to `workers` tasks at a time, if more are requested they are queued up and run in
+    turn.
+
+    Two tasks which declare the same resource (see :attr:`flexget.task.Task.resources`) are never
+    run at the same time, a task whose resources are busy waits until they are released while
+    other tasks may overtake it.
     """
 
-    def __init__(self):
+    def __init__(self, workers=DEFAULT_WORKERS):
         self.run_queue = queue.PriorityQueue()
         self._shutdown_now = False
         self._shutdown_when_finished = False
 
-        self.current_task = None
+        self.workers = max(1, min(int(workers), MAX_WORKERS))
+        self.running_tasks = []
+        # Tasks pulled from `run_queue` which could not be started because their resources were
+        # busy
+        self.waiting_tasks = []
+        self._held_resources = set()
+        self._lock = threading.Lock()
 
         # We don't override `threading.Thread` because debugging this seems unsafe with pydevd.
         # Overriding __len__(self) seems to cause a debugger deadlock.
-        self._thread = threading.Thread(target=self.run, name='task_queue')
-        self._thread.daemon = True
+        self._threads = []
+        for num in range(self.workers):
+            name = 'task_queue' if not num else 'task_queue-%s' % num
+            thread = threading.Thread(target=self.run, name=name)
+            thread.daemon = True
+            self._threads.append(thread)
+        # Kept for backwards compatibility, the first worker thread
+        self._thread = self._threads[0]
+
+    @property
+    def current_task(self):
+        """The first of the currently running tasks, or None."""
+        running = self.running_tasks
+        return running[0] if running else None
 
     def start(self):
-        self._thread.start()
+        for thread in self._threads:
+            thread.start()
+
+    def _acquire(self, task):
+        """
+        Marks resources of `task` as held. Returns False if any of them is already held. Requires
+        `_lock`.
+        """
+        resources = task.resources
+        if conflicting_resources(resources, self._held_resources):
+            return False
+        self._held_resources |= resources
+        self.running_tasks.append(task)
+        return True
+
+    def _release(self, task):
+        with self._lock:
+            self._held_resources -= task.resources
+            self.running_tasks.remove(task)
+
+    def _next_task(self):
+        """Returns the next task which can be started right now, or None if there is none."""
+        with self._lock:
+            for task in sorted(self.waiting_tasks):
+                if self._acquire(task):
+                    self.waiting_tasks.remove(task)
+                    return task
+        try:
+            task = self.run_queue.get(timeout=0.5)
+        except queue.Empty:
+            return None
+        with self._lock:
+            if self._acquire(task):
+                return task
+            log.debug(
+                'task %s is waiting for resources %s'
+                % (
+                    task.name,
+                    ', '.join(sorted(conflicting_resources(task.resources, self._held_resources))),
+                )
+            )
+            self.waiting_tasks.append(task)
+        return None
 
     def run(self):
         while not self._shutdown_now:
-            # Grab the first job from the run queue and do it
-            try:
-                self.current_task = self.run_queue.get(timeout=0.5)
-            except queue.Empty:
-                if self._shutdown_when_finished:
+            # Grab the first runnable job from the run queue and do it
+            task = self._next_task()
+            if task is None:
+                if self._shutdown_when_finished and not len(self) and not self.running_tasks:
                     self._shutdown_now = True
                 continue
             try:
-                self.current_task.execute()
+                task.execute()
             except TaskAbort as e:
-                log.debug('task %s aborted: %r' % (self.current_task.name, e))
+                log.debug('task %s aborted: %r' % (task.name, e))
             except (ProgrammingError, OperationalError):
                 log.critical('Database error while running a task. Attempting to recover.')
-                self.current_task.manager.crash_report()
+                task.manager.crash_report()
             except Exception:
                 log.critical('BUG: Unhandled exception during task queue run loop.')
-                self.current_task.manager.crash_report()
+                task.manager.crash_report()
             finally:
+                self._release(task)
                 self.run_queue.task_done()
-                self.current_task = None
 
-        remaining_jobs = self.run_queue.qsize()
+        if threading.current_thread() is not self._thread:
+            return
+        # Report remaining jobs once all workers have stopped
+        for thread in self._threads[1:]:
+            thread.join()
+        remaining_jobs = len(self)
         if remaining_jobs:
             log.warning(
                 'task queue shut down with %s tasks remaining in the queue to run.'
@@ -68,14 +157,14 @@ class TaskQueue(object):
             log.debug('task queue shut down')
 
     def is_alive(self):
-        return self._thread.is_alive()
+        return any(thread.is_alive() for thread in self._threads)
 
     def put(self, task):
         """Adds a task to be executed to the queue."""
         self.run_queue.put(task)
 
     def __len__(self):
-        return self.run_queue.qsize()
+        return self.run_queue.qsize() + len(self.waiting_tasks)
 
     def shutdown(self, finish_queue=True):
         """
@@ -86,31 +175,57 @@ class TaskQueue(object):
         log.debug('task queue shutdown requested')
         if finish_queue:
             self._shutdown_when_finished = True
-            if self.run_queue.qsize():
+            if len(self):
                 log.verbose(
                     'There are %s tasks to execute. Shutdown will commence when they have completed.'
-                    % self.run_queue.qsize()
+                    % len(self)
                 )
         else:
             self._shutdown_now = True
 
     def wait(self):
         """
-        Waits for the thread to exit.
+        Waits for the threads to exit.
         Allows abortion of task queue with ctrl-c
         """
         if sys.version_info >= (3, 4):
             # Due to python bug, Thread.is_alive doesn't seem to work properly under our conditions on python 3.4+
             # http://bugs.python.org/issue26793
             # TODO: Is it important to have the clean abortion? Do we need to find a better way?
-            self._thread.join()
+            for thread in self._threads:
+                thread.join()
             return
         try:
-            while self._thread.is_alive():
+            while self.is_alive():
                 time.sleep(0.5)
         except KeyboardInterrupt:
-            log.error('Got ctrl-c, shutting down after running task (if any) completes')
+            log.error('Got ctrl-c, shutting down after running tasks (if any) complete')
             self.shutdown(finish_queue=False)
             # We still wait to finish cleanly, pressing ctrl-c again will abort
-            while self._thread.is_alive():
+            while self.is_alive():
                 time.sleep(0.5)
+
+
+task_queue_config_schema = {
+    'oneOf': [
+        {'type': 'integer', 'minimum': 1, 'maximum': MAX_WORKERS},
+        {
+            'type': 'object',
+            'properties': {'workers': {'type': 'integer', 'minimum': 1, 'maximum': MAX_WORKERS}},
+            'additionalProperties': False,
+        },
+    ]
+}
+
+
+def get_workers(config):
+    """Returns the amount of worker threads from the root level `task_queue` config."""
+    queue_config = config.get('task_queue') or {}
+    if isinstance(queue_config, int):
+        queue_config = {'workers': queue_config}
+    return queue_config.get('workers', DEFAULT_WORKERS)
+
+
+@event('config.register')
+def register_config():
+    register_config_key('task_queue', task_queue_config_schema)
@@ -131,3 +131,30 @@ class TestServerAPI(object):
         assert not errors
 
         assert len(data) == 2
+
+    def test_log(self, api_client, manager, tmpdir):
+        log_file = tmpdir.join('flexget.log')
+        log_file.write(
+            ''.join(
+                '2019-05-01 10:%02d INFO     logger        %-15s message %s\n'
+                % (minute, 'tv' if minute % 2 else '', minute)
+                for minute in range(10)
+            )
+        )
+        manager.options.logfile = log_file.strpath
+
+        rsp = api_client.get('/server/log/?task=tv&lines=2&page=2')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        assert [line['message'] for line in data['stream'][:-1]] == ['message 3', 'message 5']
+        assert data['stream'][0]['task'] == 'tv'
+
+        rsp = api_client.get('/server/log/?search=message&start=2019-05-01 10:08')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        assert [line['message'] for line in data['stream'][:-1]] == ['message 8', 'message 9']
+
+        rsp = api_client.get('/server/log/?start=2019-05')
+        assert rsp.status_code == 200
+        rsp = api_client.get('/server/log/?start=yesterday')
+        assert rsp.status_code == 400
@@ -0,0 +1,119 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import pytest
+
+from flexget import plugin
+from flexget.components.archive import db
+from flexget.entry import Entry
+from flexget.manager import Session
+
+
+class TestArchiveSearch(object):
+    config = """
+        tasks:
+          archive:
+            mock:
+              - {title: 'Some.Show.S01E01.720p-FlexGet', url: 'http://localhost/1'}
+              - {title: 'Some.Show.S01E02.720p-FlexGet', url: 'http://localhost/2'}
+              - title: 'Some.Show.S01E02.720p.HDTV.Extra.Words-FlexGet'
+                url: 'http://localhost/3'
+              - {title: 'Other.Show.S01E02', url: 'http://localhost/4'}
+            archive: [tag]
+          archive_more:
+            mock:
+              - {title: 'Some.Show.S01E03.720p-FlexGet', url: 'http://localhost/5'}
+            archive: [tag]
+    """
+
+    def titles(self, text, **kwargs):
+        with Session() as session:
+            return [entry.title for entry in db.search(session, text, **kwargs)]
+
+    @pytest.fixture(params=['fts', 'tokens'])
+    def index(self, request, execute_task, monkeypatch):
+        if request.param == 'tokens':
+            monkeypatch.setattr(db, 'has_fts_index', lambda connection: False)
+        execute_task('archive')
+        with Session() as session:
+            assert db.has_fts_index(session.connection()) == (request.param == 'fts')
+        return request.param
+
+    def test_search(self, index):
+        assert self.titles('some show s01e02') == [
+            'Some.Show.S01E02.720p-FlexGet',
+            'Some.Show.S01E02.720p.HDTV.Extra.Words-FlexGet',
+        ]
+        results = self.titles('show s01')
+        assert results[0] == 'Other.Show.S01E02'
+        assert len(results) == 4
+        assert self.titles('show s01', tags=['tag'], start=1, stop=3) == results[1:3]
+        assert self.titles('show', tags=['other']) == []
+        assert self.titles('"show*') == self.titles('show')
+        assert self.titles('...') == []
+
+    def test_index_updates(self, index):
+        with Session() as session:
+            entry = session.query(db.ArchiveEntry).filter(db.ArchiveEntry.url.endswith('/4')).one()
+            entry.title = 'Renamed.S01E02'
+        assert self.titles('renamed') == ['Renamed.S01E02']
+        assert self.titles('other') == []
+        with Session() as session:
+            query = session.query(db.ArchiveEntry)
+            entry = query.filter(db.ArchiveEntry.title == 'Renamed.S01E02')
+            session.delete(entry.one())
+        assert self.titles('renamed') == []
+
+    def set_fts_module(self, old, new):
+        """Changes the module of the FTS5 table, to act like an SQLite without FTS5."""
+        with Session() as session:
+            connection = session.connection()
+            version = connection.execute('PRAGMA schema_version').scalar()
+            connection.execute('PRAGMA writable_schema = ON')
+            connection.execute(
+                "UPDATE sqlite_master SET sql = replace(sql, 'USING %s', 'USING %s') "
+                "WHERE name = '%s'" % (old, new, db.FTS_TABLE)
+            )
+            connection.execute('PRAGMA schema_version = %d' % (version + 1))
+            connection.execute('PRAGMA writable_schema = OFF')
+            connection.info.pop('archive_fts', None)
+
+    def test_without_fts(self, execute_task):
+        execute_task('archive')
+        self.set_fts_module('fts5', 'missing')
+        execute_task('archive_more')
+        with Session() as session:
+            assert not db.has_fts_index(session.connection())
+            entry = session.query(db.ArchiveEntry).filter(db.ArchiveEntry.url.endswith('/4'))
+            entry.first().title = 'Renamed.S01E02'
+        assert self.titles('renamed') == ['Renamed.S01E02']
+        assert self.titles('s01e03') == ['Some.Show.S01E03.720p-FlexGet']
+        assert len(self.titles('some show')) == 4
+        # The index is created again once FTS5 is available
+        self.set_fts_module('missing', 'fts5')
+        with Session() as session:
+            assert db.has_fts_index(session.connection())
+        assert self.titles('renamed') == ['Renamed.S01E02']
+        assert len(self.titles('some show')) == 4
+
+    def test_search_interface(self, execute_task):
+        execute_task('archive')
+        search = plugin.get('flexget_archive', 'test').search
+        results = search(task=None, entry=Entry(title='Some Show (S01E01)'), config=['tag'])
+        assert [entry['url'] for entry in results] == ['http://localhost/1']
+        # Titles have to start with the search text, not just contain its words
+        results = search(task=None, entry=Entry(title='Show S01E02'), config=True)
+        assert not results
+        results = search(task=None, entry=Entry(title='some.show s01e02'), config=True)
+        assert sorted(entry['url'] for entry in results) == [
+            'http://localhost/2',
+            'http://localhost/3',
+        ]
+
+    def test_title_start(self, index):
+        assert len(self.titles('show s01e02')) == 3
+        assert self.titles('show s01e02', title_start=True) == []
+        assert self.titles('Some Show', title_start=True, start=1, stop=3) == [
+            'Some.Show.S01E02.720p-FlexGet',
+            'Some.Show.S01E02.720p.HDTV.Extra.Words-FlexGet',
+        ]
@@ -3,7 +3,9 @@ from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 from argparse import Action
 
-from flexget.options import ArgumentParser
+import pytest
+
+from flexget.options import ArgumentParser, ParserError, positive_int
 
 
 def test_subparser_nested_namespace():
@@ -62,3 +64,12 @@ def test_post_defaults():
     # Custom action should be allowed to set default
     result = p.parse_args(['--custom'])
     assert result.post_set == 'custom'
+
+
+def test_positive_int():
+    p = ArgumentParser()
+    p.add_argument('--page', type=positive_int, default=1)
+    assert p.parse_args(['--page', '2']).page == 2
+    for value in ['0', '-1', 'a']:
+        with pytest.raises(ParserError):
+            p.parse_args(['--page', value], raise_errors=True)
@@ -1,8 +1,11 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import copy
 from datetime import timedelta
+
 import jsonschema
+import pytest
 
 from flexget import config_schema
 
@@ -257,3 +260,55 @@ class TestFormatParsers(object):
         failures = self._test_parser(config_schema.parse_percent, percent_tests)
 
         assert not failures, '%s failures:\n%s' % (len(failures), '\n'.join(failures))
+
+
+class TestValidationCache(object):
+    @pytest.fixture()
+    def cache(self, tmpdir):
+        return config_schema.ValidationCache(tmpdir.join('validated').strpath)
+
+    @pytest.fixture()
+    def validated_tasks(self, monkeypatch):
+        """Names of the tasks passed on to validation, for every validation."""
+        validated_tasks = []
+        process_config = config_schema.process_config
+
+        def recording_process_config(config, *args, **kwargs):
+            validated_tasks.append(sorted(config['tasks']))
+            return process_config(config, *args, **kwargs)
+
+        monkeypatch.setattr(config_schema, 'process_config', recording_process_config)
+        return validated_tasks
+
+    def test_only_changed_tasks_are_validated(self, cache, validated_tasks):
+        config = {'tasks': {'a': {'mock': [{'title': 'a'}]}, 'b': {'mock': [{'title': 'b'}]}}}
+        errors, validated = cache.process_config(copy.deepcopy(config))
+        assert not errors
+        assert validated_tasks == [['a', 'b']]
+
+        errors, unchanged = cache.process_config(copy.deepcopy(config))
+        assert not errors
+        assert unchanged == validated
+        assert validated_tasks == [['a', 'b']]
+
+        config['tasks']['b']['mock'].append({'title': 'c'})
+        errors, changed = cache.process_config(copy.deepcopy(config))
+        assert not errors
+        assert validated_tasks == [['a', 'b'], ['b']]
+        assert changed['tasks']['a'] == validated['tasks']['a']
+        assert len(changed['tasks']['b']['mock']) == 2
+
+    def test_errors_are_not_cached(self, cache):
+        config = {'tasks': {'a': {'mock': 'not a list'}}}
+        assert cache.process_config(copy.deepcopy(config))[0]
+        assert cache.process_config(copy.deepcopy(config))[0]
+
+    def test_paths_are_checked_again(self, cache, tmpdir, validated_tasks):
+        path = tmpdir.mkdir('downloads')
+        config = {'tasks': {'a': {'download': path.strpath}}}
+        assert not cache.process_config(copy.deepcopy(config))[0]
+        assert not cache.process_config(copy.deepcopy(config))[0]
+        assert len(validated_tasks) == 1
+
+        path.remove()
+        assert cache.process_config(copy.deepcopy(config))[0]
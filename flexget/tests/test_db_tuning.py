@@ -0,0 +1,71 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import pytest
+
+from flexget.db_tuning import get_settings, DEFAULTS
+from flexget.manager import Session
+from .conftest import MockManager
+
+
+@pytest.yield_fixture()
+def manager(request, config, tmpdir):
+    # Tuning only applies to database files
+    db_uri = 'sqlite:///%s' % tmpdir.join('test.sqlite').strpath
+    mockmanager = MockManager(config, request.cls.__name__, db_uri=db_uri)
+    yield mockmanager
+    mockmanager.shutdown()
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute('PRAGMA %s' % name).scalar()
+
+
+class TestDefaultSettings(object):
+    config = """
+        tasks: {}
+    """
+
+    def test_defaults(self, manager):
+        assert manager.db_settings == DEFAULTS
+        assert pragma(manager.engine, 'journal_mode') == 'wal'
+        # normal
+        assert pragma(manager.engine, 'synchronous') == 1
+        assert manager.api_engine is None
+
+
+class TestCustomSettings(object):
+    config = """
+        database:
+          journal_mode: delete
+          synchronous: full
+          cache_size: 4 MiB
+          busy_timeout: 5 seconds
+          api_pool_size: 2
+        tasks:
+          test:
+            mock:
+              - title: foo
+            accept_all: yes
+    """
+
+    def test_settings(self, manager, execute_task):
+        assert pragma(manager.engine, 'journal_mode') == 'delete'
+        # full
+        assert pragma(manager.engine, 'synchronous') == 2
+        assert pragma(manager.engine, 'cache_size') == -4096
+        assert pragma(manager.engine, 'busy_timeout') == 5000
+        assert manager.api_engine is not None
+        assert pragma(manager.api_engine, 'synchronous') == 2
+        # The session is bound to the new engine
+        task = execute_task('test')
+        assert len(task.accepted) == 1
+        with Session() as session:
+            assert session.bind is manager.engine
+
+    def test_get_settings(self):
+        settings = get_settings({'database': {'mmap_size': '1 MiB', 'busy_timeout': '1 minute'}})
+        assert settings['mmap_size'] == 1024 ** 2
+        assert settings['busy_timeout'] == 60
+        assert settings['synchronous'] == DEFAULTS['synchronous']
@@ -1,6 +1,8 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import threading
+import time
 from datetime import datetime, timedelta
 
 from flexget.entry import Entry
@@ -11,6 +13,7 @@ class SearchPlugin(object):
     """
     Fake search plugin. Result differs depending on config value:
       `'fail'`: raises a PluginError
+      `'crash'`: raises a KeyError, like a plugin with a bug
       `False`: Returns an empty list
       otherwise: Just passes back the entry that was searched for
     """
@@ -22,12 +25,30 @@ class SearchPlugin(object):
             return []
         elif config == 'fail':
             raise plugin.PluginError('search plugin failure')
+        elif config == 'crash':
+            raise KeyError('search plugin crash')
         return [Entry(entry)]
 
 
 plugin.register(SearchPlugin, 'test_search', interfaces=['search'], api_ver=2)
 
 
+class SlowSearchPlugin(object):
+    """
+    Fake search plugin which sleeps for `config` seconds before passing back the entry searched
+    for.
+    """
+
+    schema = {'type': 'number'}
+
+    def search(self, task, entry, config=None):
+        time.sleep(config)
+        return [Entry(entry, title='%s %s' % (entry['title'], config))]
+
+
+plugin.register(SlowSearchPlugin, 'test_slow_search', interfaces=['search'], api_ver=2)
+
+
 class EstRelease(object):
     """Fake release estimate plugin. Just returns 'est_release' entry field."""
 
@@ -240,3 +261,113 @@ class TestEmitSeriesInDiscover(object):
         )
         task = execute_task('test_next_series_seasons')
         assert task.find_entry(title='My Show 2 S03')
+
+
+class TestDiscoverConcurrency(object):
+    config = """
+        templates:
+          global:
+            disable: builtins
+        tasks:
+          test_concurrency:
+            discover:
+              release_estimations: ignore
+              concurrency: 4
+              what:
+              - mock:
+                - title: Foo
+                - title: Bar
+              from:
+              - test_slow_search: 0.4
+              - test_slow_search: 0.2
+          test_search_timeout:
+            discover:
+              release_estimations: ignore
+              concurrency: 2
+              search_timeout: 1 seconds
+              what:
+              - mock:
+                - title: Foo
+              from:
+              - test_slow_search: 3
+              - test_slow_search: 0.1
+          test_search_crash:
+            discover:
+              release_estimations: ignore
+              concurrency: 2
+              what:
+              - mock:
+                - title: Foo
+              from:
+              - test_search: crash
+              - test_slow_search: 0.1
+          test_backend_timeout:
+            discover:
+              release_estimations: ignore
+              concurrency: 2
+              search_timeout: 10 seconds
+              search_timeouts:
+                test_slow_search: 1 seconds
+              what:
+              - mock:
+                - title: Foo
+              from:
+              - test_slow_search: 3
+              - test_search: yes
+          test_hanging_searches:
+            discover:
+              release_estimations: ignore
+              search_timeout: 1 seconds
+              what:
+              - mock:
+                - title: Foo
+              from:
+              - test_slow_search: 3
+    """
+
+    def test_concurrency(self, execute_task):
+        start = time.time()
+        task = execute_task('test_concurrency')
+        # All four searches ran at the same time
+        assert time.time() - start < 1.2
+        # Results keep the order of the searched entries and search plugins
+        assert [e['title'] for e in task.entries] == [
+            'Foo 0.4',
+            'Foo 0.2',
+            'Bar 0.4',
+            'Bar 0.2',
+        ]
+
+    def test_search_timeout(self, execute_task):
+        start = time.time()
+        task = execute_task('test_search_timeout')
+        assert time.time() - start < 2.5
+        assert [e['title'] for e in task.entries] == ['Foo 0.1']
+
+    def test_search_crash(self, execute_task):
+        # The other searches still finish, the task does not wait for the crashed one forever
+        task = execute_task('test_search_crash')
+        assert [e['title'] for e in task.entries] == ['Foo 0.1']
+
+    def test_backend_timeout(self, execute_task):
+        start = time.time()
+        task = execute_task('test_backend_timeout')
+        assert time.time() - start < 2.5
+        assert [e['title'] for e in task.entries] == ['Foo']
+
+    def test_hanging_searches(self, execute_task):
+        def threads():
+            return [
+                thread
+                for thread in threading.enumerate()
+                if thread.name.startswith('discover-test_hanging_searches-')
+            ]
+
+        execute_task('test_hanging_searches')
+        assert len(threads()) == 1
+        # The hanging search of the first run still takes up the only slot
+        start = time.time()
+        task = execute_task('test_hanging_searches', options={'discover_now': True})
+        assert time.time() - start < 1.8
+        assert not task.entries
+        assert len(threads()) == 1
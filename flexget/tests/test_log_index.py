@@ -0,0 +1,151 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import io
+import json
+import os
+
+import pytest
+
+from flexget.utils import log_index
+from flexget.utils.log_index import LogFilter, LogIndex
+
+LINE = '2019-05-%02d 10:%02d %-8s %-13s %-15s %s\n'
+
+
+def log_line(day, minute, level, task, message):
+    return LINE % (day, minute, level, 'logger', task, message)
+
+
+def write(path, lines):
+    with io.open(path, 'a', encoding='utf-8') as log_file:
+        log_file.write(''.join(lines))
+
+
+def brute_force(lines, log_filter):
+    """Lines of `lines` matching `log_filter`, newest first, without using an index."""
+    found = []
+    message = None
+    for line in ''.join(lines).splitlines():
+        message = log_index.parse_line(line.encode('utf-8')) or message
+        if log_filter.matches(message):
+            found.append(line)
+    return found[::-1]
+
+
+class TestLogIndex(object):
+    @pytest.fixture()
+    def log_file(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(log_index, 'BLOCK_SIZE', 500)
+        return tmpdir.join('flexget.log').strpath
+
+    @pytest.fixture()
+    def lines(self):
+        lines = []
+        for day in range(1, 4):
+            for minute in range(30):
+                task = ['', 'tv', 'movies', 'my task'][minute % 4]
+                level = 'ERROR' if minute == 7 else ['INFO', 'VERBOSE', 'DEBUG'][minute % 3]
+                lines.append(log_line(day, minute, level, task, 'message %s' % minute))
+                if minute == 7:
+                    lines.append('Traceback (most recent call last):\n  in foo\n')
+        return lines
+
+    def test_search(self, log_file, lines):
+        write(log_file, lines)
+        index = LogIndex(log_file)
+        filters = [
+            LogFilter(),
+            LogFilter(task='tv'),
+            LogFilter(task='my task', level='verbose'),
+            LogFilter(level='error'),
+            LogFilter(start='2019-05-02', end='2019-05-02 10:10'),
+            LogFilter(start='2019-05-03 10:29'),
+            LogFilter(end='2019-05-01'),
+            LogFilter(task='other'),
+        ]
+        for log_filter in filters:
+            assert list(index.search(log_filter)) == brute_force(lines, log_filter)
+        errors = list(index.search(LogFilter(level='error')))
+        assert errors[:3] == ['  in foo', 'Traceback (most recent call last):', lines[-24][:-1]]
+        assert len(errors) == 9
+
+    def test_skips_blocks(self, log_file, lines):
+        write(log_file, lines)
+        index = LogIndex(log_file)
+        index.update()
+        with io.open(index.index_file) as index_file:
+            blocks = json.load(index_file)['files'].popitem()[1]['blocks']
+        assert len(blocks) > 10
+        log_filter = LogFilter(start='2019-05-03 10:29')
+        assert [block for block in blocks if log_filter.matches_block(block)] == blocks[-1:]
+
+    @pytest.fixture()
+    def indexed(self, monkeypatch):
+        """Records the log files indexed and the offsets indexing started from."""
+        indexed = []
+        original_index = LogIndex._index
+
+        def index(fh, file_index):
+            indexed.append((fh.name, file_index['size']))
+            original_index(fh, file_index)
+
+        monkeypatch.setattr(LogIndex, '_index', staticmethod(index))
+        return indexed
+
+    def test_update(self, log_file, lines, indexed):
+        write(log_file, lines[:50])
+        index = LogIndex(log_file)
+        index.update()
+        # Only complete lines are indexed
+        write(log_file, [lines[50], lines[51][:10]])
+        assert list(index.search()) == brute_force(lines[:51], LogFilter())
+        write(log_file, [lines[51][10:]] + lines[52:])
+        # A new instance continues from the stored index
+        del indexed[:]
+        index = LogIndex(log_file)
+        assert list(index.search()) == brute_force(lines, LogFilter())
+        assert indexed == [(log_file, len(''.join(lines[:51]).encode('utf-8')))]
+
+    def test_rotation(self, log_file, lines, indexed):
+        write(log_file, lines[:60])
+        index = LogIndex(log_file)
+        index.update()
+        # Like RotatingFileHandler
+        os.rename(log_file, log_file + '.1')
+        write(log_file, lines[60:])
+        del indexed[:]
+        log_filter = LogFilter(task='movies')
+        assert list(index.search(log_filter)) == brute_force(lines, log_filter)
+        assert indexed == [(log_file, 0)]
+
+    def test_unindexed(self, log_file, lines, indexed, monkeypatch):
+        write(log_file, lines)
+        index = LogIndex(log_file)
+        index.update()
+        # Like a log file rotated after the update
+        monkeypatch.setattr(index, 'update', lambda: None)
+        index._files = {}
+        del indexed[:]
+        reads = []
+        monkeypatch.setattr(log_index.io, 'open', self.recording_open(reads))
+        assert list(index.search()) == brute_force(lines, LogFilter())
+        assert indexed == [(log_file, 0)]
+        assert reads and max(reads) < 1000
+
+    @staticmethod
+    def recording_open(reads):
+        """Replaces io.open with one recording the sizes of the reads from the files."""
+        original_open = io.open
+
+        class RecordingFile(io.BufferedReader):
+            def read(self, size=-1):
+                reads.append(size)
+                return super(RecordingFile, self).read(size)
+
+        def recording_open(path, mode='r', **kwargs):
+            if mode != 'rb':
+                return original_open(path, mode, **kwargs)
+            return RecordingFile(io.FileIO(path, mode))
+
+        return recording_open
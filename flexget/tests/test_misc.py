@@ -11,6 +11,7 @@ import sys
 import pytest
 
 from flexget.entry import EntryUnicodeError, Entry
+from flexget.utils import template
 
 
 class TestDisableBuiltins(object):
@@ -168,6 +169,58 @@ class TestEntryStringCoercion(object):
         assert type(e['test']) == text_type  # pylint: disable=unidiomatic-typecheck
 
 
+class TestEntryClone(object):
+    def test_clone(self):
+        e = Entry('title', 'url', tags=['a'], info={'b': [1]})
+        e.on_complete(lambda entry: None)
+        e.accept('test')
+        clone = e.clone()
+        clone['title'] = 'other'
+        clone['tags'].append('c')
+        clone['info']['b'].append(2)
+        clone.trace('cloned')
+        clone.on_complete(lambda entry: None)
+        assert e['title'] == 'title'
+        assert e['tags'] == ['a']
+        assert e['info'] == {'b': [1]}
+        assert len(e.traces) == 1
+        assert len(e._hooks['complete']) == 1
+        assert clone.accepted
+        assert clone['original_title'] == 'title'
+
+    def test_clone_lazy(self):
+        e = Entry('title', 'url')
+        e.register_lazy_func(lambda entry: entry.update(lazy_field='looked up'), ['lazy_field'])
+        clone = e.clone()
+        assert clone['lazy_field'] == 'looked up'
+        assert e.is_lazy('lazy_field')
+
+
+class TestEntryRender(object):
+    config = 'tasks: {}'
+
+    def test_lazy_fields(self, manager):
+        e = Entry('title', 'url')
+        e.register_lazy_func(lambda entry: entry.update(used='looked up'), ['used'])
+        e.register_lazy_func(lambda entry: entry.update(unused='looked up'), ['unused'])
+        assert e.render('{{ title }}: {{ used }}') == 'title: looked up'
+        assert e.is_lazy('unused')
+
+    def test_compiled_once(self, manager):
+        template.render('{{ a }}', {'a': 1})
+        compiled = template._compiled[('template', '{{ a }}')]
+        assert template.render('{{ a }}', {'a': 2}) == '2'
+        assert template._compiled[('template', '{{ a }}')] is compiled
+        assert Entry(a=[1]).render('{{ a }}', native=True) == [1]
+
+    def test_context(self, manager):
+        e = Entry('title', 'url', now='field')
+        rendered = e.render('{% set title = "other" %}{{ title }} {{ now.year > 2000 }}')
+        assert rendered == 'other True'
+        assert e['title'] == 'title'
+        assert e.render('{{ range(2) | list }}') == '[0, 1]'
+
+
 class TestFilterRequireField(object):
     config = """
         tasks:
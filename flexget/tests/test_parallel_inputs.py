@@ -0,0 +1,91 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import threading
+import time
+
+import pytest
+
+from flexget import plugin
+from flexget.entry import Entry
+from .conftest import MockManager
+
+
+class SlowInput(object):
+    """Fake input plugin which takes a while to produce its entries."""
+
+    schema = {'type': 'array', 'items': {'type': 'string'}}
+    running = set()
+    overlapped = []
+
+    def on_task_input(self, task, config):
+        SlowInput.running.add(self.plugin_info.name)
+        time.sleep(0.3)
+        SlowInput.overlapped.append(len(SlowInput.running) > 1)
+        assert task.current_plugin == self.plugin_info.name
+        assert task.session is not None
+        SlowInput.running.discard(self.plugin_info.name)
+        for title in config:
+            yield Entry(title=title, url='http://localhost/%s' % title)
+
+
+class FailingInput(object):
+    schema = {'type': 'boolean'}
+
+    def on_task_input(self, task, config):
+        raise plugin.PluginError('input failed')
+
+
+plugin.register(SlowInput, 'slow_input_a', api_ver=2)
+plugin.register(SlowInput, 'slow_input_b', api_ver=2)
+plugin.register(FailingInput, 'failing_input', api_ver=2)
+
+
+@pytest.yield_fixture()
+def manager(request, config, tmpdir):
+    # Threads each get their own connection, an in-memory database would be empty for all but one
+    # of them
+    db_uri = 'sqlite:///%s' % tmpdir.join('test.sqlite').strpath
+    mockmanager = MockManager(config, request.cls.__name__, db_uri=db_uri)
+    yield mockmanager
+    mockmanager.shutdown()
+
+
+class TestParallelInputs(object):
+    config = """
+        tasks:
+          serial:
+            slow_input_a: [a1, a2]
+            slow_input_b: [b1, b2]
+          parallel:
+            parallel_inputs: yes
+            slow_input_a: [a1, a2]
+            slow_input_b: [b1, b2]
+          parallel_abort:
+            parallel_inputs: 2
+            slow_input_a: [a1]
+            failing_input: yes
+    """
+
+    def setup_method(self, method):
+        SlowInput.running = set()
+        SlowInput.overlapped = []
+
+    def test_serial(self, execute_task):
+        execute_task('serial')
+        assert not any(SlowInput.overlapped)
+
+    def test_parallel_keeps_order(self, execute_task):
+        serial = [e['title'] for e in execute_task('serial').all_entries]
+        SlowInput.overlapped = []
+        task = execute_task('parallel')
+        assert any(SlowInput.overlapped), 'input plugins should have run concurrently'
+        assert [e['title'] for e in task.all_entries] == serial
+        assert all(e.task is task for e in task.all_entries)
+        assert task.session is None
+        assert not [t for t in threading.enumerate() if '-input-' in t.name]
+
+    def test_parallel_abort(self, execute_task):
+        task = execute_task('parallel_abort', abort=True)
+        assert task.aborted
+        assert not task.all_entries
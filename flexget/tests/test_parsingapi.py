@@ -2,6 +2,7 @@ from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 from flexget.components.parsing import plugin_parsing
+from flexget.entry import Entry
 from flexget import plugin
 
 
@@ -38,3 +39,35 @@ class TestTaskParsing(object):
         # make sure when a non-default parser is installed on a task, it doesn't affect other tasks
         execute_task('explicit_parser')
         assert not plugin_parsing.selected_parsers
+
+
+class TestParseCache(object):
+    config = 'tasks: {}'
+
+    def test_results_are_cached(self, manager):
+        parsing = plugin.get('parsing', 'tests')
+        plugin_parsing.cache.clear()
+        first = parsing.parse_series('Some Show S01E02 720p', name='Some Show')
+        first.name = 'modified'
+        second = parsing.parse_series('Some Show S01E02 720p', name='Some Show')
+        assert plugin_parsing.cache.misses == 1
+        assert plugin_parsing.cache.hits == 1
+        # Every caller gets its own copy of the result
+        assert second is not first
+        assert second.name == 'Some Show'
+        assert second.identifier == 'S01E02'
+        # Different options are cached separately
+        parsing.parse_series('Some Show S01E02 720p', name='Some Show', identified_by='ep')
+        parsing.parse_movie('Some Movie 2010 720p')
+        assert plugin_parsing.cache.misses == 3
+
+    def test_least_recently_used_are_dropped(self):
+        cache = plugin_parsing.ParseCache(size=2)
+        for data in ['a', 'b', 'a', 'c']:
+            cache.get(cache.key('movie', 'test', data, {}), lambda: Entry(data=data))
+        assert len(cache) == 2
+        assert cache.hits == 1
+        cache.get(cache.key('movie', 'test', 'a', {}), lambda: Entry(data='a'))
+        assert cache.hits == 2
+        cache.get(cache.key('movie', 'test', 'b', {}), lambda: Entry(data='b'))
+        assert cache.misses == 4
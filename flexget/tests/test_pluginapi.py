@@ -1,12 +1,14 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
-import os
 import glob
+import json
+import os
+import sys
 
 import pytest
 
-from flexget import plugin, plugins
+from flexget import config_schema, plugin, plugins
 from flexget.event import event, fire_event
 
 
@@ -89,3 +91,129 @@ class TestExternalPluginLoading(object):
         # TODO: This isn't working because calling load_plugins again doesn't cause the schema for tasks to regenerate
         task = execute_task('ext_plugin')
         assert task.find_entry(title='test entry'), 'External plugin did not create entry'
+
+
+class TestPluginManifest(object):
+    config = 'tasks: {}'
+
+    module_name = 'flexget.plugins.manifest_test_plugin'
+
+    @pytest.yield_fixture()
+    def plugin_dir(self, tmpdir):
+        tmpdir.join('manifest_test_plugin.py').write(
+            'from flexget import plugin\n'
+            'from flexget.event import event\n'
+            '\n'
+            '\n'
+            'class ManifestTest(object):\n'
+            '    schema = {"type": "boolean"}\n'
+            '\n'
+            '    def on_task_prepare(self, task, config):\n'
+            '        task.manifest_test_prepared = True\n'
+            '\n'
+            '    def on_task_input(self, task, config):\n'
+            '        return []\n'
+            '\n'
+            '\n'
+            '@event("plugin.register")\n'
+            'def register_plugin():\n'
+            '    plugin.register(ManifestTest, "manifest_test", interfaces=["task", "test"], '
+            'api_ver=2)\n'
+        )
+        yield tmpdir.strpath
+        plugin.plugins.pop('manifest_test', None)
+        config_schema.schema_paths.pop('/schema/plugin/manifest_test', None)
+        sys.modules.pop(self.module_name, None)
+        # Restore the plugin package path
+        plugin.load_plugins()
+
+    def test_lazy_import(self, plugin_dir, tmpdir):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        assert 'manifest_test' in plugin.plugins
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        assert [record['name'] for record in manifest['modules'][self.module_name]] == [
+            'manifest_test'
+        ]
+
+        # Start over with the module not imported
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        assert 'manifest_test' not in plugin.plugins
+        assert self.module_name not in sys.modules
+        assert 'manifest_test' in plugin.plugin_schemas(interface='test')['properties']
+
+        assert [p.name for p in plugin.get_plugins(interface='test')] == ['manifest_test']
+        assert self.module_name in sys.modules
+        assert sorted(plugin.get_plugin_by_name('manifest_test').phase_handlers) == [
+            'input',
+            'prepare',
+        ]
+
+    def test_outdated_manifest(self, plugin_dir, tmpdir):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        tmpdir.join('manifest_test_plugin.py').write('\n# Changed\n', mode='a')
+
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        # Modules are imported when the manifest is rebuilt
+        assert 'manifest_test' in plugin.plugins
+
+    def test_lazy_plugin_from_template(self, plugin_dir, tmpdir, manager, execute_task):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        assert 'manifest_test' not in plugin.plugins
+
+        # The plugin is only in the task config once the template has been merged in the prepare
+        # phase
+        manager.config['templates'] = {'lazy': {'manifest_test': True}}
+        manager.config['tasks']['lazy'] = {'template': 'lazy', 'mock': [{'title': 'a'}]}
+        task = execute_task('lazy')
+        assert getattr(task, 'manifest_test_prepared', False)
+
+    def test_lazy_plugin_priority(self, plugin_dir, tmpdir, manager, execute_task):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        assert 'manifest_test' not in plugin.plugins
+
+        manager.config['tasks']['priority'] = {
+            'plugin_priority': {'manifest_test': 5},
+            'mock': [{'title': 'a'}],
+        }
+        task = execute_task('priority')
+        assert not task.aborted
+        assert plugin.plugins['manifest_test'].phase_handlers['prepare'].priority == 128
+
+    def test_schema_hash(self, plugin_dir, tmpdir):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        eager_hash = config_schema.schema_hash()
+
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        assert 'manifest_test' not in plugin.plugins
+        assert config_schema.schema_hash() == eager_hash
+
+    def test_load_config_plugins(self, plugin_dir, tmpdir):
+        manifest_path = tmpdir.join('manifest.json').strpath
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+        del plugin.plugins['manifest_test']
+        del sys.modules[self.module_name]
+        plugin.load_plugins(extra_plugins=[plugin_dir], manifest_path=manifest_path)
+
+        plugin.load_config_plugins({'tasks': {'a': {'manifest_test_not': True}}})
+        assert 'manifest_test' not in plugin.plugins
+        config = {'templates': {'a': {'discover': {'from': [{'manifest_test': True}]}}}}
+        plugin.load_config_plugins(config)
+        assert 'manifest_test' in plugin.plugins
@@ -0,0 +1,75 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flexget import plugin
+from flexget.event import event
+from flexget.utils.prefetch import LookupPrefetcher
+
+
+class PrefetchedLookup(object):
+    """Registers a lazy `lookup_name` field, looked up with a prefetcher."""
+
+    schema = {'type': 'boolean'}
+    fetched = []
+    looked_up = []
+
+    def __init__(self):
+        self.prefetcher = LookupPrefetcher(
+            'test', 'lookup_name', lambda entry: entry['title'], self.fetch
+        )
+
+    def fetch(self, title):
+        PrefetchedLookup.fetched.append(title)
+        if title.startswith('missing'):
+            raise LookupError('not found')
+
+    def lazy_loader(self, entry):
+        self.prefetcher.prefetch(entry)
+        if self.prefetcher.failed(entry):
+            return
+        PrefetchedLookup.looked_up.append(entry['title'])
+        entry['lookup_name'] = entry['title'].upper()
+
+    def on_task_metainfo(self, task, config):
+        for entry in task.entries:
+            entry.register_lazy_func(self.lazy_loader, ['lookup_name'])
+
+
+@event('plugin.register')
+def register_plugin():
+    plugin.register(PrefetchedLookup, 'test_prefetched_lookup', api_ver=2, debug=True)
+
+
+class TestLookupPrefetcher(object):
+    config = """
+        tasks:
+          test:
+            mock:
+              - {title: 'a'}
+              - {title: 'b'}
+              - {title: 'b'}
+              - {title: 'missing'}
+            test_prefetched_lookup: yes
+          single:
+            mock:
+              - {title: 'c'}
+            test_prefetched_lookup: yes
+    """
+
+    def setup_method(self):
+        PrefetchedLookup.fetched = []
+        PrefetchedLookup.looked_up = []
+
+    def test_prefetch(self, execute_task):
+        task = execute_task('test')
+        assert task.find_entry(title='a')['lookup_name'] == 'A'
+        # Every title is fetched once, when the first entry is looked up
+        assert sorted(PrefetchedLookup.fetched) == ['a', 'b', 'missing']
+        assert [entry.get('lookup_name') for entry in task.entries] == ['A', 'B', 'B', None]
+        assert sorted(PrefetchedLookup.fetched) == ['a', 'b', 'missing']
+        assert PrefetchedLookup.looked_up == ['a', 'b', 'b']
+
+    def test_single_entry(self, execute_task):
+        task = execute_task('single')
+        assert task.find_entry(title='c')['lookup_name'] == 'C'
+        assert PrefetchedLookup.fetched == []
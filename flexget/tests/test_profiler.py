@@ -0,0 +1,106 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import time
+from datetime import datetime
+from io import StringIO
+
+from flexget import plugin
+from flexget.logger import capture_output
+from flexget.manager import get_parser
+from flexget.components.profiler import profiler
+from flexget.components.profiler.api import ObjectsContainer as OC
+from flexget.utils import json
+
+
+class SleepFilter(object):
+    schema = {'type': 'number'}
+
+    def on_task_filter(self, task, config):
+        time.sleep(config)
+
+
+plugin.register(SleepFilter, 'profiler_sleep', api_ver=2)
+
+
+class TestProfiler(object):
+    config = """
+        tasks:
+          test:
+            mock:
+              - title: a
+              - title: b
+              - title: c
+            regexp:
+              reject:
+                - ^a$
+            profiler_sleep: 0.2
+            accept_all: yes
+    """
+
+    def get_stats(self, task):
+        return {(s.phase, s.plugin): s for s in task.profile.plugins}
+
+    def test_plugin_stats(self, execute_task):
+        task = execute_task('test')
+        stats = self.get_stats(task)
+        assert stats[('input', 'mock')].entries_in == 0
+        assert stats[('input', 'mock')].entries_out == 3
+        assert stats[('filter', 'regexp')].entries_in == 3
+        assert stats[('filter', 'regexp')].entries_out == 2
+        sleep = stats[('filter', 'profiler_sleep')]
+        assert sleep.calls == 1
+        assert sleep.wall_time >= 0.2
+        # Sleeping does not use cpu
+        assert sleep.cpu_time < 0.1
+        # seen and other builtins query the database
+        assert sum(s.queries for s in stats.values()) > 0
+        assert task.profile.finished
+
+    def test_history(self, execute_task):
+        execute_task('test')
+        execute_task('test')
+        profiles = profiler.get_profiles('test')
+        assert len(profiles) >= 2
+        summary = profiler.summarize(profiles[-2:])
+        # Slowest first
+        task, runs, stats = summary[0]
+        assert (task, runs, stats.plugin) == ('test', 2, 'profiler_sleep')
+        assert stats.calls == 2
+
+    def test_cli(self, manager, execute_task):
+        execute_task('test')
+        options = get_parser().parse_args(['profile', '--task', 'test', '--porcelain'])
+        buffer = StringIO()
+        with capture_output(buffer, loglevel='error'):
+            manager.handle_cli(options=options)
+        lines = buffer.getvalue().split('\n')
+        assert any('profiler_sleep' in line for line in lines)
+
+
+class TestProfilerAPI(object):
+    config = """
+        tasks:
+          test:
+            mock:
+              - title: a
+            accept_all: yes
+    """
+
+    def test_profile(self, api_client, schema_match, execute_task):
+        execute_task('test')
+        rsp = api_client.get('/profile/?task=test')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        assert not schema_match(OC.execution_list_object, data)
+        assert data[-1]['task'] == 'test'
+        for key in ('started', 'finished'):
+            # ISO 8601 as the date-time format of the schema requires
+            datetime.strptime(data[-1][key].split('.')[0], '%Y-%m-%dT%H:%M:%S')
+        assert any(p['plugin'] == 'accept_all' for p in data[-1]['plugins'])
+
+        rsp = api_client.get('/profile/summary/?task=test')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        assert not schema_match(OC.summary_list_object, data)
+        assert all(item['task'] == 'test' for item in data)
@@ -19,6 +19,17 @@ class TestQualityModule(object):
             got_val = Quality(test_val).name
             assert got_val == '720p', got_val
 
+    def test_parse_cache(self):
+        first = Quality('Some.Show.S01E01.720p.HDTV.x264-FlexGet')
+        second = Quality('Some.Show.S01E01.720p.HDTV.x264-FlexGet')
+        assert second is not first
+        assert second == first
+        assert second.name == '720p hdtv h264'
+        assert second.clean_text == first.clean_text
+        # Changing a quality does not affect later ones parsed from the same text
+        first.resolution = Quality('1080p').resolution
+        assert Quality('Some.Show.S01E01.720p.HDTV.x264-FlexGet').name == '720p hdtv h264'
+
 
 class TestQualityParser(object):
     @pytest.fixture(
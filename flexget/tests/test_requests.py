@@ -0,0 +1,218 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import io
+import socket
+
+import pytest
+from requests import Request, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPSConnectionPool
+
+from flexget.utils import requests
+from flexget.utils.cache import HTTPCache, fresh_until
+
+
+class TestSharedPool(object):
+    config = """
+        http_pool:
+          hosts: 3
+          connections_per_host: 4
+        tasks:
+          test:
+            mock:
+              - {title: 'a'}
+    """
+
+    def test_sessions_share_pools(self, execute_task):
+        task = execute_task('test')
+        other = requests.Session()
+        for prefix in ('http://', 'https://'):
+            assert task.requests.adapters[prefix].poolmanager is other.adapters[prefix].poolmanager
+        assert other.adapters['http://'].poolmanager is requests.shared_pool.poolmanager
+
+    def test_config(self, manager):
+        assert requests.shared_pool.hosts == 3
+        assert requests.shared_pool.connections_per_host == 4
+        poolmanager = requests.Session().adapters['http://'].poolmanager
+        assert poolmanager.connection_pool_kw['maxsize'] == 4
+        # Responses are only cached when enabled in the config
+        assert requests.http_cache is None
+
+    def test_close_keeps_pools(self):
+        session = requests.Session()
+        pool = requests.shared_pool.poolmanager.connection_from_url('http://localhost/')
+        session.close()
+        assert requests.shared_pool.poolmanager.connection_from_url('http://localhost/') is pool
+
+    def test_pools_by_tls_settings(self, tmpdir):
+        url = 'https://localhost/'
+        adapter = requests.Session().get_adapter(url)
+        verified = adapter.get_connection(url)
+        assert verified.cert_reqs == 'CERT_REQUIRED'
+        assert adapter.get_connection(url, verify=True) is verified
+        unverified = adapter.get_connection(url, verify=False)
+        assert unverified is not verified
+        assert unverified.cert_reqs == 'CERT_NONE'
+        # Sessions with the same settings share the pools
+        assert requests.Session().get_adapter(url).get_connection(url, verify=False) is unverified
+        cert = tmpdir.join('client.pem')
+        cert.write('')
+        with_cert = adapter.get_connection(url, verify=False, cert=cert.strpath)
+        assert with_cert is not unverified
+        assert with_cert.cert_file == cert.strpath
+        assert adapter.get_connection('http://localhost/', verify=False) is adapter.get_connection(
+            'http://localhost/'
+        )
+
+    def test_send_uses_tls_settings(self, monkeypatch):
+        pools = []
+
+        def urlopen(pool, *args, **kwargs):
+            pools.append(pool)
+            raise socket.error('offline')
+
+        monkeypatch.setattr(HTTPSConnectionPool, 'urlopen', urlopen)
+        session = requests.Session()
+        session.verify = False
+        with pytest.raises(requests.RequestException):
+            session.send(session.prepare_request(Request('GET', 'https://localhost/')))
+        assert pools[0] is session.get_adapter('https://localhost/').get_connection(
+            'https://localhost/', verify=False
+        )
+        assert pools[0].cert_reqs == 'CERT_NONE'
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers requests with the queued responses, remembering the requests sent."""
+
+    def __init__(self):
+        super(FakeAdapter, self).__init__()
+        self.responses = []
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        status, headers, body = self.responses.pop(0)
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(body)
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def get(session, url):
+    # Session.request is not allowed in offline tests, the cache is in Session.send
+    return session.send(session.prepare_request(Request('GET', url)), stream=True)
+
+
+class TestHTTPCache(object):
+    @pytest.fixture()
+    def session(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(requests, 'http_cache', HTTPCache(tmpdir.strpath))
+        session = requests.Session()
+        session.adapter = FakeAdapter()
+        session.mount('http://cache.test/', session.adapter)
+        return session
+
+    def test_fresh(self, session):
+        session.adapter.responses.append(
+            (200, {'Cache-Control': 'max-age=60', 'Content-Type': 'text/plain'}, b'data')
+        )
+        assert get(session, 'http://cache.test/a').content == b'data'
+        response = get(session, 'http://cache.test/a')
+        assert response.content == b'data'
+        assert response.from_cache
+        assert len(session.adapter.sent) == 1
+
+    def test_revalidate(self, session):
+        session.adapter.responses.extend(
+            [
+                (200, {'ETag': '"v1"', 'Content-Type': 'application/json'}, b'{}'),
+                (304, {'ETag': '"v1"'}, b''),
+                (200, {'ETag': '"v2"', 'Content-Type': 'application/json'}, b'[]'),
+            ]
+        )
+        assert get(session, 'http://cache.test/a').content == b'{}'
+        response = get(session, 'http://cache.test/a')
+        assert session.adapter.sent[1].headers['If-None-Match'] == '"v1"'
+        assert response.status_code == 200
+        assert response.json() == {}
+        assert get(session, 'http://cache.test/a').json() == []
+        assert session.adapter.sent[2].headers['If-None-Match'] == '"v1"'
+
+    def test_not_stored(self, session):
+        session.adapter.responses.extend(
+            [
+                (200, {'Cache-Control': 'no-store', 'ETag': '"v1"'}, b'a'),
+                (200, {'Cache-Control': 'no-store', 'ETag': '"v1"'}, b'b'),
+                (200, {'Content-Length': '1'}, b'c'),
+                (200, {'Content-Length': '1'}, b'd'),
+            ]
+        )
+        assert get(session, 'http://cache.test/a').content == b'a'
+        assert get(session, 'http://cache.test/a').content == b'b'
+        assert 'If-None-Match' not in session.adapter.sent[1].headers
+        assert get(session, 'http://cache.test/b').content == b'c'
+        assert get(session, 'http://cache.test/b').content == b'd'
+
+    def test_downloads_not_read(self, session):
+        session.adapter.responses.extend(
+            [
+                (200, {'ETag': '"v1"', 'Content-Length': str(6 * 1024 ** 2)}, b'big'),
+                (200, {'ETag': '"v1"', 'Content-Type': 'application/x-bittorrent'}, b'torrent'),
+                (200, {'ETag': '"v1"', 'Content-Type': 'application/x-bittorrent'}, b'torrent'),
+            ]
+        )
+        for url in ('http://cache.test/big', 'http://cache.test/torrent'):
+            response = get(session, url)
+            assert not response._content_consumed
+        request = session.prepare_request(Request('GET', 'http://cache.test/torrent'))
+        assert session.send(request, stream=False).content == b'torrent'
+        assert requests.http_cache.get(requests.http_cache.key(request))['content'] == b'torrent'
+
+    def test_credential_headers(self, session):
+        session.adapter.responses.extend(
+            (200, {'Cache-Control': 'max-age=60', 'Content-Type': 'application/json'}, body)
+            for body in (b'1', b'2')
+        )
+        for key, body in (('a', b'1'), ('b', b'2'), ('a', b'1')):
+            request = Request('GET', 'http://cache.test/a', headers={'X-Api-Key': key})
+            response = session.send(session.prepare_request(request), stream=True)
+            assert response.content == body
+        assert len(session.adapter.sent) == 2
+
+    def test_eviction(self, tmpdir):
+        cache = HTTPCache(tmpdir.strpath, max_size=1000)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'content': b'x' * 400})
+        assert cache.get('a') is None
+        assert cache.get('c')
+        assert len(tmpdir.listdir()) == 2
+
+    def test_fresh_until(self):
+        assert fresh_until({'cache-control': 'max-age=100'}, now=1000) == 1100
+        assert fresh_until({'cache-control': 'no-cache, max-age=100'}, now=1000) == 1000
+        headers = {
+            'date': 'Sun, 06 Nov 1994 08:49:37 GMT',
+            'expires': 'Sun, 06 Nov 1994 08:50:37 GMT',
+        }
+        assert fresh_until(headers, now=1000) == 1060
+        assert fresh_until({}, now=1000) == 1000
+
+
+class TestHTTPCacheConfig(object):
+    config = """
+        http_cache:
+          max_size: 10 MiB
+        tasks: {}
+    """
+
+    def test_enabled(self, manager):
+        assert requests.http_cache.max_size == 10 * 1024 ** 2
@@ -252,3 +252,60 @@ class TestRssOnline(object):
         for task in tasks:
             task = execute_task(task)
             assert task.entries, 'No results for task `%s`' % task
+
+
+class TestCutSeenItems(object):
+    feed = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:torznab="http://torznab.com/schemas/2015/feed">
+  <channel>
+    <title>Newest first</title>
+    <item>
+      <title>Third &amp; last</title>
+      <guid>3</guid>
+      <pubDate>Sun, 28 Dec 2008 14:20:00 -0200</pubDate>
+      <torznab:attr name="seeders" value="5"/>
+    </item>
+    <item>
+      <title><![CDATA[Second]]></title>
+      <guid>2</guid>
+      <pubDate>Sun, 28 Dec 2008 14:10:00 -0200</pubDate>
+    </item>
+    <item>
+      <title>First</title>
+      <guid>1</guid>
+      <pubDate>Sun, 28 Dec 2008 14:00:00 -0200</pubDate>
+    </item>
+  </channel>
+</rss>"""
+
+    def test_cut(self):
+        import feedparser
+        from flexget.plugins.input.rss import InputRSS
+
+        content = InputRSS().cut_seen_items(self.feed, 'Second2')
+        assert b'First' not in content
+        rss = feedparser.parse(content)
+        assert not rss.bozo
+        assert [entry.title for entry in rss.entries] == ['Third & last']
+        assert rss.entries[0].title + rss.entries[0].guid == 'Third & last3'
+        assert rss.entries[0]['torznab_attr'] == {'name': 'seeders', 'value': '5'}
+        content = InputRSS().cut_seen_items(self.feed, 'Third & last3')
+        assert feedparser.parse(content).entries == []
+
+    def test_no_cut(self):
+        from flexget.plugins.input.rss import InputRSS
+
+        assert InputRSS().cut_seen_items(self.feed, 'Unknown') is None
+        assert InputRSS().cut_seen_items(b'<rss><channel><item>', 'Unknown') is None
+        oldest_first = self.feed.replace(b'14:00', b'14:30')
+        assert InputRSS().cut_seen_items(oldest_first, 'First1') is None
+
+    def test_out_of_order(self):
+        from flexget.plugins.input.rss import InputRSS
+
+        # First is newer than the last seen Second, but comes after it
+        out_of_order = self.feed.replace(b'14:00', b'14:15')
+        assert InputRSS().cut_seen_items(out_of_order, 'Second2') is None
+        # Items without a date could be newer too
+        undated = self.feed.replace(b'<pubDate>Sun, 28 Dec 2008 14:00:00 -0200</pubDate>', b'')
+        assert InputRSS().cut_seen_items(undated, 'Second2') is None
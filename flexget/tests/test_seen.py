@@ -65,6 +65,35 @@ class TestFilterSeen(object):
         assert len(task.rejected) == 1, 'Seen plugin should have rejected on second run'
 
 
+class TestSeenBulkSearch(object):
+    config = """
+        tasks: {}
+    """
+
+    def test_bulk_search_chunks(self, manager):
+        from flexget.components.seen import db
+        from flexget.manager import Session
+
+        with Session() as session:
+            db.add('global 1', 'task', {'url': 'http://localhost/1'}, session=session)
+            db.add('local 2', 'task', {'url': 'http://localhost/2'}, local=True, session=session)
+            db.add('global 3', 'task', {'url': 'http://localhost/1999'}, session=session)
+
+        # More values than fit in a single sqlite IN clause
+        values = ['http://localhost/%s' % i for i in range(2000)]
+        with Session() as session:
+            found = db.search_by_field_values_bulk(values, 'task', session=session)
+            assert sorted(found) == ['http://localhost/1', 'http://localhost/1999']
+            field, entry = found['http://localhost/1']
+            assert field.field == 'url'
+            assert entry.title == 'global 1'
+
+            found = db.search_by_field_values_bulk(values, 'other', local=True, session=session)
+            assert not found
+            found = db.search_by_field_values_bulk(values, 'task', local=True, session=session)
+            assert len(found) == 3
+
+
 class TestSeenLocal(object):
     config = """
       templates:
@@ -199,3 +228,67 @@ class TestFilterSeenMovies(object):
         task = execute_task('test_2')
         msg = 'Changing scope should not have rejected Seen movie title 13'
         assert not task.find_entry('rejected', title='Seen movie title 13'), msg
+
+
+class TestSeenIndex(object):
+    config = """
+        templates:
+          global:
+            accept_all: true
+            seen:
+              index: yes
+        tasks:
+          test:
+            mock:
+              - {title: 'Seen title 1', url: 'http://localhost/seen1'}
+          test2:
+            mock:
+              - {title: 'Seen title 2', url: 'http://localhost/seen1'} # duplicate by url
+              - {title: 'Seen title 3', url: 'http://localhost/seen3'} # new
+    """
+
+    def test_index(self, execute_task):
+        from flexget.components.seen.index import seen_index
+
+        task = execute_task('test')
+        assert task.find_entry('accepted', title='Seen title 1')
+        task = execute_task('test')
+        assert task.find_entry('rejected', title='Seen title 1')
+        assert seen_index.loaded
+        task = execute_task('test2')
+        assert task.find_entry('rejected', title='Seen title 2')
+        assert task.find_entry('accepted', title='Seen title 3')
+        # values learned after the index was built must be known to it
+        task = execute_task('test2')
+        assert task.find_entry('rejected', title='Seen title 3')
+
+    def test_snapshot(self, manager, tmpdir):
+        from flexget.components.seen import db
+        from flexget.components.seen.index import SeenIndex, BloomFilter
+        from flexget.manager import Session
+
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add('value %s' % i)
+        assert all('value %s' % i in bloom for i in range(1000))
+        assert sum('other %s' % i in bloom for i in range(1000)) < 20
+
+        snapshot = tmpdir.join('snapshot.bin').strpath
+        index = SeenIndex()
+        index.reset(snapshot)
+        with Session() as session:
+            db.add('title', 'task', {'url': 'http://localhost/1'}, session=session)
+            assert index.possibly_seen(['http://localhost/1', 'nope'], session) == [
+                'http://localhost/1'
+            ]
+        index.save()
+        index.reset(snapshot)
+        with Session() as session:
+            db.add('title 2', 'task', {'url': 'http://localhost/2'}, session=session)
+            # values added after the snapshot was written are picked up from the database
+            assert index.possibly_seen(['http://localhost/1', 'http://localhost/2'], session) == [
+                'http://localhost/1',
+                'http://localhost/2',
+            ]
+        # loaded snapshots are consumed
+        assert not tmpdir.join('snapshot.bin').exists()
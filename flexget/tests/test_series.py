@@ -6,10 +6,12 @@ from io import StringIO
 import pytest
 from jinja2 import Template
 
+from flexget import plugin
 from flexget.entry import Entry
 from flexget.logger import capture_output
 from flexget.manager import get_parser, Session
 from flexget.task import TaskAbort
+from flexget.utils.qualities import Quality
 from flexget.components.series import db
 
 
@@ -241,6 +243,75 @@ class TestDatabase(object):
         task = execute_task('progress_2')
         assert not task.accepted, 'doppelgangers accepted'
 
+    def test_series_without_entries(self, execute_task):
+        execute_task('test_1')
+        with Session() as session:
+            session.query(db.Series).filter(db.Series.name == 'progress').delete()
+        task = execute_task('test_1')
+        assert task.rejected, 'series with entries should have been processed'
+        with Session() as session:
+            assert not session.query(db.Series).filter(db.Series.name == 'progress').first()
+
+    def test_stats(self, execute_task):
+        def stats():
+            with Session() as session:
+                series = session.query(db.Series).filter(db.Series.name == 'progress').one()
+                return session.query(db.SeriesStats).get(series.id).__dict__
+
+        execute_task('progress_1')
+        assert stats()['episodes'] == 1
+        assert stats()['releases'] == 2
+        assert stats()['downloaded_releases'] == 1
+        assert stats()['ep_episodes'] == 1
+        assert stats()['downloaded_season'] == 1
+        assert stats()['downloaded_number'] == 20
+        assert stats()['last_seen']
+        db.remove_series_entity('progress', 'S01E20')
+        assert stats()['episodes'] == 0
+        assert stats()['last_seen'] is None
+        with Session() as session:
+            assert db.get_series_summary(count=True, session=session) == 2
+            assert not db.get_series_summary(premieres=True, session=session).all()
+
+    def test_store_parsers(self, manager):
+        parser = plugin.get('parsing', 'test')
+        titles = [
+            'Some.Series.S01E20.720p-FlexGet',
+            'Some.Series.S01E20.720p-FlexGet',
+            'Some.Series.S01E20.HDTV-FlexGet',
+            'Some.Series.S01E21E22.HDTV-FlexGet',
+            'Some.Series.S02.720p-FlexGet',
+        ]
+        parsed = [parser.parse_series(title, name='Some Series') for title in titles]
+        with Session() as session:
+            series = db.Series()
+            series.name = 'Some Series'
+            session.add(series)
+            releases = db.store_parsers(session, series, [(p, None) for p in parsed])
+            assert [len(r) for r in releases] == [1, 1, 1, 2, 1]
+            assert releases[0][0] is releases[1][0]
+            assert releases[0][0].episode is releases[2][0].episode
+            assert [r.episode.number for r in releases[3]] == [21, 22]
+            assert releases[4][0].season.season == 2
+            ids = [[r.id for r in parser_releases] for parser_releases in releases]
+        with Session() as session:
+            series = session.query(db.Series).filter(db.Series.name == 'Some Series').one()
+            assert len(series.episodes) == 3
+            again = db.store_parsers(session, series, [(p, None) for p in reversed(parsed)])
+            assert [[r.id for r in rs] for rs in reversed(again)] == ids
+            assert session.query(db.EpisodeRelease).count() == 4
+
+    def test_store_parsers_quality(self, manager):
+        parser = plugin.get('parsing', 'test')
+        parsed = parser.parse_series('Some.Series.S01E20.720p-FlexGet', name='Some Series')
+        with Session() as session:
+            series = db.Series()
+            series.name = 'Some Series'
+            session.add(series)
+            # An unknown quality given explicitly is used instead of the quality of the parser
+            releases = db.store_parsers(session, series, [(parsed, Quality())])
+            assert releases[0][0].quality == Quality()
+
 
 class TestFilterSeries(object):
     config = """
@@ -649,3 +649,59 @@ class TestSeriesParser(object):
         assert not s.season_pack
         assert s.season == 1
         assert s.episode == 1
+
+
+class TestSeriesMatcher(object):
+    series = [
+        {'Something Interesting': {}},
+        {'Show & Tell': {}},
+        {'24': {}},
+        {'The Show (US)': {}},
+        {'Other': {'alternate_name': ['Another Name']}},
+        {'Regexp Show': {'name_regexp': ['^.*regexp']}},
+        {'Café': {}},
+    ]
+
+    @pytest.mark.parametrize(
+        'title',
+        [
+            'Something.Interesting.S01E02-FlexGet',
+            'SomethingInteresting.S01E02',
+            '[group] Something Interesting - 02',
+            'Show and Tell S01E01',
+            'Show.&.Tell.S01E01',
+            '24.S08E01.720p',
+            'The Show S01E01',
+            'The.Show.US.S01E01',
+            'Another_Name_S02E02',
+            'Some.regexp.S01E01',
+            'Café S01E01',
+            'Other Show S01E01',
+        ],
+    )
+    def test_candidates_include_matches(self, title):
+        """The matcher may give false positives, but must find every series the parser matches."""
+        from flexget.components.series.matcher import SeriesMatcher
+
+        parser = ParserInternal()
+        matcher = SeriesMatcher(self.series)
+        candidates = matcher.candidates(title)
+        for index, series_item in enumerate(self.series):
+            name, config = list(series_item.items())[0]
+            parsed = parser.parse_series(
+                title,
+                name=name,
+                alternate_names=config.get('alternate_name'),
+                name_regexps=config.get('name_regexp'),
+            )
+            if parsed.valid:
+                assert index in candidates, '%s matches %s' % (title, name)
+
+    def test_candidates_are_selective(self):
+        from flexget.components.series.matcher import SeriesMatcher
+
+        matcher = SeriesMatcher(self.series)
+        # Series using name regexps and non ascii names are always candidates
+        assert matcher.candidates('Something.Interesting.S01E02') == {0, 5, 6}
+        assert matcher.candidates('Another.Name.S01E02') == {4, 5, 6}
+        assert matcher.candidates('Unknown.S01E02') == {5, 6}
@@ -1,6 +1,44 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+from flexget import plugin
+from flexget.entry import Entry
+from flexget.event import event
+
+
+class CountingInput(object):
+    """Produces one entry, counting how often input was ran and the entry was completed."""
+
+    schema = {'type': 'boolean'}
+    inputs = 0
+    completed = 0
+
+    def on_task_input(self, task, config):
+        CountingInput.inputs += 1
+        entry = Entry(title='counted', url='http://localhost/counted')
+        entry.on_complete(self.complete)
+        return [entry]
+
+    @staticmethod
+    def complete(entry, **kwargs):
+        CountingInput.completed += 1
+
+
+class RerunOnce(object):
+    """Requests one rerun, with fresh input if configured so."""
+
+    schema = {'type': 'string', 'enum': ['snapshot', 'fresh']}
+
+    def on_task_filter(self, task, config):
+        if not task.is_rerun:
+            task.rerun(fresh_input=config == 'fresh')
+
+
+@event('plugin.register')
+def register_plugins():
+    plugin.register(CountingInput, 'test_counting_input', api_ver=2, debug=True)
+    plugin.register(RerunOnce, 'test_rerun_once', api_ver=2, debug=True)
+
 
 class TestTemplate(object):
     config = """
@@ -29,3 +67,34 @@ class TestTemplate(object):
 
         task = execute_task('test')
         assert len(task.entries) == 2, 'Should have emitted House S01E02 and Hawaii Five-O S01E01'
+
+
+class TestRerunInput(object):
+    config = """
+        tasks:
+          snapshot:
+            test_counting_input: yes
+            mock:
+              - {title: 'mocked', url: 'http://localhost/mocked', field: [1]}
+            test_rerun_once: snapshot
+            accept_all: yes
+          fresh:
+            test_counting_input: yes
+            test_rerun_once: fresh
+    """
+
+    def setup_method(self, method):
+        CountingInput.inputs = CountingInput.completed = 0
+
+    def test_snapshot(self, execute_task):
+        task = execute_task('snapshot')
+        assert task.rerun_count == 1
+        assert CountingInput.inputs == 1, 'input should not be ran again on rerun'
+        assert CountingInput.completed == 2, 'hooks should be restored with the entries'
+        assert [entry['title'] for entry in task.all_entries] == ['counted', 'mocked']
+        assert task.all_entries[1]['field'] == [1]
+
+    def test_fresh_input(self, execute_task):
+        task = execute_task('fresh')
+        assert task.rerun_count == 1
+        assert CountingInput.inputs == 2
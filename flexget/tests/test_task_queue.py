@@ -0,0 +1,181 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import itertools
+import time
+from functools import total_ordering
+
+from flexget.task import Task
+from flexget.task_queue import TaskQueue, conflicting_resources, get_workers
+
+_counter = itertools.count()
+
+
+@total_ordering
+class FakeTask(object):
+    """Minimal stand in for :class:`flexget.task.Task` recording when it ran."""
+
+    def __init__(self, name, resources=None, duration=0.2):
+        self.name = name
+        self.resources = frozenset(resources or ['task:%s' % name])
+        self.duration = duration
+        self.priority = 0
+        self._count = next(_counter)
+        self.started = None
+        self.finished = None
+
+    def execute(self):
+        self.started = time.time()
+        time.sleep(self.duration)
+        self.finished = time.time()
+
+    def __lt__(self, other):
+        return (self.priority, self._count) < (other.priority, other._count)
+
+    def __eq__(self, other):
+        return (self.priority, self._count) == (other.priority, other._count)
+
+
+def run_queue(tasks, workers):
+    task_queue = TaskQueue(workers=workers)
+    for task in tasks:
+        task_queue.put(task)
+    task_queue.start()
+    task_queue.shutdown(finish_queue=True)
+    task_queue.wait()
+    return task_queue
+
+
+def overlaps(first, second):
+    return first.started < second.finished and second.started < first.finished
+
+
+class TestTaskQueue(object):
+    def test_single_worker_is_serial(self):
+        tasks = [FakeTask('a'), FakeTask('b')]
+        task_queue = run_queue(tasks, workers=1)
+        assert all(task.finished for task in tasks)
+        assert not overlaps(*tasks)
+        assert not task_queue.is_alive()
+
+    def test_workers_run_in_parallel(self):
+        tasks = [FakeTask('a'), FakeTask('b'), FakeTask('c')]
+        run_queue(tasks, workers=3)
+        assert all(task.finished for task in tasks)
+        assert overlaps(tasks[0], tasks[1])
+        assert overlaps(tasks[1], tasks[2])
+
+    def test_shared_resource_is_exclusive(self):
+        first = FakeTask('a', resources=['task:a', 'series:foo'])
+        second = FakeTask('b', resources=['task:b', 'series:foo'])
+        other = FakeTask('c', resources=['task:c', 'series:bar'])
+        task_queue = run_queue([first, second, other], workers=3)
+        assert all(task.finished for task in [first, second, other])
+        assert not overlaps(first, second)
+        assert overlaps(first, other)
+        assert not task_queue.waiting_tasks
+        assert not task_queue.running_tasks
+
+    def test_current_task(self):
+        task = FakeTask('a', duration=0.5)
+        task_queue = TaskQueue(workers=2)
+        task_queue.put(task)
+        task_queue.start()
+        try:
+            for _ in range(20):
+                if task_queue.current_task:
+                    break
+                time.sleep(0.05)
+            assert task_queue.current_task is task
+        finally:
+            task_queue.shutdown(finish_queue=True)
+            task_queue.wait()
+        assert task_queue.current_task is None
+
+    def test_wildcard_resource(self):
+        configured = FakeTask('a', resources=['task:a', 'series:*'])
+        second = FakeTask('b', resources=['task:b', 'series:foo'])
+        other = FakeTask('c', resources=['task:c', 'transmission:localhost:9091'])
+        run_queue([configured, second, other], workers=3)
+        assert not overlaps(configured, second)
+        assert overlaps(configured, other)
+
+    def test_conflicting_resources(self):
+        held = {'series:foo', 'task:a'}
+        assert conflicting_resources({'series:*', 'task:b'}, held) == {'series:foo'}
+        assert conflicting_resources({'series:bar'}, {'series:*'}) == {'series:bar'}
+        assert not conflicting_resources({'series:bar', 'task:b'}, held)
+
+    def test_get_workers(self):
+        assert get_workers({}) == 1
+        assert get_workers({'task_queue': 4}) == 4
+        assert get_workers({'task_queue': {'workers': 2}}) == 2
+
+
+class TestTaskResources(object):
+    config = """
+        task_queue:
+          workers: 2
+        tasks:
+          series_task:
+            mock:
+              - title: foo
+            series:
+              - Some Show
+              - other show
+          plain_task:
+            mock:
+              - title: foo
+          template_task:
+            template: tv
+            mock:
+              - title: foo
+          global_task:
+            mock:
+              - title: foo
+          no_global_task:
+            template: no
+            mock:
+              - title: foo
+          configured_task:
+            configure_series:
+              from:
+                mock:
+                  - title: foo
+        templates:
+          tv:
+            series:
+              - Template Show
+          global:
+            transmission:
+              host: localhost
+    """
+
+    def test_resources(self, manager):
+        assert manager.task_queue.workers == 2
+        series_task = Task(manager, 'series_task')
+        assert series_task.resources == {
+            'task:series_task',
+            'series:some show',
+            'series:other show',
+            'transmission:localhost:9091',
+        }
+        assert Task(manager, 'no_global_task').resources == {'task:no_global_task'}
+
+    def test_template_resources(self, manager):
+        assert Task(manager, 'template_task').resources == {
+            'task:template_task',
+            'series:template show',
+            'transmission:localhost:9091',
+        }
+        assert Task(manager, 'global_task').resources == {
+            'task:global_task',
+            'transmission:localhost:9091',
+        }
+
+    def test_configure_series_resources(self, manager):
+        assert Task(manager, 'configured_task').resources == {
+            'task:configured_task',
+            'series:*',
+            'transmission:localhost:9091',
+        }
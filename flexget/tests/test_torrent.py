@@ -1,12 +1,13 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import hashlib
 import os
 
 import mock
 import pytest
 
-from flexget.utils.bittorrent import Torrent
+from flexget.utils.bittorrent import Torrent, bdecode, bencode
 
 
 class TestInfoHash(object):
@@ -48,6 +49,45 @@ class TestInfoHash(object):
         )
 
 
+class TestBencode(object):
+    def test_decode(self):
+        data = b'd4:listli1ei-20e3:abce4:name4:\xe4bc\xe46:pieces3:abce'
+        decoded = bdecode(data)
+        assert decoded['list'] == [1, -20, 'abc']
+        assert decoded['name'] == b'\xe4bc\xe4'
+        assert decoded['pieces'] == b'abc'
+        assert bencode(decoded) == data
+
+    @pytest.mark.parametrize(
+        'data', [b'', b'i1', b'i1x2e', b'i--1e', b'l1:a', b'5:abc', b'd1:a', b'x', b'i1ei2e']
+    )
+    def test_invalid(self, data):
+        with pytest.raises(SyntaxError):
+            bdecode(data)
+
+    def test_info_hash_of_original_data(self):
+        # Keys of the info dictionary are not sorted, so encoding it again gives another hash
+        data = b' d4:infod4:name1:a6:lengthi1eee\n'
+        torrent = Torrent(data)
+        original_hash = hashlib.sha1(b'd4:name1:a6:lengthi1ee').hexdigest().upper()
+        assert torrent.info_hash == original_hash
+        # Changes outside of the info dictionary keep its hash
+        torrent.add_multitracker('http://tracker/announce')
+        torrent.comment = 'comment'
+        torrent.set_libtorrent_resume(b'', [])
+        assert torrent.info_hash == original_hash
+        torrent.content['info']['name'] = 'b'
+        assert torrent.info_hash == hashlib.sha1(b'd6:lengthi1e4:name1:be').hexdigest().upper()
+
+    def test_from_file(self):
+        path = os.path.join(os.path.dirname(__file__), 'multi.torrent')
+        with open(path, 'rb') as f:
+            torrent = Torrent(f.read())
+        mapped = Torrent.from_file(path)
+        assert mapped.content == torrent.content
+        assert mapped.info_hash == torrent.info_hash
+
+
 @pytest.mark.usefixtures('tmpdir')
 class TestSeenInfoHash(object):
     config = """
@@ -1,13 +1,13 @@
 """Torrenting utils, mostly for handling bencoding and torrent files."""
-# Torrent decoding is a short fragment from effbot.org. Site copyright says:
-# Test scripts and other short code fragments can be considered as being in the public domain.
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 import binascii
-import functools
-import re
+import copy
+import hashlib
 import logging
+import mmap
+import re
 
 log = logging.getLogger('torrent')
 
@@ -96,57 +96,91 @@ def is_torrent_file(metafilepath):
     return bool(magic_marker)
 
 
-def tokenize(text, match=re.compile(b'([idel])|(\d+):|(-?\d+)').match):
-    i = 0
-    while i < len(text):
-        m = match(text, i)
-        s = m.group(m.lastindex)
-        i = m.end()
-        if m.lastindex == 2:
-            yield b's'
-            yield text[i : i + int(s)]
-            i += int(s)
-        else:
-            yield s
-
-
-def decode_item(next, token):
-    if token == b'i':
-        # integer: "i" value "e"
-        data = int(next())
-        if next() != b'e':
-            raise ValueError
-    elif token == b's':
-        # string: "s" value (virtual tokens)
-        data = next()
-        # Strings in torrent file are defined as utf-8 encoded
-        try:
-            data = data.decode('utf-8')
-        except UnicodeDecodeError:
-            # The pieces field is a byte string, and should be left as such.
-            pass
-    elif token == b'l' or token == b'd':
-        # container: "l" (or "d") values "e"
-        data = []
-        tok = next()
-        while tok != b'e':
-            data.append(decode_item(next, tok))
-            tok = next()
+def _decode_string(data, i):
+    colon = data.find(b':', i)
+    length = data[i:colon]
+    if colon < 0 or not length.isdigit():
+        raise SyntaxError('syntax error: invalid string length at %d' % i)
+    start = colon + 1
+    end = start + int(length)
+    if end > len(data):
+        raise SyntaxError('syntax error: string at %d exceeds the data' % i)
+    return data[start:end], end
+
+
+def _decode_text(value):
+    # Strings in torrent file are defined as utf-8 encoded, binary fields like pieces are not
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return value
+
+
+class _Decoder(object):
+    """
+    Decodes bencoded data from any object with `find` and slicing which returns bytes, like bytes
+    or an mmap.
+
+    The byte span of the top level `info` dictionary is recorded, so the info hash can be
+    calculated from the original data. Values of the `pieces` key are left as bytes without trying
+    to decode them as text.
+    """
+
+    BINARY_KEYS = ('pieces',)
+
+    def __init__(self, data):
+        self.data = data
+        self.info_span = None
+
+    def decode(self, i=0):
+        """Decodes the item starting at index `i`, returns the item and the index following it."""
+        return self._decode(i, top=True)
+
+    def _decode(self, i, key=None, top=False):
+        data = self.data
+        token = data[i : i + 1]
         if token == b'd':
-            data = dict(list(zip(data[0::2], data[1::2])))
-    else:
-        raise ValueError
-    return data
+            value = {}
+            i += 1
+            while data[i : i + 1] != b'e':
+                item_key, i = _decode_string(data, i)
+                item_key = _decode_text(item_key)
+                start = i
+                value[item_key], i = self._decode(i, key=item_key)
+                if top and item_key == 'info':
+                    self.info_span = (start, i)
+            return value, i + 1
+        if token == b'l':
+            value = []
+            i += 1
+            while data[i : i + 1] != b'e':
+                item, i = self._decode(i)
+                value.append(item)
+            return value, i + 1
+        if token == b'i':
+            end = data.find(b'e', i)
+            number = data[i + 1 : end]
+            digits = number[1:] if number[:1] == b'-' else number
+            if end < 0 or not digits.isdigit():
+                raise SyntaxError('syntax error: invalid integer at %d' % i)
+            return int(number), end + 1
+        if token.isdigit():
+            value, i = _decode_string(data, i)
+            if key not in self.BINARY_KEYS:
+                value = _decode_text(value)
+            return value, i
+        if not token:
+            raise SyntaxError('syntax error: unexpected end of data')
+        raise SyntaxError('syntax error: unexpected %r at %d' % (token, i))
 
 
 def bdecode(text):
     try:
-        src = tokenize(text)
-        data = decode_item(functools.partial(next, src), next(src))  # pylint:disable=E1101
-        for _ in src:  # look for more tokens
-            raise SyntaxError("trailing junk")
-    except (AttributeError, ValueError, StopIteration, TypeError) as e:
+        data, end = _Decoder(text).decode()
+    except (AttributeError, ValueError, TypeError) as e:
         raise SyntaxError("syntax error: %s" % e)
+    if end != len(text):
+        raise SyntaxError("trailing junk")
     return data
 
 
@@ -164,22 +198,12 @@ def encode_integer(data):
 
 
 def encode_list(data):
-    encoded = b'l'
-    for item in data:
-        encoded += bencode(item)
-    encoded += b'e'
-    return encoded
+    return b'l' + b''.join(bencode(item) for item in data) + b'e'
 
 
 def encode_dictionary(data):
-    encoded = b'd'
-    items = list(data.items())
-    items.sort()
-    for (key, value) in items:
-        encoded += bencode(key)
-        encoded += bencode(value)
-    encoded += b'e'
-    return encoded
+    items = sorted(data.items())
+    return b'd' + b''.join(bencode(key) + bencode(value) for key, value in items) + b'e'
 
 
 def bencode(data):
@@ -208,15 +232,35 @@ class Torrent(object):
     def from_file(cls, filename):
         """Create torrent from file on disk."""
         with open(filename, 'rb') as handle:
-            return cls(handle.read())
+            try:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return cls(handle.read())
+            try:
+                return cls(data)
+            finally:
+                data.close()
 
     def __init__(self, content):
-        """Accepts torrent file as string"""
-        # Make sure there is no trailing whitespace. see #1592
-        content = content.strip()
+        """Accepts torrent file as bytes, or any other object bdecode accepts"""
+        # Skip surrounding whitespace without copying the content, see #1592
+        start = 0
+        while content[start : start + 1].isspace():
+            start += 1
+        decoder = _Decoder(content)
         # decoded torrent structure
-        self.content = bdecode(content)
+        self.content, end = decoder.decode(start)
+        if content[end:].strip():
+            raise SyntaxError("trailing junk")
         self.modified = False
+        self._info_hash = None
+        self._info = None
+        if decoder.info_span:
+            info_start, info_end = decoder.info_span
+            self._info_hash = hashlib.sha1(content[info_start:info_end]).hexdigest().upper()
+            # To tell if the info dictionary is changed later on
+            self._info = copy.deepcopy(self.content['info'])
 
     def __repr__(self):
         return "%s(%s, %s)" % (
@@ -313,8 +357,9 @@ class Torrent(object):
     @property
     def info_hash(self):
         """Return Torrent info hash"""
-        import hashlib
-
+        if self._info_hash and self.content.get('info') == self._info:
+            # Hash of the info dictionary as it is in the original data
+            return str(self._info_hash)
         hash = hashlib.sha1()
         info_data = encode_dictionary(self.content['info'])
         hash.update(info_data)
@@ -4,6 +4,10 @@ from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 import hashlib
 import io
 import os
+import pickle
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
 
 import requests
 from flexget.utils.tools import log
@@ -77,3 +81,174 @@ def trim_dir(directory):
     file_name = os.path.join(directory, files[0])
     log.debug('removing least accessed file: %s', file_name)
     os.remove(file_name)
+
+
+# Content types which are cached even when the size of the response is not known in advance
+TEXT_CONTENT_TYPES = ('text/', 'json', 'xml', 'javascript')
+# Request headers which do not tell who is asking, all others are part of the cache key since
+# plugins pass credentials in headers of their own like X-Api-Key
+ANONYMOUS_HEADERS = ('accept-encoding', 'connection', 'user-agent')
+
+
+def parse_cache_control(value):
+    """
+    Parses a Cache-Control header into a dict of lowercase directive names and their values (or
+    True).
+    """
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, arg = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('" ') or True
+    return directives
+
+
+def _http_date(value):
+    try:
+        return mktime_tz(parsedate_tz(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def fresh_until(headers, now=None):
+    """
+    Works out until when a response with `headers` is fresh, from its Cache-Control max-age or
+    Expires header.
+
+    Responses without explicit freshness are considered stale right away, they are always
+    revalidated.
+
+    :return: Timestamp
+    """
+    now = now or time.time()
+    cache_control = parse_cache_control(headers.get('cache-control'))
+    if 'no-cache' in cache_control:
+        return now
+    try:
+        age = max(0, int(headers.get('age', 0)))
+    except ValueError:
+        age = 0
+    if 'max-age' in cache_control:
+        try:
+            return now + int(cache_control['max-age']) - age
+        except ValueError:
+            return now
+    expires = _http_date(headers.get('expires'))
+    if expires is not None:
+        date = _http_date(headers.get('date')) or now
+        return now + expires - date - age
+    return now
+
+
+class HTTPCache(object):
+    """
+    Stores http responses on disk, so they can be reused while fresh and revalidated with a
+    conditional request once stale. When over `max_size` bytes, the least recently used responses
+    are removed.
+    """
+
+    def __init__(self, directory, max_size=100 * 1024 ** 2, max_item_size=5 * 1024 ** 2):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_item_size = max_item_size
+        self._lock = threading.Lock()
+        # file name -> (size, last used), loaded on first use
+        self._files = None
+
+    @staticmethod
+    def key(request):
+        """
+        Returns the cache key of a prepared request. Requests with other headers, like other
+        credentials, get a key of their own.
+        """
+        parts = [request.method, request.url]
+        headers = sorted((name.lower(), value) for name, value in request.headers.items())
+        parts.extend(
+            '%s: %s' % (name, value) for name, value in headers if name not in ANONYMOUS_HEADERS
+        )
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def storable(self, response, stream=True):
+        """Tells if `response` may and should be cached."""
+        if response.status_code != 200 or response.request.method != 'GET' or response.history:
+            return False
+        cache_control = parse_cache_control(response.headers.get('cache-control'))
+        if 'no-store' in cache_control or response.headers.get('vary', '').strip() == '*':
+            return False
+        if not (
+            'etag' in response.headers
+            or 'last-modified' in response.headers
+            or fresh_until(response.headers) > time.time()
+        ):
+            return False
+        try:
+            if int(response.headers.get('content-length', 0)) > self.max_item_size:
+                return False
+        except ValueError:
+            return False
+        if stream:
+            # Do not read streamed downloads into memory, only text such as feeds and api responses
+            content_type = response.headers.get('content-type', '')
+            return any(text in content_type for text in TEXT_CONTENT_TYPES)
+        return True
+
+    def _load(self):
+        if self._files is not None:
+            return
+        self._files = {}
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        for name in os.listdir(self.directory):
+            stat = os.stat(os.path.join(self.directory, name))
+            self._files[name] = (stat.st_size, stat.st_mtime)
+
+    def get(self, key):
+        """Returns the cached item for `key`, or None"""
+        with self._lock:
+            self._load()
+            if key not in self._files:
+                return None
+            path = os.path.join(self.directory, key)
+            try:
+                with io.open(path, 'rb') as file:
+                    item = pickle.load(file)
+                # Modification time is used to find the least recently used items
+                os.utime(path, None)
+            except Exception as e:
+                log.debug('removing unreadable http cache file %s: %s', path, e)
+                self._remove(key)
+                return None
+            self._files[key] = (self._files[key][0], time.time())
+            return item
+
+    def set(self, key, item):
+        """Stores `item`, a dict of response details, under `key`."""
+        data = pickle.dumps(item, protocol=2)
+        if len(data) > self.max_item_size:
+            return
+        with self._lock:
+            self._load()
+            with io.open(os.path.join(self.directory, key), 'wb') as file:
+                file.write(data)
+            self._files[key] = (len(data), time.time())
+            total = sum(size for size, _ in self._files.values())
+            if total <= self.max_size:
+                return
+            for name in sorted(self._files, key=lambda name: self._files[name][1]):
+                if total <= self.max_size:
+                    break
+                total -= self._files[name][0]
+                self._remove(name)
+
+    def _remove(self, key):
+        self._files.pop(key, None)
+        try:
+            os.remove(os.path.join(self.directory, key))
+        except OSError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for key in list(self._files):
+                self._remove(key)
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 from flexget import db_schema
+from flexget.entry import Entry
 from flexget.event import event
 from flexget.manager import Session
 from flexget.plugin import PluginError
@@ -180,9 +181,10 @@ class cached(object):
             if db_cache:
                 entries = [ent.entry for ent in db_cache.entries]
                 log.verbose('Restored %s entries from db cache' % len(entries))
-                # Store to in memory cache
-                self.cache[self.cache_name] = copy.deepcopy(entries)
-                return entries
+                # Store to in memory cache, every user gets copies of the entries
+                cache = IterableCache(entries)
+                self.cache[self.cache_name] = cache
+                return cache
 
 
 class IterableCache(object):
@@ -195,12 +197,18 @@ class IterableCache(object):
         self.cache = []
         self.finished_hook = finished_hook
 
+    @staticmethod
+    def copy(item):
+        if isinstance(item, Entry):
+            return item.clone()
+        return copy.deepcopy(item)
+
     def __iter__(self):
         for item in self.cache:
-            yield copy.deepcopy(item)
+            yield self.copy(item)
         for item in self.iterable:
             self.cache.append(item)
-            yield copy.deepcopy(item)
+            yield self.copy(item)
         # The first time we iterate through all items, call our finished hook with complete list of items
         if self.finished_hook:
             self.finished_hook(self.cache)
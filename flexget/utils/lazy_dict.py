@@ -2,7 +2,7 @@ from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 import logging
-from collections import MutableMapping
+from collections import Mapping, MutableMapping
 
 log = logging.getLogger('lazy_lookup')
 
@@ -130,3 +130,37 @@ class LazyDict(MutableMapping):
         :rtype: bool
         """
         return isinstance(self.store.get(key), LazyLookup)
+
+
+class LazyChainMap(Mapping):
+    """
+    Read only view of several mappings without copying them, keys are looked up from the first
+    mapping which has them.
+    Lazy fields of the mappings are evaluated once used, like in a :class:`LazyDict`.
+    """
+
+    def __init__(self, *maps):
+        self.maps = maps
+
+    def __getitem__(self, key):
+        for mapping in self.maps:
+            if key in mapping:
+                item = mapping[key]
+                if isinstance(item, LazyLookup):
+                    return item[key]
+                return item
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return any(key in mapping for mapping in self.maps)
+
+    def __iter__(self):
+        seen = set()
+        for mapping in self.maps:
+            for key in mapping:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return len(set().union(*self.maps))
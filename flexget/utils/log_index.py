@@ -0,0 +1,345 @@
+"""
+Index of the log file, to find the lines of a time range, task or level without reading through all
+logs.
+
+The log file and its rotated files are split in blocks of lines. For every block its byte range,
+the time of its first and last message, and the levels and tasks of its messages are recorded.
+Searches only read the blocks which can contain matching lines. The index is stored as json beside
+the log file. Updates only index the lines logged since the last update, and rotated log files are
+recognized by their first line so their index is kept.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+
+from flexget.event import event
+from flexget.logger import ENV_MAXCOUNT, get_level_no
+
+log = logging.getLogger('log_index')
+
+INDEX_VERSION = 1
+# Bytes of log lines in an index block
+BLOCK_SIZE = 256 * 1024
+# Seconds between index updates while the daemon runs
+UPDATE_INTERVAL = 60
+
+encoding = sys.getfilesystemencoding()
+
+# Columns of FlexGetFormatter: time, level, logger name and task. Without a task the logger name is
+# followed by at least 16 spaces.
+LINE_RE = re.compile(br'(\d{4}-\d\d-\d\d \d\d:\d\d) (\S+) +\S+(?: {1,15}(\S.*))?')
+TIME_RE = re.compile(r'\d{4}(-\d\d(-\d\d( \d\d(:\d\d)?)?)?)?$')
+
+
+def parse_time(value):
+    """
+    Validates a time filter, which is a timestamp as logged (YYYY-MM-DD HH:MM) or the start of one.
+    """
+    if not TIME_RE.match(value):
+        raise ValueError('Invalid time `%s`, format is YYYY-MM-DD HH:MM or a part of it' % value)
+    return value
+
+
+def parse_line(line):
+    """
+    :param bytes line: Log line
+    :returns: Tuple of time, level and the text from the task on, or None if the line does not
+        start a log message.
+    """
+    match = LINE_RE.match(line)
+    if not match:
+        return None
+    timestamp, level, rest = match.groups()
+    rest = rest.rstrip(b'\r').decode(encoding, 'replace') if rest else ''
+    return timestamp.decode('ascii'), level.decode('ascii'), rest
+
+
+def _level_no(name):
+    try:
+        level = get_level_no(name)
+    except AttributeError:
+        return 0
+    return level if isinstance(level, int) else 0
+
+
+class LogFilter(object):
+    """
+    Filters log lines by time, task and minimum level. Times are compared up to the length of the
+    filter.
+    """
+
+    def __init__(self, start=None, end=None, task=None, level=None):
+        self.start = start
+        self.end = end
+        self.task = task
+        self.level = get_level_no(level) if level else None
+        self.task_word = task.split(' ', 1)[0] if task else None
+
+    @property
+    def active(self):
+        return any(value is not None for value in (self.start, self.end, self.task, self.level))
+
+    def before_start(self, timestamp):
+        return self.start is not None and timestamp[: len(self.start)] < self.start
+
+    def after_end(self, timestamp):
+        return self.end is not None and timestamp[: len(self.end)] > self.end
+
+    def matches_block(self, block):
+        """Tells if the index `block` can contain matching lines."""
+        if block['first'] is None:
+            # Nothing known about it
+            return True
+        if self.before_start(block['last']) or self.after_end(block['first']):
+            return False
+        if self.task is not None and self.task_word not in block['tasks']:
+            return False
+        if self.level is not None:
+            return any(_level_no(level) >= self.level for level in block['levels'])
+        return True
+
+    def matches(self, message):
+        """
+        :param message: Time, level and the text from the task on of a log message as returned by
+            `parse_line`, None if unknown.
+        """
+        if not self.active:
+            return True
+        if message is None:
+            return False
+        timestamp, level, rest = message
+        if self.before_start(timestamp) or self.after_end(timestamp):
+            return False
+        if self.task is not None and rest != self.task and not rest.startswith(self.task + ' '):
+            return False
+        return self.level is None or _level_no(level) >= self.level
+
+
+class LogIndex(object):
+    """Index of a log file and its rotated files."""
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.index_file = log_file + '.index'
+        # Index of every log file, by fingerprint
+        self._files = None
+        self._lock = threading.Lock()
+
+    def log_files(self):
+        """Paths of the log file and its rotated files, newest first."""
+        paths = []
+        for i in range(int(os.environ.get(ENV_MAXCOUNT, 9)) + 1):
+            path = '%s.%s' % (self.log_file, i) if i else self.log_file
+            if not os.path.isfile(path):
+                break
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def _fingerprint(fh):
+        """Identifies a log file by its first line, which stays the same when it is rotated."""
+        fh.seek(0)
+        line = fh.readline()
+        if not line.endswith(b'\n'):
+            return None
+        return hashlib.sha1(line).hexdigest()
+
+    def _load(self):
+        try:
+            with io.open(self.index_file, encoding='utf-8') as index_file:
+                data = json.load(index_file)
+            if data['version'] == INDEX_VERSION:
+                return data['files']
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            log.debug('Could not read log index %s: %s', self.index_file, e)
+        return {}
+
+    def _save(self):
+        data = str(json.dumps({'version': INDEX_VERSION, 'files': self._files}))
+        temp_file = self.index_file + '.tmp'
+        try:
+            with io.open(temp_file, 'w', encoding='utf-8') as index_file:
+                index_file.write(data)
+            try:
+                os.rename(temp_file, self.index_file)
+            except OSError:
+                # Windows does not replace existing files
+                os.remove(self.index_file)
+                os.rename(temp_file, self.index_file)
+        except (IOError, OSError) as e:
+            log.warning('Could not write log index %s: %s', self.index_file, e)
+
+    @staticmethod
+    def _index(fh, index):
+        """Adds the complete lines of `fh` after the indexed part to `index`."""
+        blocks = index['blocks']
+        block = blocks[-1] if blocks else None
+        offset = index['size']
+        fh.seek(offset)
+        for line in fh:
+            if not line.endswith(b'\n'):
+                # Still being written
+                break
+            message = parse_line(line)
+            # Blocks start with a log message, so its continuation lines are in the same block
+            if block is None or (message and block['end'] - block['start'] >= BLOCK_SIZE):
+                block = {
+                    'start': offset,
+                    'end': offset,
+                    'first': None,
+                    'last': None,
+                    'levels': [],
+                    'tasks': [],
+                }
+                blocks.append(block)
+            offset += len(line)
+            block['end'] = offset
+            if not message:
+                continue
+            timestamp, level, rest = message
+            if block['first'] is None:
+                block['first'] = timestamp
+            block['last'] = timestamp
+            if level not in block['levels']:
+                block['levels'].append(level)
+            task = rest.split(' ', 1)[0]
+            if task and task not in block['tasks']:
+                block['tasks'].append(task)
+        index['size'] = offset
+
+    def update(self):
+        """Indexes the lines logged since the last update."""
+        with self._lock:
+            if self._files is None:
+                self._files = self._load()
+            files = {}
+            changed = False
+            for path in self.log_files():
+                try:
+                    with io.open(path, 'rb') as fh:
+                        fingerprint = self._fingerprint(fh)
+                        if fingerprint is None or fingerprint in files:
+                            continue
+                        index = self._files.get(fingerprint)
+                        size = os.fstat(fh.fileno()).st_size
+                        if index is None or size < index['size']:
+                            index = {'size': 0, 'blocks': []}
+                        if size > index['size']:
+                            log.trace('Indexing %s from byte %s', path, index['size'])
+                            self._index(fh, index)
+                            changed = True
+                        files[fingerprint] = index
+                except (IOError, OSError) as e:
+                    log.debug('Could not index log file %s: %s', path, e)
+            if changed or set(files) != set(self._files):
+                self._files = files
+                self._save()
+
+    def search(self, log_filter=None):
+        """
+        Generator of the log lines matching `log_filter`, newest first. Continuation lines of a log
+        message, such as tracebacks, match like the first line of the message.
+
+        :param LogFilter log_filter: Filter, all lines when not given.
+        """
+        log_filter = log_filter or LogFilter()
+        self.update()
+        for path in self.log_files():
+            try:
+                fh = io.open(path, 'rb')
+            except (IOError, OSError):
+                continue
+            with fh:
+                fingerprint = self._fingerprint(fh)
+                with self._lock:
+                    index = self._files.get(fingerprint) if fingerprint else None
+                if not index:
+                    # Rotated since the update or could not be indexed, so it is read in blocks too
+                    index = {'size': 0, 'blocks': []}
+                    self._index(fh, index)
+                for block in reversed(index['blocks']):
+                    if block['first'] is not None and log_filter.before_start(block['last']):
+                        # Everything before this is older
+                        return
+                    if not log_filter.matches_block(block):
+                        continue
+                    fh.seek(block['start'])
+                    lines = []
+                    message = None
+                    for line in fh.read(block['end'] - block['start']).splitlines():
+                        message = parse_line(line) or message
+                        if line and log_filter.matches(message):
+                            lines.append(line)
+                    for line in reversed(lines):
+                        yield line.decode(encoding, 'replace')
+
+
+def log_file_path(manager):
+    """Path of the log file of `manager`."""
+    log_file = os.path.expanduser(manager.options.logfile)
+    if not os.path.isabs(log_file):
+        log_file = os.path.join(manager.config_base, log_file)
+    return log_file
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_log_index(manager):
+    """The :class:`LogIndex` of the log file of `manager`."""
+    path = log_file_path(manager)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = LogIndex(path)
+        return _indexes[path]
+
+
+class LogIndexer(threading.Thread):
+    """Keeps a log index up to date in the background."""
+
+    def __init__(self, index, interval=UPDATE_INTERVAL):
+        super(LogIndexer, self).__init__(name='log_indexer')
+        self.daemon = True
+        self.index = index
+        self.interval = interval
+        self.finished = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                self.index.update()
+            except Exception as e:
+                log.error('Could not update log index: %s', e)
+                log.debug('Log index update failed', exc_info=True)
+            if self.finished.wait(self.interval):
+                return
+
+    def stop(self):
+        self.finished.set()
+
+
+indexer = None
+
+
+@event('manager.daemon.started')
+def start_indexer(manager):
+    global indexer
+    indexer = LogIndexer(get_log_index(manager))
+    indexer.start()
+
+
+@event('manager.shutdown')
+def stop_indexer(manager):
+    global indexer
+    if indexer:
+        indexer.stop()
+        indexer = None
@@ -0,0 +1,104 @@
+"""
+Batched online lookups for lazy metainfo fields.
+
+Lookup plugins register lazy fields on the entries, which are then looked up one entry at a time
+when first used. With a :class:`LookupPrefetcher` the first lookup in a task also looks up all the
+other entries of the task which still need one. Every distinct title or id is looked up once,
+several of them at the same time. The results end up in the database cache of the plugin, so the
+lookups of the single entries afterwards do not need to go online.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import threading
+
+log = logging.getLogger('prefetch')
+
+# Amount of lookups done at the same time
+THREADS = 4
+
+
+class LookupPrefetcher(object):
+    def __init__(self, name, lazy_field, key, fetch, threads=THREADS):
+        """
+        :param name: Name of the lookup, for log messages
+        :param lazy_field: Field which is lazy as long as an entry has not been looked up
+        :param key: Function returning the lookup key of an entry, or None if the entry cannot be
+            looked up
+        :param fetch: Function doing the lookup of a key and storing the result in the database
+            cache. Should raise LookupError if the lookup fails.
+        """
+        self.name = name
+        self.lazy_field = lazy_field
+        self.key = key
+        self.fetch = fetch
+        self.threads = threads
+        self._lock = threading.Lock()
+
+    def _results(self, task):
+        """
+        Results of the lookups in `task`, key: True when looked up, False when failed, None while
+        looking up.
+        """
+        if not hasattr(task, 'prefetched_lookups'):
+            task.prefetched_lookups = {}
+        return task.prefetched_lookups.setdefault(self.name, {})
+
+    def prefetch(self, entry):
+        """
+        Looks up all entries of the task of `entry` which still need a lookup, unless that has been
+        done already. Lookups which have been tried before in the task are not tried again.
+        """
+        task = entry.task
+        if task is None:
+            return
+        with self._lock:
+            results = self._results(task)
+            keys = []
+            for other in [entry] + list(task.entries):
+                if other is not entry and not other.is_lazy(self.lazy_field):
+                    continue
+                key = self.key(other)
+                if key is not None and key not in results and key not in keys:
+                    keys.append(key)
+            if len(keys) < 2:
+                # Nothing to gain, the lookup of the entry itself is done as usual
+                return
+            for key in keys:
+                results[key] = None
+
+        log.verbose('Looking up %s for %s entries', self.name, len(keys))
+        pending = list(keys)
+
+        @task.thread_target
+        def worker():
+            while True:
+                with self._lock:
+                    if not pending:
+                        return
+                    key = pending.pop(0)
+                try:
+                    self.fetch(key)
+                    result = True
+                except LookupError as e:
+                    log.debug('%s lookup of %s failed: %s', self.name, key, e)
+                    result = False
+                except Exception:
+                    log.debug('%s lookup of %s failed', self.name, key, exc_info=True)
+                    # Leave it to the lookup of the entry itself
+                    result = None
+                results[key] = result
+
+        workers = [threading.Thread(target=worker) for _ in range(min(self.threads, len(keys)))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    def failed(self, entry):
+        """Tells if the lookup for `entry` has been tried in its task already and failed."""
+        if entry.task is None:
+            return False
+        with self._lock:
+            return self._results(entry.task).get(self.key(entry)) is False
@@ -8,6 +8,9 @@ import logging
 
 log = logging.getLogger('utils.qualities')
 
+# Amount of parsed quality texts remembered
+PARSE_CACHE_SIZE = 10000
+
 
 class QualityComponent(object):
     """"""
@@ -194,6 +197,23 @@ for items in (_resolutions, _sources, _codecs, _audios):
         _registry[item.name] = item
 
 
+def _combine(qlist):
+    """Returns a regexp which matches text if, and only if, any component in `qlist` matches it."""
+    return re.compile('|'.join('(?:%s)' % item.regexp.pattern for item in qlist), re.IGNORECASE)
+
+
+# Checking these first tells in a single scan when none of the components of a type are in the text
+_combined = {
+    'resolution': _combine(_resolutions),
+    'source': _combine(_sources),
+    'codec': _combine(_codecs),
+    'audio': _combine(_audios),
+}
+
+# Maps parsed text to (resolution, source, codec, audio, clean_text)
+_parsed = {}
+
+
 def all_components():
     return iter(_registry.values())
 
@@ -221,6 +241,10 @@ class Quality(object):
         :param text: The string to parse
         """
         self.text = text
+        parsed = _parsed.get(text)
+        if parsed:
+            self.resolution, self.source, self.codec, self.audio, self.clean_text = parsed
+            return
         self.clean_text = text
         self.resolution = self._find_best(_resolutions, _UNKNOWNS['resolution'], False)
         self.source = self._find_best(_sources, _UNKNOWNS['source'])
@@ -232,11 +256,16 @@ class Quality(object):
                 default = _registry[default]
                 if not getattr(self, default.type):
                     setattr(self, default.type, default)
+        if len(_parsed) >= PARSE_CACHE_SIZE:
+            _parsed.clear()
+        _parsed[text] = (self.resolution, self.source, self.codec, self.audio, self.clean_text)
 
     def _find_best(self, qlist, default=None, strip_all=True):
         """Finds the highest matching quality component from `qlist`"""
         result = None
         search_in = self.clean_text
+        if not _combined[qlist[0].type].search(search_in):
+            return default
         for item in qlist:
             match = item.matches(search_in)
             if match[0]:
@@ -4,17 +4,27 @@ from future.moves.urllib.request import urlopen
 from future.moves.urllib.parse import urlparse
 from future.utils import text_to_native_str
 
+import os
 import time
 import logging
+import threading
 from datetime import timedelta, datetime
 
 import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+from requests.exceptions import InvalidProxyURL
+from requests.utils import prepend_scheme_if_needed, select_proxy
+from urllib3.poolmanager import PoolManager
+from urllib3.util import parse_url
 
 # Allow some request objects to be imported from here instead of requests
 import warnings
 from requests import RequestException
 
 from flexget import __version__ as version
+from flexget.config_schema import register_config_key, parse_size
+from flexget.event import event, fire_event
+from flexget.utils.cache import HTTPCache, fresh_until, parse_cache_control
 from flexget.utils.tools import parse_timedelta, TimedDict, timedelta_total_seconds
 
 # If we use just 'requests' here, we'll get the logger created by requests, rather than our own
@@ -25,6 +35,10 @@ logging.getLogger('requests.packages.urllib3').setLevel(logging.WARNING)
 # same as above, but for systems where urllib3 isn't part of the requests pacakge (i.e., Ubuntu)
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 
+# Responses of all sessions are cached here, None when disabled. Set up from the `http_cache`
+# config.
+http_cache = None
+
 # Time to wait before trying an unresponsive site again
 WAIT_TIME = timedelta(seconds=60)
 # Remembers sites that have timed out
@@ -75,6 +89,10 @@ class TokenBucketLimiter(DomainLimiter):
     # This is just an in memory cache right now, it works for the daemon, and across tasks in a single execution
     # but not for multiple executions via cron. Do we need to store this to db?
     state_cache = {}
+    # Searches and inputs may run in parallel, requests to the same domain must take their tokens
+    # one at a time
+    lock_cache = {}
+    _cache_lock = threading.Lock()
 
     def __init__(self, domain, tokens, rate, wait=True):
         """
@@ -87,9 +105,11 @@ class TokenBucketLimiter(DomainLimiter):
         self.rate = parse_timedelta(rate)
         self.wait = wait
         # Restore previous state for this domain, or establish new state cache
-        self.state = self.state_cache.setdefault(
-            domain, {'tokens': self.max_tokens, 'last_update': datetime.now()}
-        )
+        with self._cache_lock:
+            self.state = self.state_cache.setdefault(
+                domain, {'tokens': self.max_tokens, 'last_update': datetime.now()}
+            )
+            self.lock = self.lock_cache.setdefault(domain, threading.Lock())
 
     @property
     def tokens(self):
@@ -108,25 +128,29 @@ class TokenBucketLimiter(DomainLimiter):
         self.state['last_update'] = value
 
     def __call__(self):
-        if self.tokens < self.max_tokens:
-            regen = timedelta_total_seconds(
-                datetime.now() - self.last_update
-            ) / timedelta_total_seconds(self.rate)
-            self.tokens += regen
-        self.last_update = datetime.now()
-        if self.tokens < 1:
-            if not self.wait:
-                raise RequestException('Requests to %s have exceeded their limit.' % self.domain)
-            wait = timedelta_total_seconds(self.rate) * (1 - self.tokens)
-            # Don't spam console if wait is low
-            if wait < 4:
-                level = log.debug
-            else:
-                level = log.verbose
-            level('Waiting %.2f seconds until next request to %s', wait, self.domain)
-            # Sleep until it is time for the next request
-            time.sleep(wait)
-        self.tokens -= 1
+        # The lock is held while sleeping, so that waiting requests are let through in turn
+        with self.lock:
+            if self.tokens < self.max_tokens:
+                regen = timedelta_total_seconds(
+                    datetime.now() - self.last_update
+                ) / timedelta_total_seconds(self.rate)
+                self.tokens += regen
+            self.last_update = datetime.now()
+            if self.tokens < 1:
+                if not self.wait:
+                    raise RequestException(
+                        'Requests to %s have exceeded their limit.' % self.domain
+                    )
+                wait = timedelta_total_seconds(self.rate) * (1 - self.tokens)
+                # Don't spam console if wait is low
+                if wait < 4:
+                    level = log.debug
+                else:
+                    level = log.verbose
+                level('Waiting %.2f seconds until next request to %s', wait, self.domain)
+                # Sleep until it is time for the next request
+                time.sleep(wait)
+            self.tokens -= 1
 
 
 class TimedLimiter(TokenBucketLimiter):
@@ -160,6 +184,115 @@ def _wrap_urlopen(url, timeout=None):
     return resp
 
 
+class SharedPool(object):
+    """
+    Connection pools shared by all :class:`Session` instances, so that connections to a host are
+    kept alive from one task to the next.
+
+    Pools are kept for up to `hosts` hosts, each keeping up to `connections_per_host` idle
+    connections.
+    """
+
+    def __init__(self, hosts=DEFAULT_POOLSIZE, connections_per_host=DEFAULT_POOLSIZE):
+        self.hosts = None
+        self.connections_per_host = None
+        self.configure(hosts, connections_per_host)
+
+    def configure(self, hosts, connections_per_host):
+        """
+        Replaces the pools if their sizes have changed. Sessions already created keep using the old
+        pools.
+        """
+        if (hosts, connections_per_host) == (self.hosts, self.connections_per_host):
+            return
+        log.debug(
+            'Using http connection pools for %s hosts, %s connections per host',
+            hosts,
+            connections_per_host,
+        )
+        self.hosts = hosts
+        self.connections_per_host = connections_per_host
+        self.poolmanager = PoolManager(num_pools=hosts, maxsize=connections_per_host, strict=True)
+        self.proxy_managers = {}
+
+    def clear(self):
+        """Closes all pooled connections."""
+        self.poolmanager.clear()
+        for proxy in list(self.proxy_managers.values()):
+            proxy.clear()
+
+
+shared_pool = SharedPool()
+
+
+class _TLSSettings(object):
+    """Collects the TLS settings `HTTPAdapter.cert_verify` would set on a connection pool."""
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    """
+    HTTPAdapter which sends requests through the connections of :data:`shared_pool`.
+
+    Connections are only shared by requests with the same TLS settings (`verify` and `cert`).
+    Every combination of them gets its own pools, so that e.g. unverified connections are never
+    reused by requests which verify certificates.
+    """
+
+    # TLS settings of the request being sent by the current thread
+    _sending = threading.local()
+
+    def __init__(self, *args, **kwargs):
+        super(SharedPoolAdapter, self).__init__(*args, **kwargs)
+        self.proxy_manager = shared_pool.proxy_managers
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self._sending.tls = (verify, cert)
+        try:
+            return super(SharedPoolAdapter, self).send(
+                request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies
+            )
+        finally:
+            self._sending.tls = None
+
+    def get_connection(self, url, proxies=None, verify=None, cert=None):
+        """
+        Like `HTTPAdapter.get_connection`, from the pools for the TLS settings of the request.
+        They default to those of the request being sent.
+        """
+        if verify is None:
+            verify, cert = getattr(self._sending, 'tls', None) or (True, None)
+        pool_kwargs = None
+        if url.lower().startswith('https'):
+            settings = _TLSSettings()
+            self.cert_verify(settings, url, verify, cert)
+            pool_kwargs = vars(settings)
+        proxy = select_proxy(url, proxies)
+        if proxy:
+            proxy = prepend_scheme_if_needed(proxy, 'http')
+            if not parse_url(proxy).host:
+                raise InvalidProxyURL(
+                    'Please check proxy URL. It is malformed and could be missing the host.'
+                )
+            manager = self.proxy_manager_for(proxy)
+        else:
+            # Only scheme should be lower case
+            url = urlparse(url).geturl()
+            manager = self.poolmanager
+        # The settings are part of the pool key, cert_verify finds them already set on the pool
+        return manager.connection_from_url(url, pool_kwargs=pool_kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        # Sizes are only kept for pickling, the pools are the shared ones
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = shared_pool.poolmanager
+
+    def close(self):
+        # Other sessions are still using the pools
+        pass
+
+
 def limit_domains(url, limit_dict):
     """
     If this url matches a domain in `limit_dict`, run the limiter.
@@ -172,19 +305,39 @@ def limit_domains(url, limit_dict):
             break
 
 
+def _cached_response(item, request):
+    """Builds a :class:`requests.Response` for `request` from a cached item."""
+    response = requests.Response()
+    response.status_code = item['status']
+    response.reason = item['reason']
+    response.headers = requests.structures.CaseInsensitiveDict(item['headers'])
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = item['content']
+    response._content_consumed = True
+    response.url = request.url
+    response.request = request
+    response.from_cache = True
+    return response
+
+
 class Session(requests.Session):
     """
     Subclass of requests Session class which defines some of our own defaults, records unresponsive sites,
     and raises errors by default.
 
+    GET responses are cached in :data:`http_cache` when enabled, set `cache_responses` to False to
+    opt out.
     """
 
+    cache_responses = True
+
     def __init__(self, timeout=30, max_retries=1, *args, **kwargs):
         """Set some defaults for our session if not explicitly defined."""
         super(Session, self).__init__(*args, **kwargs)
         self.timeout = timeout
         self.stream = True
-        self.adapters['http://'].max_retries = max_retries
+        self.mount('http://', SharedPoolAdapter(max_retries=max_retries))
+        self.mount('https://', SharedPoolAdapter())
         # Stores min intervals between requests for certain sites
         self.domain_limiters = {}
         self.headers.update({'User-Agent': 'FlexGet/%s (www.flexget.com)' % version})
@@ -255,11 +408,72 @@ class Session(requests.Session):
             set_unresponsive(url)
             raise
 
+        fire_event('requests.response', result)
         if raise_status:
             result.raise_for_status()
 
         return result
 
+    def send(self, request, **kwargs):
+        """
+        Answers GET requests from the http cache while the cached response is fresh, revalidates it
+        when stale.
+
+        Requests which are conditional already are left alone.
+        """
+        cache = http_cache
+        conditional_headers = ('If-None-Match', 'If-Modified-Since', 'Range')
+        if (
+            cache is None
+            or not self.cache_responses
+            or request.method != 'GET'
+            or any(name in request.headers for name in conditional_headers)
+        ):
+            return super(Session, self).send(request, **kwargs)
+
+        key = cache.key(request)
+        item = cache.get(key)
+        if item and any(
+            request.headers.get(name) != value for name, value in item['vary'].items()
+        ):
+            item = None
+        if item:
+            no_cache = 'no-cache' in parse_cache_control(request.headers.get('Cache-Control'))
+            if item['fresh_until'] > time.time() and not no_cache:
+                log.debug('Using cached response for %s', request.url)
+                return _cached_response(item, request)
+            if item['headers'].get('etag'):
+                request.headers['If-None-Match'] = item['headers']['etag']
+            if item['headers'].get('last-modified'):
+                request.headers['If-Modified-Since'] = item['headers']['last-modified']
+
+        response = super(Session, self).send(request, **kwargs)
+
+        if item and response.status_code == 304:
+            log.debug('Cached response for %s is still valid', request.url)
+            response.close()
+            item['headers'].update(
+                (name.lower(), value)
+                for name, value in response.headers.items()
+                if name.lower() not in ('content-length', 'content-encoding', 'transfer-encoding')
+            )
+            item['fresh_until'] = fresh_until(response.headers)
+            cache.set(key, item)
+            return _cached_response(item, request)
+
+        if cache.storable(response, stream=kwargs.get('stream', True)):
+            vary = [name.strip() for name in response.headers.get('vary', '').split(',')]
+            item = {
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': dict((name.lower(), value) for name, value in response.headers.items()),
+                'content': response.content,
+                'vary': dict((name, request.headers.get(name)) for name in vary if name),
+                'fresh_until': fresh_until(response.headers),
+            }
+            cache.set(key, item)
+        return response
+
 
 # Define some module level functions that use our Session, so this module can be used like main requests module
 def request(method, url, **kwargs):
@@ -295,3 +509,70 @@ def post(url, data=None, **kwargs):
     :param kwargs: Optional arguments that ``request`` takes.
     """
     return request('post', url, data=data, **kwargs)
+
+
+http_pool_schema = {
+    'type': 'object',
+    'properties': {
+        'hosts': {'type': 'integer', 'minimum': 1},
+        'connections_per_host': {'type': 'integer', 'minimum': 1},
+    },
+    'additionalProperties': False,
+}
+
+
+@event('manager.config_updated')
+def configure_shared_pool(manager):
+    pool_config = manager.config.get('http_pool') or {}
+    shared_pool.configure(
+        pool_config.get('hosts', DEFAULT_POOLSIZE),
+        pool_config.get('connections_per_host', DEFAULT_POOLSIZE),
+    )
+
+
+http_cache_schema = {
+    'oneOf': [
+        {'type': 'boolean'},
+        {
+            'type': 'object',
+            'properties': {
+                'max_size': {'type': ['string', 'integer'], 'format': 'size'},
+                'max_item_size': {'type': ['string', 'integer'], 'format': 'size'},
+            },
+            'additionalProperties': False,
+        },
+    ]
+}
+
+
+@event('manager.config_updated')
+def configure_http_cache(manager):
+    global http_cache
+    cache_config = manager.config.get('http_cache', False)
+    if cache_config is False:
+        http_cache = None
+        return
+    if cache_config is True:
+        cache_config = {}
+    settings = (
+        os.path.join(manager.config_base, 'http_cache'),
+        parse_size(cache_config.get('max_size', '100 MiB')),
+        parse_size(cache_config.get('max_item_size', '5 MiB')),
+    )
+    if http_cache is None or (
+        http_cache.directory,
+        http_cache.max_size,
+        http_cache.max_item_size,
+    ) != settings:
+        http_cache = HTTPCache(*settings)
+
+
+@event('manager.shutdown')
+def close_shared_pool(manager):
+    shared_pool.clear()
+
+
+@event('config.register')
+def register_config():
+    register_config_key('http_pool', http_pool_schema)
+    register_config_key('http_cache', http_cache_schema)
@@ -7,7 +7,7 @@ import logging
 import os
 import re
 import locale
-from copy import copy
+import sys
 from datetime import datetime, date, time
 
 import jinja2.filters
@@ -21,11 +21,12 @@ from jinja2 import (
     TemplateNotFound,
     TemplateSyntaxError,
 )
-from jinja2.nativetypes import NativeTemplate
+from jinja2.nativetypes import NativeTemplate, native_concat
+from jinja2.utils import LRUCache, concat, missing
 from dateutil import parser as dateutil_parse
 
 from flexget.event import event
-from flexget.utils.lazy_dict import LazyDict
+from flexget.utils.lazy_dict import LazyChainMap, LazyDict
 from flexget.utils.pathscrub import pathscrub
 
 log = logging.getLogger('utils.template')
@@ -33,6 +34,11 @@ log = logging.getLogger('utils.template')
 # The environment will be created after the manager has started
 environment = None
 
+# Amount of compiled template strings and expressions kept
+COMPILED_CACHE_SIZE = 1000
+# (kind, source): compiled template or expression
+_compiled = LRUCache(COMPILED_CACHE_SIZE)
+
 
 class RenderError(Exception):
     """Error raised when there is a problem with jinja rendering."""
@@ -143,15 +149,38 @@ filter_d = filter_default
 class FlexGetTemplate(Template):
     """Adds lazy lookup support when rendering templates."""
 
+    concat = staticmethod(concat)
+
     def new_context(self, vars=None, shared=False, locals=None):
-        context = super(FlexGetTemplate, self).new_context(vars, shared, locals)
-        context.parent = LazyDict(context.parent)
-        return context
+        # Variables are looked up from `locals`, `vars` and the globals without copying them into a
+        # new dict
+        maps = []
+        if locals:
+            maps.append(dict((key, val) for key, val in locals.items() if val is not missing))
+        maps.append(vars if vars is not None else {})
+        if not shared:
+            maps.append(self.globals)
+        return self.environment.context_class(
+            self.environment, LazyChainMap(*maps), self.name, self.blocks
+        )
+
+    def render(self, *args, **kwargs):
+        # Unlike Template.render, a single mapping is used as it is instead of copying it
+        if len(args) == 1 and not kwargs:
+            vars = args[0]
+        else:
+            vars = dict(*args, **kwargs)
+        try:
+            return self.concat(self.root_render_func(self.new_context(vars)))
+        except Exception:
+            exc_info = sys.exc_info()
+        return self.environment.handle_exception(exc_info, True)
 
 
 class FlexGetNativeTemplate(FlexGetTemplate, NativeTemplate):
     """Lazy lookup support and native python return types."""
-    pass
+
+    concat = staticmethod(native_concat)
 
 
 @event('manager.initialize')
@@ -169,6 +198,7 @@ def make_environment(manager):
         extensions=['jinja2.ext.loopcontrols'],
     )
     environment.template_class = FlexGetTemplate
+    _compiled.clear()
     for name, filt in list(globals().items()):
         if name.startswith('filter_'):
             environment.filters[name.split('_', 1)[1]] = filt
@@ -224,13 +254,18 @@ def render(template, context, native=False):
     :return: The rendered template text.
     """
     if isinstance(template, str):
-        template_class = None
-        if native:
-            template_class = FlexGetNativeTemplate
-        try:
-            template = environment.from_string(template, template_class=template_class)
-        except TemplateSyntaxError as e:
-            raise RenderError('Error in template syntax: ' + e.message)
+        key = ('native' if native else 'template', template)
+        compiled = _compiled.get(key)
+        if compiled is None:
+            template_class = None
+            if native:
+                template_class = FlexGetNativeTemplate
+            try:
+                compiled = environment.from_string(template, template_class=template_class)
+            except TemplateSyntaxError as e:
+                raise RenderError('Error in template syntax: ' + e.message)
+            _compiled[key] = compiled
+        template = compiled
     try:
         result = template.render(context)
     except Exception as e:
@@ -244,17 +279,16 @@ def render(template, context, native=False):
 def render_from_entry(template_string, entry, native=False):
     """Renders a Template or template string with an Entry as its context."""
 
-    # Make a copy of the Entry so we can add some more fields
-    variables = copy(entry.store)
-    variables['now'] = datetime.now()
+    # Some more fields on top of the entry fields, without copying the entry
+    variables = {'now': datetime.now()}
     # Add task name to variables, usually it's there because metainfo_task plugin, but not always
     if hasattr(entry, 'task') and entry.task is not None:
-        if 'task' not in variables:
+        if 'task' not in entry.store:
             variables['task'] = entry.task.name
         # Since `task` has different meaning between entry and task scope, the `task_name` field is create to be
         # consistent
         variables['task_name'] = entry.task.name
-    return render(template_string, variables, native=native)
+    return render(template_string, LazyChainMap(variables, entry.store), native=native)
 
 
 def render_from_task(template, task):
@@ -276,7 +310,10 @@ def evaluate_expression(expression, context):
     :param str expression:  A jinja expression to evaluate
     :param context: dictlike, supporting LazyDicts
     """
-    compiled_expr = environment.compile_expression(expression)
+    key = ('expression', expression)
+    compiled_expr = _compiled.get(key)
+    if compiled_expr is None:
+        compiled_expr = _compiled[key] = environment.compile_expression(expression)
     # If we have a LazyDict, grab the underlying store. Our environment supports LazyFields directly
     if isinstance(context, LazyDict):
         context = context.store